@@ -10,57 +10,133 @@ All business logic is delegated to service modules.
 """
 
 import urllib.parse
-import requests
-from flask import Flask, request, Response, render_template, jsonify
+from flask import Flask, request, Response, render_template, jsonify, send_file
 
 # Import configuration and validation
 from config import (
     TWILIO_ACCOUNT_SID,
-    TWILIO_AUTH_TOKEN,
     TWILIO_PHONE_NUMBER,
     TWILIO_API_KEY,
     TWILIO_API_SECRET,
     TWILIO_TWIML_APP_SID,
-    DISPOSITION_TASK_MAPPING,  # V3.3: Task automation mapping
     validate_environment,
-    VALIDATED_MAILING_ADDRESS_FIELD_ID  # V4.0.6: Property Address field ID
+    VALIDATED_MAILING_ADDRESS_FIELD_ID,  # V4.0.6: Property Address field ID
+    LEAD_BATCH_MAX_ITEMS,  # V4.1: /api/leads/batch size limit
+    OUTBOX_DRAIN_TOKEN,  # V4.1: Protects /api/outbox/drain
+    WEBHOOK_ADMIN_TOKEN,  # V4.1: Protects /api/webhooks/*
+    WEBHOOK_VALIDATE_SIGNATURE,
+    WEBHOOK_PUBLIC_BASE_URL,
+    PODIO_HOOK_IDS  # V4.1: Hook IDs verified by /podio_hook
 )
 
 # Import service functions
 from twilio_service import (
     generate_twilio_token,
+    get_token_cache_stats,  # V4.1: Access token cache metrics
+    get_twilio_api_stats,  # V4.1: Twilio REST latency metrics
     generate_connect_prospect_twiml,
     generate_dial_twiml_for_agent,
     generate_error_twiml,
-    get_call_duration,
-    get_recording_url
+    validate_twilio_signature,  # V4.1: X-Twilio-Signature check for callbacks
+    fetch_recording_media  # V4.1: Range-aware recording download
 )
 
 from podio_service import (
     get_podio_item,
-    extract_field_value,
-    extract_field_value_by_id,  # V4.0.6: Field ID based extraction (robust to renames)
-    create_call_activity_item,
-    update_call_activity_recording,  # V3.2.3
-    create_follow_up_task,  # V3.3: Automated task creation
-    get_lead_intelligence  # V4.0: Add intelligence extraction
+    get_podio_items,  # V4.1: Batch lead fetch
+    extract_lead_intelligence  # V4.1: Intelligence from an already fetched item
+)
+
+from services.podio import (
+    reset_request_stats,  # V4.1: Per-request Podio call counters
+    get_request_stats,
+    reset_request_item_memo,  # V4.1: Fetch each Master Lead once per request
+    build_field_index,  # V4.1: O(1) field lookups for the fetched lead
+    invalidate_cached_item,  # V4.1: Item cache invalidation hook
+    get_item_cache_stats,
+    get_rate_governor_stats,  # V4.1: Podio quota / throttling metrics
+    list_lead_summaries,  # V4.1: Compact (micro view) queue listing
+    verify_podio_hook,
+    PODIO_AUTH_CALLS,
+    PODIO_ITEM_FETCHES
 )
 
 from db_service import (
-    log_call_to_firestore,
-    log_call_status_to_firestore,
-    update_call_recording_metadata,  # Step 3.3c: Add recording metadata update
-    store_call_sid_mapping,  # V3.2.2: Store CallSid to PodioItemId mapping
-    get_podio_item_id_from_call_sid,  # V3.2.3
-    get_recording_by_call_sid  # V3.2.5: Race condition fix - check for existing recording
+    flush_write_buffer,  # V4.1: Commit buffered Firestore writes at request end
+    get_write_buffer_stats
+)
+
+# V4.1: Disposition workflow (concurrent Twilio/Podio/Firestore side effects)
+from services.disposition import (
+    process_call_disposition,
+    get_write_mode,  # V4.1: 'sync' or 'outbox'
+    enqueue_call_disposition,
+    drain_disposition_outbox,
+    get_disposition_status,
+    WRITE_MODE_OUTBOX
+)
+
+# V4.1: Fast-ack queue for Twilio callbacks (/call_status, /recording_status)
+from services.webhooks import (
+    ingest_webhook,
+    drain_webhook_queue,
+    list_dead_letters,
+    redrive_dead_letter,
+    get_webhook_stats,
+    WEBHOOK_CALL_STATUS,
+    WEBHOOK_RECORDING_STATUS,
+    INGEST_FAILED
 )
 
+# V4.1: Local cache and delivery mode for /play_recording
+from services.recordings import (
+    get_cached_recording,
+    get_recording_cache_stats,
+    get_delivery_mode,  # V4.1: 'proxy' or 'redirect'
+    get_recording_redirect_url,
+    get_recording_delivery_stats,
+    DELIVERY_REDIRECT
+)
+
+# V4.1: Idempotency keys for /submit_call_data
+from services.idempotency import submission_key, run_idempotent, KEY_COMPLETED, KEY_IN_PROGRESS
+
 # Import Twilio client for call initiation
 from config import client
 
 # Initialize Flask app
 app = Flask(__name__)
 
+# V4.1: Recordings never change once Twilio has finished them - browsers may keep
+# them (private: call audio must not sit in shared caches)
+RECORDING_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+RECORDING_STREAM_CHUNK_BYTES = 64 * 1024
+
+# ============================================================================
+# REQUEST INSTRUMENTATION (V4.1)
+# ============================================================================
+
+@app.before_request
+def start_podio_request_stats():
+    """Reset per-request Podio counters (auth calls, fetches) and the item memo"""
+    reset_request_stats()
+    reset_request_item_memo()
+
+@app.after_request
+def report_podio_request_stats(response):
+    """Log Podio round trips made by this request and expose them as headers"""
+    stats = get_request_stats()
+    if stats:
+        print(f"📊 Podio request stats for {request.path}: {stats}")
+    response.headers['X-Podio-Auth-Calls'] = str(stats.get(PODIO_AUTH_CALLS, 0))
+    response.headers['X-Podio-Item-Fetches'] = str(stats.get(PODIO_ITEM_FETCHES, 0))
+    return response
+
+@app.teardown_request
+def commit_buffered_firestore_writes(exc):
+    """Commit buffered Firestore writes before a serverless instance can be frozen"""
+    flush_write_buffer()
+
 # ============================================================================
 # BASIC ROUTES
 # ============================================================================
@@ -105,29 +181,31 @@ def workspace():
         # - address: Owner Mailing Address (274909277) - where to send direct mail to contact owner
         # Note: Property Address (274896122) is displayed in Property Details section via intelligence data
         from config import OWNER_MAILING_ADDRESS_FIELD_ID
+        # V4.1: Index the lead's fields once for all lookups below
+        lead_fields = build_field_index(lead_item)
         lead_data = {
             'item_id': item_id,
-            'name': extract_field_value(lead_item, 'Owner Name'),
-            'phone': extract_field_value(lead_item, 'Owner Phone Primary'),  # V4.0.9 FIX: Corrected field label
-            'address': extract_field_value_by_id(lead_item, OWNER_MAILING_ADDRESS_FIELD_ID),  # Owner Mailing Address (ID: 274909277)
+            'name': lead_fields.value_by_label('Owner Name'),
+            'phone': lead_fields.value_by_label('Owner Phone Primary'),  # V4.0.9 FIX: Corrected field label
+            'address': lead_fields.value_by_id(OWNER_MAILING_ADDRESS_FIELD_ID),  # Owner Mailing Address (ID: 274909277)
             'source': 'Podio Master Lead',
             # Contract v1.1.3 fields
-            'lead_type': extract_field_value(lead_item, 'Lead Type'),
-            'owner_name': extract_field_value(lead_item, 'Owner Name'),
-            'owner_phone': extract_field_value(lead_item, 'Owner Phone Primary'),  # V4.0.9 FIX: Corrected field label
-            'owner_email': extract_field_value(lead_item, 'Owner Email'),
-            'owner_mailing_address': extract_field_value(lead_item, 'Owner Mailing Address'),
-            'owner_occupied': extract_field_value(lead_item, 'Owner Occupied'),
+            'lead_type': lead_fields.value_by_label('Lead Type'),
+            'owner_name': lead_fields.value_by_label('Owner Name'),
+            'owner_phone': lead_fields.value_by_label('Owner Phone Primary'),  # V4.0.9 FIX: Corrected field label
+            'owner_email': lead_fields.value_by_label('Owner Email'),
+            'owner_mailing_address': lead_fields.value_by_label('Owner Mailing Address'),
+            'owner_occupied': lead_fields.value_by_label('Owner Occupied'),
             # V4.0.9: Secondary contact fields for multi-phone support
             # V4.0.10 FIX: Use consistent parentheses in field labels (Owner Name (Secondary) not Owner Name Secondary)
-            'owner_phone_secondary': extract_field_value(lead_item, 'Owner Phone (Secondary)'),
-            'owner_name_secondary': extract_field_value(lead_item, 'Owner Name (Secondary)'),
-            'owner_email_secondary': extract_field_value(lead_item, 'Owner Email (Secondary)')
+            'owner_phone_secondary': lead_fields.value_by_label('Owner Phone (Secondary)'),
+            'owner_name_secondary': lead_fields.value_by_label('Owner Name (Secondary)'),
+            'owner_email_secondary': lead_fields.value_by_label('Owner Email (Secondary)')
         }
         
         # V4.0.5: Extract enriched intelligence data from Data Pipeline
-        # Updated to call get_lead_intelligence(item_id) which handles retrieval internally
-        intelligence = get_lead_intelligence(item_id)
+        # V4.1: Reuse the item fetched above instead of fetching it a second time
+        intelligence = extract_lead_intelligence(lead_item)
         
         print(f"DEBUG: intelligence data extracted:")
         import json
@@ -162,10 +240,40 @@ def token():
     # Get agent identifier from query params or use a default
     identity = request.args.get('identity', 'default_agent')
     
-    # Generate token using service
+    # Generate token using service (V4.1: reused per identity until close to expiry)
     token_data = generate_twilio_token(identity)
     
-    return jsonify(token_data)
+    response = jsonify(token_data)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+@app.route('/token/refresh', methods=['POST'])
+def refresh_token():
+    """
+    V4.1: Replacement Access Token for a Device whose token is about to expire
+    
+    Called by the workspace on the Device's 'tokenWillExpire' event; the
+    new token is applied with device.updateToken() without re-registering.
+    
+    Request JSON:
+        identity: Agent identity the Device registered with
+        expires_at: Expiry (epoch seconds) of the token being replaced, optional -
+                    the returned token always expires later
+    
+    Returns:
+        JSON: {'token', 'identity', 'expires_at', 'ttl'}
+    """
+    data = request.get_json(silent=True) or {}
+    identity = data.get('identity') or 'default_agent'
+    current_expires_at = data.get('expires_at')
+    if not isinstance(current_expires_at, (int, float)) or isinstance(current_expires_at, bool):
+        current_expires_at = 0
+    
+    token_data = generate_twilio_token(identity, min_expires_at=current_expires_at)
+    
+    response = jsonify(token_data)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
 
 # ============================================================================
 # CALL DATA SUBMISSION ROUTE
@@ -187,84 +295,21 @@ def submit_call_data():
         print(f"Type: {type(data.get('item_id'))}")
         print("="*50)
         
-        item_id = data.get('item_id')
-        call_sid = data.get('call_sid')
-        
-        print(f"=== SUBMIT CALL DATA (V3.2.5) ===")
-        print(f"Master Lead item_id: {item_id}")
-        print(f"Call SID: {call_sid}")
+        print(f"=== SUBMIT CALL DATA (V4.1) ===")
+        print(f"Master Lead item_id: {data.get('item_id')}")
+        print(f"Call SID: {data.get('call_sid')}")
         
-        # Get call duration and recording URL if call_sid is provided
-        call_duration = None
-        recording_url = None
-        if call_sid:
-            call_duration = get_call_duration(call_sid)
-            
-            # V3.2.5 FIX: Check if recording already arrived via webhook (race condition fix)
-            # The recording_status webhook may arrive BEFORE the user submits the form
-            # If so, the recording is already in Firestore and we can use it
-            existing_recording = get_recording_by_call_sid(call_sid)
-            if existing_recording:
-                recording_url = existing_recording.get('recording_url')
-                print(f"✅ V3.2.5: Found existing recording in Firestore: {recording_url}")
-            else:
-                # Fall back to original behavior (try Twilio API, returns None per V3.2.3 design)
-                recording_url = get_recording_url(call_sid)
-                print(f"V3.2.5: No existing recording found, will be added via webhook later")
+        # V4.1: Repeats of a submission (double-click, browser retry) replay the
+        # first response instead of creating duplicate Podio items
+        key = submission_key(data, request.headers.get('Idempotency-Key'))
+        body, status_code, outcome = run_idempotent(key, lambda: _submit_disposition(data))
         
-        # Create Call Activity item in Podio
-        success, result = create_call_activity_item(
-            data, 
-            item_id, 
-            call_sid, 
-            call_duration, 
-            recording_url
-        )
-        if success:
-            podio_item_id = result.get('item_id')
-            
-            # V3.2.2: Store CallSid mapping if call_sid is provided
-            if call_sid and podio_item_id:
-                store_call_sid_mapping(call_sid, podio_item_id)
-            
-            # V3.3: Check if disposition requires automated task creation
-            disposition_code = data.get('disposition_code')
-            if disposition_code and disposition_code in DISPOSITION_TASK_MAPPING:
-                task_config = DISPOSITION_TASK_MAPPING[disposition_code]
-                if task_config.get('create_task'):
-                    print(f"V3.3: Disposition '{disposition_code}' triggers task creation")
-                    
-                    # V3.3 Enhancement: Allow agent to override default due date
-                    task_success, task_result = create_follow_up_task(
-                        master_lead_item_id=item_id,
-                        task_properties=task_config,
-                        agent_specified_date=data.get('next_action_date')  # From form field
-                    )
-                    
-                    if task_success:
-                        task_item_id = task_result.get('item_id')
-                        print(f"✅ V3.3: Created follow-up task {task_item_id} for disposition '{disposition_code}'")
-                    else:
-                        print(f"⚠️ V3.3: Task creation failed: {task_result}")
-                        # Don't fail the entire request if task creation fails
-                else:
-                    print(f"V3.3: Disposition '{disposition_code}' does not require task creation")
-            else:
-                print(f"V3.3: Disposition '{disposition_code}' not found in task mapping or no disposition provided")
-            
-            # Log to Firestore for audit
-            log_call_to_firestore(data, item_id, call_sid)
-            
-            return jsonify({
-                'success': True,
-                'podio_item_id': podio_item_id,
-                'message': 'Data written to Podio successfully'
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'error': result
-            }), 500
+        response = jsonify(body)
+        if outcome == KEY_COMPLETED:
+            response.headers['Idempotent-Replayed'] = 'true'
+        elif outcome == KEY_IN_PROGRESS:
+            response.headers['Retry-After'] = '2'
+        return response, status_code
             
     except Exception as e:
         print(f"Error in submit_call_data: {e}")
@@ -272,6 +317,24 @@ def submit_call_data():
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _submit_disposition(data):
+    """Write the disposition (outbox or sync mode) and return (body, status code)"""
+    # V4.1: Outbox mode - persist the disposition and acknowledge now; the
+    # drain worker writes to Podio/Firestore with retries
+    if get_write_mode() == WRITE_MODE_OUTBOX:
+        entry = enqueue_call_disposition(data)
+        return {
+            'success': True,
+            'outbox_id': entry['id'],
+            'status': entry['status'],
+            'status_url': f"/api/outbox/{entry['id']}",
+            'message': 'Disposition saved - writing to Podio in the background'
+        }, 202
+    
+    # V4.1: Reads (Twilio duration, Firestore recording) run in parallel, then the
+    # Call Activity item is created, then mapping/task/audit writes run concurrently
+    return process_call_disposition(data)
+
 # ============================================================================
 # DIAL ROUTE
 # ============================================================================
@@ -320,6 +383,9 @@ def dial():
                 base_url = f"https://{request.host}"
             
             connect_url = f"{base_url}/connect_prospect?prospect_number={urllib.parse.quote_plus(prospect_number)}"
+            if item_id:
+                # V4.1: Carried into the recording callback URL
+                connect_url += f"&item_id={urllib.parse.quote_plus(str(item_id))}"
             callback_url = f"{base_url}/call_status"
             
             print(f"=== AJAX DIAL DEBUG ===")
@@ -390,8 +456,9 @@ def dial():
             
             try:
                 # Fetch the item from Podio
+                # V4.1: Bypass the item cache - the number dialed must be current
                 print(f"Fetching Podio item {item_id}...")
-                item = get_podio_item(item_id)
+                item = get_podio_item(item_id, use_cache=False)
                 print(f"Podio item fetched successfully")
                 print(f"Item fields: {[f.get('label') for f in item.get('fields', [])]}")
                 
@@ -510,6 +577,9 @@ def dial():
                 base_url = f"https://{request.host}"
             
             connect_url = f"{base_url}/connect_prospect?prospect_number={urllib.parse.quote_plus(prospect_number)}"
+            if item_id:
+                # V4.1: Carried into the recording callback URL
+                connect_url += f"&item_id={urllib.parse.quote_plus(str(item_id))}"
             callback_url = f"{base_url}/call_status"
             
             print(f"=== DIAL ENDPOINT DEBUG ===")
@@ -627,14 +697,52 @@ def connect_prospect():
     print(f"Request Form: {dict(request.form)}")
     
     prospect_number = urllib.parse.unquote_plus(request.args.get('prospect_number', ''))
+    # V4.1: Twilio fetches this TwiML for the agent (parent) leg - its CallSid and the
+    # Master Lead ID go into the recording callback URL so the child leg's recording
+    # can be linked without a Twilio API lookup
+    parent_call_sid = request.values.get('CallSid')
+    item_id = request.args.get('item_id')
     
     print(f"Raw prospect_number from args: {request.args.get('prospect_number', 'MISSING')}")
     print(f"Decoded prospect_number: {prospect_number}")
+    print(f"Parent CallSid: {parent_call_sid}, Master Lead item_id: {item_id}")
     print(f"=== END CONNECT PROSPECT ===")
     print(f"{'='*50}\n")
     
     # Generate TwiML using service
-    return generate_connect_prospect_twiml(prospect_number)
+    return generate_connect_prospect_twiml(prospect_number, parent_call_sid=parent_call_sid, item_id=item_id)
+
+# ============================================================================
+# TWILIO CALLBACK VALIDATION (V4.1)
+# ============================================================================
+
+def _reject_invalid_twilio_callback(required_params):
+    """
+    Validate a Twilio callback before it is queued
+    
+    Args:
+        required_params: Form parameters the callback must carry
+        
+    Returns:
+        Response or None: 403 (bad signature) or 400 (missing parameters),
+                          None if the callback is valid
+    """
+    if WEBHOOK_VALIDATE_SIGNATURE:
+        if WEBHOOK_PUBLIC_BASE_URL:
+            url = WEBHOOK_PUBLIC_BASE_URL.rstrip('/') + request.full_path.rstrip('?')
+        else:
+            url = request.url
+            if request.headers.get('X-Forwarded-Proto') == 'https' and url.startswith('http://'):
+                url = 'https://' + url[len('http://'):]
+        if not validate_twilio_signature(url, request.form.to_dict(), request.headers.get('X-Twilio-Signature')):
+            print(f"⚠️ V4.1: Rejected {request.path} callback with invalid Twilio signature")
+            return Response(status=403)
+    
+    missing = [name for name in required_params if not request.form.get(name)]
+    if missing:
+        print(f"WARNING: {request.path} callback missing required parameters: {missing}")
+        return Response(status=400)
+    return None
 
 # ============================================================================
 # CALL STATUS ROUTE
@@ -642,126 +750,57 @@ def connect_prospect():
 
 @app.route('/call_status', methods=['POST'])
 def call_status():
-    """Handle call status callbacks from Twilio"""
-    call_sid = request.form.get('CallSid')
-    call_status_value = request.form.get('CallStatus')
-    direction = request.form.get('Direction')
-    from_number = request.form.get('From')
-    to_number = request.form.get('To')
-
-    print(f"Call SID: {call_sid}, Status: {call_status_value}")
+    """
+    Handle call status callbacks from Twilio
     
-    # 🚨 ALERT: Check for "busy" status which indicates potential issues
-    if call_status_value == 'busy':
-        print(f"\n{'='*50}")
-        print(f"🚨 ALERT: BUSY STATUS DETECTED")
-        print(f"Call SID: {call_sid}")
-        print(f"From: {from_number}")
-        print(f"To: {to_number}")
-        print(f"Direction: {direction}")
-        print(f"This may indicate:")
-        print(f"  - VOIP connection issue")
-        print(f"  - Prospect phone returned busy signal")
-        print(f"ACTION REQUIRED: Verify agent VOIP connection is active")
-        print(f"{'='*50}\n")
-
-    # Log to Firestore
-    log_call_status_to_firestore(
-        call_sid, 
-        call_status_value, 
-        direction, 
-        from_number, 
-        to_number
-    )
-
+    V4.1: Validated and queued (services.webhooks) - the call session write
+    happens after Twilio has its 200.
+    """
+    rejected = _reject_invalid_twilio_callback(('CallSid', 'CallStatus'))
+    if rejected:
+        return rejected
+    
+    payload = {key: request.form.get(key) for key in ('CallSid', 'CallStatus', 'Direction', 'From', 'To',
+                                                     'CallDuration', 'SequenceNumber')}
+    if ingest_webhook(WEBHOOK_CALL_STATUS, payload) == INGEST_FAILED:
+        return Response(status=500)  # Not queued or stored - let Twilio redeliver
     return Response(status=200)
 # ============================================================================
 # RECORDING STATUS ROUTE
 # ============================================================================
 @app.route('/recording_status', methods=['POST'])
 def recording_status():
-    """Handle recording status callbacks from Twilio - V3.2.4 Parent CallSid Resolution"""
-    recording_sid = request.form.get('RecordingSid')
-    recording_url = request.form.get('RecordingUrl')
-    call_sid = request.form.get('CallSid')
-    recording_duration = request.form.get('RecordingDuration')
-    
-    print(f"=== RECORDING STATUS CALLBACK (V3.2.4) ===")
-    print(f"Recording SID: {recording_sid}")
-    print(f"Recording URL: {recording_url}")
-    print(f"Call SID (from webhook): {call_sid}")
-    print(f"Duration: {recording_duration} seconds")
-    print(f"==========================================")
-    
-    # Update Firestore with recording metadata
-    if call_sid and recording_sid and recording_url:
-        # Build base URL for proxy endpoint
-        base_url = request.url_root.rstrip('/')
-        if not base_url.startswith('http'):
-            base_url = f"https://{request.host}"
-        
-        # Build proxy URL for authentication-free playback
-        proxy_url = f"{base_url}/play_recording/{recording_sid}"
-        
-        # Update call log in Firestore
-        update_call_recording_metadata(
-            call_sid=call_sid,
-            recording_sid=recording_sid,
-            recording_url=recording_url,
-            recording_duration=int(recording_duration) if recording_duration else 0,
-            base_url=base_url
-        )
-        
-        # V3.2.4 FIX: Try direct lookup first, then resolve parent CallSid if needed
-        # The recording webhook receives the CHILD CallSid (prospect leg created by <Dial>)
-        # But the mapping stores the PARENT CallSid (agent leg from /dial endpoint)
-        podio_item_id = get_podio_item_id_from_call_sid(call_sid)
-        
-        if not podio_item_id:
-            # No direct mapping found - this is likely a child call from <Dial> TwiML
-            # Query Twilio API to find the parent CallSid
-            print(f"🔍 V3.2.4: No direct mapping for {call_sid}, checking for parent CallSid...")
-            try:
-                child_call = client.calls(call_sid).fetch()
-                parent_call_sid = child_call.parent_call_sid
-                
-                if parent_call_sid:
-                    print(f"🔗 V3.2.4: Found parent CallSid: {parent_call_sid}")
-                    # Now lookup using parent CallSid
-                    podio_item_id = get_podio_item_id_from_call_sid(parent_call_sid)
-                    if podio_item_id:
-                        print(f"✅ V3.2.4: Resolved via parent - Podio Item: {podio_item_id}")
-                    else:
-                        print(f"⚠️ V3.2.4: Parent CallSid {parent_call_sid} also has no mapping")
-                else:
-                    print(f"⚠️ V3.2.4: Call {call_sid} has no parent (is itself a parent call)")
-            except Exception as e:
-                print(f"❌ V3.2.4 ERROR: Failed to query Twilio for parent CallSid: {e}")
-        
-        if podio_item_id:
-            print(f"V3.2.4: Found Podio mapping - Updating item {podio_item_id}")
-            
-            # Update Podio Call Activity with recording URL
-            success, result = update_call_activity_recording(
-                call_activity_item_id=podio_item_id,
-                recording_url=proxy_url
-            )
-            
-            if success:
-                print(f"✅ V3.2.4 SUCCESS: Updated Podio Call Activity {podio_item_id} with recording URL")
-            else:
-                print(f"❌ V3.2.4 ERROR: Failed to update Podio: {result}")
-        else:
-            print("⚠️ V3.2.4 WARNING: No Podio mapping found for this CallSid (even after parent resolution) - skipping Podio update")
-    else:
-        print("WARNING: Missing required recording parameters")
+    """
+    Handle recording status callbacks from Twilio - V3.2.4 Parent CallSid Resolution
+    
+    V4.1: Validated and queued (services.webhooks) - session linkage, recording
+    metadata and the Podio Call Activity update happen after Twilio has its 200.
+    """
+    rejected = _reject_invalid_twilio_callback(('CallSid', 'RecordingSid', 'RecordingUrl'))
+    if rejected:
+        return rejected
     
+    # Build base URL for proxy endpoint
+    base_url = request.url_root.rstrip('/')
+    if not base_url.startswith('http'):
+        base_url = f"https://{request.host}"
+    
+    payload = {key: request.form.get(key) for key in ('CallSid', 'RecordingSid', 'RecordingUrl', 'RecordingDuration',
+                                                     'RecordingStatus')}
+    payload.update({
+        # V4.1: Correlation IDs carried in the callback URL (see build_recording_status_callback)
+        'parent_call_sid': request.args.get('parent_call_sid'),
+        'item_id': request.args.get('item_id'),
+        'base_url': base_url,
+    })
+    if ingest_webhook(WEBHOOK_RECORDING_STATUS, payload) == INGEST_FAILED:
+        return Response(status=500)  # Not queued or stored - let Twilio redeliver
     return Response(status=200)
 # ============================================================================
 # RECORDING PROXY ROUTE
 # ============================================================================
 
-@app.route('/play_recording/<recording_sid>', methods=['GET'])
+@app.route('/play_recording/<recording_sid>', methods=['GET', 'HEAD'])
 def play_recording(recording_sid):
     """
     Proxy endpoint to stream Twilio recordings without client authentication
@@ -771,37 +810,332 @@ def play_recording(recording_sid):
         
     Returns:
         Audio stream or error message
-    """
-    try:
-        # Construct authenticated Twilio API URL
-        url = f"https://api.twilio.com/2010-04-01/Accounts/{TWILIO_ACCOUNT_SID}/Recordings/{recording_sid}.mp3"
         
-        # Fetch recording with server-side authentication
-        response = requests.get(
-            url,
-            auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
-            stream=True
-        )
-        
-        if response.status_code == 200:
-            # Stream audio to client
-            return Response(
-                response.iter_content(chunk_size=1024),
+    Note:
+        V4.1: Range requests are forwarded to Twilio and answered with 206,
+        so seeking in the Podio player only downloads the requested part.
+        Recordings never change, so the Recording SID is the ETag and
+        If-None-Match is answered with 304 without contacting Twilio.
+        Cached recordings (services.recordings) are served from local disk
+        with send_file; the Twilio proxy below handles cache misses that
+        could not be filled. In redirect delivery mode the browser is sent
+        to Twilio's pre-signed media URL instead (proxying is the fallback).
+    """
+    cache_headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{recording_sid}"',
+        'Cache-Control': RECORDING_CACHE_CONTROL,
+    }
+    
+    # Browser already has this recording
+    if request.if_none_match.contains_weak(recording_sid):
+        return Response(status=304, headers=cache_headers)
+    
+    # V4.1: Redirect delivery - the browser fetches (and seeks) against Twilio's storage directly
+    if get_delivery_mode() == DELIVERY_REDIRECT:
+        location = get_recording_redirect_url(recording_sid)
+        if location:
+            # The signed URL expires - the redirect itself must not be cached
+            return Response(status=302, headers={'Location': location, 'Cache-Control': 'private, no-store'})
+    
+    # V4.1: Local recording cache (HEAD never triggers a download)
+    cached_path = get_cached_recording(recording_sid, fill=request.method != 'HEAD')
+    if cached_path:
+        try:
+            # conditional=True: Range/206/416, If-Range, If-None-Match; file_wrapper (sendfile) where the server has it
+            response = send_file(
+                cached_path,
                 mimetype='audio/mpeg',
-                headers={
-                    'Content-Disposition': f'inline; filename="{recording_sid}.mp3"',
-                    'Accept-Ranges': 'bytes'
-                }
+                conditional=True,
+                etag=recording_sid,
+                download_name=f"{recording_sid}.mp3"
             )
-        else:
-            return f"Recording not found: {response.status_code}", 404
-            
+            response.headers['Cache-Control'] = RECORDING_CACHE_CONTROL
+            return response
+        except FileNotFoundError:
+            # Evicted between lookup and open - proxy from Twilio instead
+            pass
+    
+    # If-Range with another entity tag means the client's partial copy is stale: send everything
+    range_header = request.headers.get('Range')
+    if range_header and request.if_range.etag and request.if_range.etag != recording_sid:
+        range_header = None
+    
+    try:
+        # Fetch recording with server-side authentication
+        upstream = fetch_recording_media(recording_sid, range_header, method=request.method)
     except Exception as e:
         print(f"Error streaming recording: {e}")
         return f"Error: {str(e)}", 500
+    
+    if upstream.status_code in (200, 206):
+        headers = {
+            **cache_headers,
+            'Content-Disposition': f'inline; filename="{recording_sid}.mp3"',
+        }
+        for name in ('Content-Length', 'Content-Range'):
+            if upstream.headers.get(name):
+                headers[name] = upstream.headers[name]
+        
+        if request.method == 'HEAD':
+            upstream.close()
+            return Response(status=upstream.status_code, mimetype='audio/mpeg', headers=headers)
+        
+        # Stream audio to client
+        response = Response(
+            upstream.iter_content(chunk_size=RECORDING_STREAM_CHUNK_BYTES),
+            status=upstream.status_code,
+            mimetype='audio/mpeg',
+            headers=headers,
+            direct_passthrough=True
+        )
+        response.call_on_close(upstream.close)
+        return response
+    
+    upstream.close()
+    if upstream.status_code == 416:
+        return Response(status=416, headers={
+            **cache_headers,
+            'Content-Range': upstream.headers.get('Content-Range', 'bytes */*'),
+        })
+    if upstream.status_code == 404:
+        return f"Recording not found: {upstream.status_code}", 404
+    print(f"Error streaming recording {recording_sid}: Twilio returned {upstream.status_code}")
+    return f"Recording unavailable: {upstream.status_code}", 502
+
+
+# ============================================================================
+# LEAD BATCH API (V4.1)
+# ============================================================================
+
+@app.route('/api/leads', methods=['GET'])
+def leads_list():
+    """
+    Queue listing: one page of Master Lead summaries
+    
+    Query params: limit (default 100, max 500), offset (default 0)
+    Response JSON: {"leads": [{"item_id", "title", "lead_score", "lead_tier", "owner_phone"}], "total", ...}
+    
+    Uses Podio's micro item view so only the summary fields are transferred and decoded.
+    """
+    try:
+        limit = min(int(request.args.get('limit', 100)), 500)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit and offset must be integers'}), 400
+    
+    leads, total = list_lead_summaries(limit=limit, offset=offset)
+    if leads is None:
+        return jsonify({'success': False, 'error': 'Could not list leads from Podio'}), 502
+    
+    return jsonify({'success': True, 'leads': leads, 'total': total, 'limit': limit, 'offset': offset})
+
+@app.route('/api/leads/batch', methods=['POST'])
+def leads_batch():
+    """
+    Fetch intelligence for many Master Leads at once
+    
+    Request JSON: {"item_ids": [123, 456, ...]}
+    Response JSON: {"leads": [{"item_id", "intelligence"}], "missing": [ids], "count"}
+    
+    Leads are loaded with paged Podio filter calls (up to 500 per call)
+    instead of one call per lead; order follows the request.
+    """
+    data = request.get_json(silent=True) or {}
+    item_ids = data.get('item_ids')
+    
+    if not isinstance(item_ids, list) or not item_ids:
+        return jsonify({'success': False, 'error': 'item_ids must be a non-empty list'}), 400
+    if len(item_ids) > LEAD_BATCH_MAX_ITEMS:
+        return jsonify({'success': False, 'error': f'At most {LEAD_BATCH_MAX_ITEMS} item_ids per request'}), 400
+    
+    items = get_podio_items(item_ids)
+    
+    leads = []
+    missing = []
+    seen = set()
+    for item_id in item_ids:
+        try:
+            key = int(item_id)
+        except (TypeError, ValueError):
+            missing.append(item_id)
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        item = items.get(key)
+        if item is None:
+            missing.append(key)
+        else:
+            leads.append({'item_id': key, 'intelligence': extract_lead_intelligence(item)})
+    
+    print(f"V4.1: Batch lead request - {len(leads)} found, {len(missing)} missing")
+    return jsonify({'success': True, 'leads': leads, 'missing': missing, 'count': len(leads)})
+
+# ============================================================================
+# DISPOSITION OUTBOX API (V4.1)
+# ============================================================================
+
+@app.route('/api/outbox/<outbox_id>', methods=['GET'])
+def outbox_status(outbox_id):
+    """
+    Status of a disposition queued by /submit_call_data (polled by the workspace)
+    
+    Response JSON: {"outbox_id", "status": "pending|processing|done|failed",
+                    "attempts", "podio_item_id", "completed_steps", "last_error"}
+    """
+    status = get_disposition_status(outbox_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Unknown outbox id'}), 404
+    return jsonify({'success': True, **status})
 
+@app.route('/api/outbox/drain', methods=['GET', 'POST'])
+def outbox_drain():
+    """
+    Process due outbox entries (retries and entries left by frozen instances)
+    
+    Intended for a scheduler (e.g. Vercel Cron). The request must carry
+    "Authorization: Bearer <OUTBOX_DRAIN_TOKEN>"; without a configured token
+    the drain is refused (403).
+    Query params: limit (default 10, max 50)
+    """
+    if not OUTBOX_DRAIN_TOKEN:
+        return jsonify({'success': False, 'error': 'OUTBOX_DRAIN_TOKEN is not configured'}), 403
+    if request.headers.get('Authorization') != f'Bearer {OUTBOX_DRAIN_TOKEN}':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    
+    try:
+        limit = min(int(request.args.get('limit', 10)), 50)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    
+    summary = drain_disposition_outbox(limit=limit)
+    print(f"V4.1: Outbox drain - {summary}")
+    return jsonify({'success': True, **summary})
+
+# ============================================================================
+# TWILIO WEBHOOK QUEUE API (V4.1)
+# ============================================================================
+
+def _reject_unauthorized_webhook_admin():
+    """
+    Check the bearer token of a /api/webhooks/* request
+    
+    Returns:
+        tuple or None: 403 response when WEBHOOK_ADMIN_TOKEN (or OUTBOX_DRAIN_TOKEN)
+                       is not configured, 401 when the token does not match,
+                       None if the request is authorized
+    """
+    if not WEBHOOK_ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': 'WEBHOOK_ADMIN_TOKEN is not configured'}), 403
+    if request.headers.get('Authorization') != f'Bearer {WEBHOOK_ADMIN_TOKEN}':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    return None
+
+@app.route('/api/webhooks/drain', methods=['GET', 'POST'])
+def webhooks_drain():
+    """
+    Process queued Twilio callbacks (retries and callbacks left by frozen instances)
+    
+    Intended for a scheduler (e.g. Vercel Cron). The request must carry
+    "Authorization: Bearer <WEBHOOK_ADMIN_TOKEN or OUTBOX_DRAIN_TOKEN>" (403
+    while no token is configured).
+    Query params: limit (default 50, max 200)
+    """
+    rejected = _reject_unauthorized_webhook_admin()
+    if rejected:
+        return rejected
+    
+    try:
+        limit = min(int(request.args.get('limit', 50)), 200)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    
+    summary = drain_webhook_queue(limit=limit)
+    print(f"V4.1: Webhook drain - {summary}")
+    return jsonify({'success': True, **summary})
+
+@app.route('/api/webhooks/dead_letters', methods=['GET'])
+def webhooks_dead_letters():
+    """
+    Callbacks that failed WEBHOOK_MAX_ATTEMPTS times, most recent first
+    
+    Query params: limit (default 50, max 200)
+    """
+    rejected = _reject_unauthorized_webhook_admin()
+    if rejected:
+        return rejected
+    
+    try:
+        limit = min(int(request.args.get('limit', 50)), 200)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    
+    dead_letters = list_dead_letters(limit=limit)
+    return jsonify({'success': True, 'dead_letters': dead_letters, 'count': len(dead_letters)})
+
+@app.route('/api/webhooks/dead_letters/<entry_id>/redrive', methods=['POST'])
+def webhooks_redrive(entry_id):
+    """Re-queue a dead-lettered callback (behind the call's queued callbacks)"""
+    rejected = _reject_unauthorized_webhook_admin()
+    if rejected:
+        return rejected
+    
+    entry = redrive_dead_letter(entry_id)
+    if entry is None:
+        return jsonify({'success': False, 'error': 'Unknown dead letter id'}), 404
+    return jsonify({'success': True, 'id': entry['id'], 'kind': entry['kind'], 'call_sid': entry['ordering_key']})
+
+# ============================================================================
+# PODIO WEBHOOK ROUTE (V4.1 item cache invalidation)
+# ============================================================================
+
+@app.route('/podio_hook', methods=['POST'])
+def podio_hook():
+    """
+    Podio webhook receiver for Master Lead changes
+    
+    Register on the Master Lead app for item.update and item.delete.
+    Podio first sends hook.verify, which is answered via the verify API for
+    the hook IDs listed in PODIO_HOOK_IDS only (403 otherwise). Item events
+    evict the lead from the item cache so the next /workspace load fetches
+    it from Podio.
+    """
+    event_type = request.form.get('type')
+    hook_id = request.form.get('hook_id')
+    item_id = request.form.get('item_id')
+    
+    print(f"V4.1: Podio hook received - type: {event_type}, hook_id: {hook_id}, item_id: {item_id}")
+    
+    if event_type == 'hook.verify':
+        if not (hook_id and hook_id.isdigit() and hook_id in PODIO_HOOK_IDS):
+            print(f"⚠️ V4.1: Podio hook {hook_id!r} is not in PODIO_HOOK_IDS - verification refused")
+            return Response(status=403)
+        verified = verify_podio_hook(hook_id, request.form.get('code'))
+        return Response(status=200 if verified else 500)
+    
+    if event_type in ('item.update', 'item.delete') and item_id:
+        invalidate_cached_item(item_id)
+    
     return Response(status=200)
 
+# ============================================================================
+# METRICS ROUTE (V4.1)
+# ============================================================================
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Instance-level performance metrics (caches, counters) for monitoring"""
+    return jsonify({
+        'podio_item_cache': get_item_cache_stats(),
+        'podio_rate_governor': get_rate_governor_stats(),
+        'firestore_write_buffer': get_write_buffer_stats(),
+        'twilio_webhooks': get_webhook_stats(),
+        'recording_cache': get_recording_cache_stats(),
+        'recording_delivery': get_recording_delivery_stats(),
+        'twilio_tokens': get_token_cache_stats(),
+        'twilio_api': get_twilio_api_stats(),
+    })
 
 # ============================================================================
 # APPLICATION STARTUP
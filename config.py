@@ -13,6 +13,7 @@ import os
 import json
 from dotenv import load_dotenv
 from twilio.rest import Client
+from twilio_http import PooledTwilioHttpClient
 import firebase_admin
 from firebase_admin import credentials, firestore
 
@@ -30,8 +31,37 @@ TWILIO_TWIML_APP_SID = os.environ.get('TWILIO_TWIML_APP_SID')
 TWILIO_API_KEY = os.environ.get('TWILIO_API_KEY')
 TWILIO_API_SECRET = os.environ.get('TWILIO_API_SECRET')
 
-# Initialize Twilio client
-client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+# V4.1: Voice access tokens - JWT lifetime, and a per-identity cache that hands a
+# signed token out again until it has less than the refresh margin left (seconds)
+TWILIO_TOKEN_TTL_SECONDS = int(os.environ.get('TWILIO_TOKEN_TTL_SECONDS', '3600'))
+TWILIO_TOKEN_CACHE_ENABLED = os.environ.get('TWILIO_TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+TWILIO_TOKEN_REFRESH_MARGIN_SECONDS = int(os.environ.get('TWILIO_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+TWILIO_TOKEN_CACHE_SIZE = int(os.environ.get('TWILIO_TOKEN_CACHE_SIZE', '1000'))
+
+# V4.1: Pooled keep-alive HTTP client for the Twilio REST API (connection pool sizes;
+# timeouts in seconds for connecting, reads (GET) and writes such as calls.create;
+# per-operation read timeouts as JSON, e.g. '{"calls.create": 20}'; extra attempts
+# for idempotent reads and the first retry delay)
+TWILIO_HTTP_POOL_CONNECTIONS = int(os.environ.get('TWILIO_HTTP_POOL_CONNECTIONS', '4'))
+TWILIO_HTTP_POOL_MAXSIZE = int(os.environ.get('TWILIO_HTTP_POOL_MAXSIZE', '16'))
+TWILIO_HTTP_CONNECT_TIMEOUT = float(os.environ.get('TWILIO_HTTP_CONNECT_TIMEOUT', '3.05'))
+TWILIO_HTTP_READ_TIMEOUT = float(os.environ.get('TWILIO_HTTP_READ_TIMEOUT', '10'))
+TWILIO_HTTP_WRITE_TIMEOUT = float(os.environ.get('TWILIO_HTTP_WRITE_TIMEOUT', '15'))
+TWILIO_HTTP_OPERATION_TIMEOUTS = json.loads(os.environ.get('TWILIO_HTTP_OPERATION_TIMEOUTS') or '{}')
+TWILIO_HTTP_READ_RETRIES = int(os.environ.get('TWILIO_HTTP_READ_RETRIES', '2'))
+TWILIO_HTTP_RETRY_BACKOFF_SECONDS = float(os.environ.get('TWILIO_HTTP_RETRY_BACKOFF_SECONDS', '0.25'))
+
+# Initialize Twilio client (V4.1: pooled, timeout-bounded transport)
+client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=PooledTwilioHttpClient(
+    pool_connections=TWILIO_HTTP_POOL_CONNECTIONS,
+    pool_maxsize=TWILIO_HTTP_POOL_MAXSIZE,
+    connect_timeout=TWILIO_HTTP_CONNECT_TIMEOUT,
+    read_timeout=TWILIO_HTTP_READ_TIMEOUT,
+    write_timeout=TWILIO_HTTP_WRITE_TIMEOUT,
+    operation_timeouts=TWILIO_HTTP_OPERATION_TIMEOUTS,
+    read_retries=TWILIO_HTTP_READ_RETRIES,
+    retry_backoff_seconds=TWILIO_HTTP_RETRY_BACKOFF_SECONDS
+))
 
 # ============================================================================
 # PODIO CONFIGURATION
@@ -42,6 +72,41 @@ PODIO_CLIENT_SECRET = os.environ.get('PODIO_CLIENT_SECRET')
 PODIO_USERNAME = os.environ.get('PODIO_USERNAME')
 PODIO_PASSWORD = os.environ.get('PODIO_PASSWORD')
 
+# V4.1: Shared OAuth token store ('firestore', 'sqlite' or 'memory')
+# Unset = Firestore when available, otherwise the local SQLite file
+PODIO_TOKEN_STORE = os.environ.get('PODIO_TOKEN_STORE')
+PODIO_TOKEN_STORE_PATH = os.environ.get('PODIO_TOKEN_STORE_PATH', '/tmp/podio_token_store.sqlite3')
+
+# V4.1: Pooled keep-alive HTTP session for Podio (connection pool sizes, timeouts in seconds)
+PODIO_HTTP_POOL_CONNECTIONS = int(os.environ.get('PODIO_HTTP_POOL_CONNECTIONS', '4'))
+PODIO_HTTP_POOL_MAXSIZE = int(os.environ.get('PODIO_HTTP_POOL_MAXSIZE', '16'))
+PODIO_HTTP_CONNECT_TIMEOUT = float(os.environ.get('PODIO_HTTP_CONNECT_TIMEOUT', '3.05'))
+PODIO_HTTP_READ_TIMEOUT = float(os.environ.get('PODIO_HTTP_READ_TIMEOUT', '20'))
+
+# V4.1: Master Lead item cache (TTL + LRU, optional stale-while-revalidate window
+# in seconds - off by default, so no entry older than the TTL is served)
+PODIO_ITEM_CACHE_ENABLED = os.environ.get('PODIO_ITEM_CACHE_ENABLED', 'true').lower() == 'true'
+PODIO_ITEM_CACHE_MAX_ENTRIES = int(os.environ.get('PODIO_ITEM_CACHE_MAX_ENTRIES', '500'))
+PODIO_ITEM_CACHE_TTL_SECONDS = int(os.environ.get('PODIO_ITEM_CACHE_TTL_SECONDS', '120'))
+PODIO_ITEM_CACHE_STALE_SECONDS = int(os.environ.get('PODIO_ITEM_CACHE_STALE_SECONDS', '0'))
+
+# V4.1: Podio hook IDs registered for /podio_hook (comma-separated). Only
+# these are verified in the hook.verify handshake
+PODIO_HOOK_IDS = frozenset(
+    hook_id.strip() for hook_id in os.environ.get('PODIO_HOOK_IDS', '').split(',') if hook_id.strip()
+)
+
+# V4.1: Maximum item IDs accepted by POST /api/leads/batch (fetched in pages of 500)
+LEAD_BATCH_MAX_ITEMS = int(os.environ.get('LEAD_BATCH_MAX_ITEMS', '1000'))
+
+# V4.1: Podio rate governor (hourly quota, share reserved for agent traffic,
+# background pacing, 420/429 backoff cap, max seconds an agent request waits for quota)
+PODIO_RATE_LIMIT_PER_HOUR = int(os.environ.get('PODIO_RATE_LIMIT_PER_HOUR', '5000'))
+PODIO_RATE_INTERACTIVE_RESERVE = float(os.environ.get('PODIO_RATE_INTERACTIVE_RESERVE', '0.1'))
+PODIO_RATE_BACKGROUND_PER_SECOND = float(os.environ.get('PODIO_RATE_BACKGROUND_PER_SECOND', '5'))
+PODIO_RATE_MAX_BACKOFF_SECONDS = float(os.environ.get('PODIO_RATE_MAX_BACKOFF_SECONDS', '60'))
+PODIO_RATE_INTERACTIVE_MAX_WAIT_SECONDS = float(os.environ.get('PODIO_RATE_INTERACTIVE_MAX_WAIT_SECONDS', '5'))
+
 # Podio Field IDs - V2.0 Agent Workspace Schema
 DISPOSITION_CODE_FIELD_ID = 274851083
 AGENT_NOTES_FIELD_ID = 274851084
@@ -199,10 +264,102 @@ TASK_TYPE_FIELD_ID = os.environ.get('TASK_TYPE_FIELD_ID', 'TASK_TYPE_FIELD_ID_HE
 TASK_DUE_DATE_FIELD_ID = os.environ.get('TASK_DUE_DATE_FIELD_ID', 'TASK_DUE_DATE_FIELD_ID_HERE')
 TASK_MASTER_LEAD_RELATIONSHIP_FIELD_ID = os.environ.get('TASK_MASTER_LEAD_RELATIONSHIP_FIELD_ID', 'TASK_MASTER_LEAD_RELATIONSHIP_FIELD_ID_HERE')
 
+# ============================================================================
+# CONCURRENCY CONFIGURATION (V4.1)
+# ============================================================================
+
+# Bounded thread pool for concurrent side effects (e.g. /submit_call_data fan-out)
+FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', '8'))
+
+# /submit_call_data write mode: 'sync' (default, write to Podio before responding) or
+# 'outbox' (persist, answer 202, write in the background). Outbox mode should use Firestore
+# and a scheduler calling /api/outbox/drain: Vercel may freeze the background thread
+DISPOSITION_WRITE_MODE = os.environ.get('DISPOSITION_WRITE_MODE', 'sync')
+
+# Disposition outbox store ('firestore', 'sqlite' or 'memory'; unset = Firestore if available)
+OUTBOX_STORE = os.environ.get('OUTBOX_STORE')
+OUTBOX_STORE_PATH = os.environ.get('OUTBOX_STORE_PATH', '/tmp/disposition_outbox.sqlite3')
+
+# Outbox retries (attempts before an entry is marked failed, backoff bounds and
+# worker lease in seconds) and the bearer token required by /api/outbox/drain (the
+# route answers 403 while it is unset)
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_RETRY_BASE_SECONDS = float(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', '15'))
+OUTBOX_RETRY_MAX_SECONDS = float(os.environ.get('OUTBOX_RETRY_MAX_SECONDS', '1800'))
+OUTBOX_LEASE_SECONDS = float(os.environ.get('OUTBOX_LEASE_SECONDS', '120'))
+OUTBOX_DRAIN_TOKEN = os.environ.get('OUTBOX_DRAIN_TOKEN')
+
+# /submit_call_data idempotency keys ('firestore', 'sqlite' or 'memory'; unset = Firestore
+# if available), how long responses are replayed and how long an in-flight claim is honored
+IDEMPOTENCY_STORE = os.environ.get('IDEMPOTENCY_STORE')
+IDEMPOTENCY_STORE_PATH = os.environ.get('IDEMPOTENCY_STORE_PATH', '/tmp/idempotency_keys.sqlite3')
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '60'))
+
+# Twilio callbacks (/call_status, /recording_status): 'inline' (default, process before
+# answering) or 'queue' (validate, persist, answer 200, process in the background). Queue
+# mode should use Firestore and needs a scheduler calling /api/webhooks/drain
+WEBHOOK_INGEST_MODE = os.environ.get('WEBHOOK_INGEST_MODE', 'inline')
+
+# Webhook queue store ('firestore', 'sqlite' or 'memory'; unset = Firestore if available)
+WEBHOOK_QUEUE_STORE = os.environ.get('WEBHOOK_QUEUE_STORE')
+WEBHOOK_QUEUE_STORE_PATH = os.environ.get('WEBHOOK_QUEUE_STORE_PATH', '/tmp/webhook_queue.sqlite3')
+
+# Webhook processing retries (attempts before dead-lettering, backoff bounds and
+# worker lease in seconds) and the bearer token for /api/webhooks/* (default: OUTBOX_DRAIN_TOKEN;
+# the routes answer 403 while neither is set)
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', '6'))
+WEBHOOK_RETRY_BASE_SECONDS = float(os.environ.get('WEBHOOK_RETRY_BASE_SECONDS', '5'))
+WEBHOOK_RETRY_MAX_SECONDS = float(os.environ.get('WEBHOOK_RETRY_MAX_SECONDS', '600'))
+WEBHOOK_LEASE_SECONDS = float(os.environ.get('WEBHOOK_LEASE_SECONDS', '60'))
+WEBHOOK_ADMIN_TOKEN = os.environ.get('WEBHOOK_ADMIN_TOKEN') or OUTBOX_DRAIN_TOKEN
+
+# Reject Twilio callbacks without a valid X-Twilio-Signature (default: on; uses
+# TWILIO_AUTH_TOKEN and the public URL Twilio calls - set WEBHOOK_PUBLIC_BASE_URL behind
+# a rewriting proxy). Only turn off for local testing without Twilio
+WEBHOOK_VALIDATE_SIGNATURE = os.environ.get('WEBHOOK_VALIDATE_SIGNATURE', 'true').lower() == 'true'
+WEBHOOK_PUBLIC_BASE_URL = os.environ.get('WEBHOOK_PUBLIC_BASE_URL')
+
+# Drop Twilio redeliveries of a callback: per-instance LRU of recent delivery keys
+# (entries) backed by the webhook queue store, remembered for this many seconds
+WEBHOOK_DEDUP_ENABLED = os.environ.get('WEBHOOK_DEDUP_ENABLED', 'true').lower() == 'true'
+WEBHOOK_DEDUP_CACHE_SIZE = int(os.environ.get('WEBHOOK_DEDUP_CACHE_SIZE', '10000'))
+WEBHOOK_DEDUP_TTL_SECONDS = int(os.environ.get('WEBHOOK_DEDUP_TTL_SECONDS', '86400'))
+
+# /play_recording cache: whole MP3s kept on local disk (per instance, /tmp on Vercel)
+# within a byte budget, least recently played evicted first; concurrent first plays
+# wait this many seconds for the single download before falling back to proxying
+RECORDING_CACHE_ENABLED = os.environ.get('RECORDING_CACHE_ENABLED', 'true').lower() == 'true'
+RECORDING_CACHE_BACKEND = os.environ.get('RECORDING_CACHE_BACKEND', 'disk')
+RECORDING_CACHE_DIR = os.environ.get('RECORDING_CACHE_DIR', '/tmp/recording_cache')
+RECORDING_CACHE_MAX_BYTES = int(os.environ.get('RECORDING_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+RECORDING_CACHE_FILL_TIMEOUT_SECONDS = float(os.environ.get('RECORDING_CACHE_FILL_TIMEOUT_SECONDS', '30'))
+
+# /play_recording delivery: 'proxy' (stream through this function, using the cache above)
+# or 'redirect' (302 to Twilio's short-lived pre-signed media URL, proxy as fallback);
+# signed URLs are reused for this many seconds
+RECORDING_DELIVERY_MODE = os.environ.get('RECORDING_DELIVERY_MODE', 'proxy')
+RECORDING_REDIRECT_TTL_SECONDS = float(os.environ.get('RECORDING_REDIRECT_TTL_SECONDS', '60'))
+
+# Recording archive (scripts/reconcile_recordings.py): where archived MP3s are kept
+# ('disk': one file per recording under RECORDING_ARCHIVE_DIR)
+RECORDING_ARCHIVE_BACKEND = os.environ.get('RECORDING_ARCHIVE_BACKEND', 'disk')
+RECORDING_ARCHIVE_DIR = os.environ.get('RECORDING_ARCHIVE_DIR', 'recording_archive')
+
 # ============================================================================
 # FIREBASE/FIRESTORE CONFIGURATION
 # ============================================================================
 
+# V4.1: Also read call_logs / call_sid_mappings when a call has no call_sessions
+# record (turn off once scripts/backfill_call_sessions.py has run)
+CALL_SESSION_LEGACY_FALLBACK = os.environ.get('CALL_SESSION_LEGACY_FALLBACK', 'true').lower() == 'true'
+
+# V4.1: Firestore write buffer - status callbacks are 'buffered' (committed by size,
+# age in seconds, or at request end) or 'sync'; audit writes are always synchronous
+FIRESTORE_STATUS_DURABILITY = os.environ.get('FIRESTORE_STATUS_DURABILITY', 'buffered').lower()
+FIRESTORE_WRITE_BUFFER_MAX_OPS = int(os.environ.get('FIRESTORE_WRITE_BUFFER_MAX_OPS', '50'))
+FIRESTORE_WRITE_BUFFER_MAX_AGE_SECONDS = float(os.environ.get('FIRESTORE_WRITE_BUFFER_MAX_AGE_SECONDS', '2'))
+
 GCP_SERVICE_ACCOUNT_JSON = os.environ.get('GCP_SERVICE_ACCOUNT_JSON')
 
 # Initialize Firestore client
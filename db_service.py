@@ -5,15 +5,364 @@ This module handles:
 - Call disposition logging to Firestore
 - Call status logging
 - Audit trail creation
+
+V4.1: One document per call. Everything about a call - status history,
+duration, recording metadata, Podio item IDs and the disposition - lives in
+call_sessions/{CallSid}, so every lookup is a single document get instead of
+a where('CallSid', '==') query across call_logs, call_sid_mappings and
+disposition_logs. Child legs (prospect calls created by <Dial>) point to
+their parent with 'parent_call_sid'; recordings and Podio IDs are kept on
+the parent (agent) session.
+
+call_sessions/{CallSid}:
+    call_sid, parent_call_sid, child_call_sids
+    direction, from, to
+    last_status, final_status, status_history [{status, at}], call_duration, ended_at
+    recording {recording_sid, recording_url, recording_duration, podio_synced_item_id}
+    master_lead_item_id, podio_item_id (Call Activity)
+    disposition {disposition_code, agent_notes, motivation_level, next_action_date, asking_price}
+
+Calls without a session (logged before V4.1) are read from the legacy
+collections while CALL_SESSION_LEGACY_FALLBACK is on (see
+scripts/backfill_call_sessions.py).
+
+V4.1: Writes go through a process-wide WriteBuffer that commits them in
+Firestore WriteBatches. Audit data (dispositions, Podio mappings, recording
+metadata) is written synchronously - anything already buffered is flushed
+first, then the write is committed on its own and the call returns its
+result. Status telemetry is buffered and committed by size, by age, or when
+the Flask request ends; failed batches are retried with the next flush.
 """
 
+import threading
+import time
+
 from firebase_admin import firestore
-from config import db
+from config import (
+    db,
+    CALL_SESSION_LEGACY_FALLBACK,
+    FIRESTORE_STATUS_DURABILITY,
+    FIRESTORE_WRITE_BUFFER_MAX_OPS,
+    FIRESTORE_WRITE_BUFFER_MAX_AGE_SECONDS
+)
+
+CALL_SESSIONS_COLLECTION = 'call_sessions'
+
+# Default for "session not loaded yet" (None means "loaded, no session exists")
+_NOT_LOADED = object()
+
+# Twilio CallStatus values after which the call will not change again
+TERMINAL_CALL_STATUSES = ('completed', 'busy', 'no-answer', 'failed', 'canceled')
+
+# ============================================================================
+# WRITE BUFFER (V4.1)
+# ============================================================================
+
+# Durability modes
+DURABILITY_SYNC = 'sync'  # Committed before the write call returns
+DURABILITY_BUFFERED = 'buffered'  # Committed by size, age or request end
+
+# Firestore limit on writes per batch
+FIRESTORE_BATCH_LIMIT = 500
+
+# Commit attempts for a buffered write before it is dropped
+WRITE_BUFFER_MAX_ATTEMPTS = 3
+
+class WriteBuffer:
+    """
+    Coalesces buffered Firestore set() calls into WriteBatch commits.
+    
+    Buffered writes are flushed when max_ops are queued, when the oldest is
+    max_age_seconds old (timer), or when flush() is called at request end.
+    A failed batch is re-queued and retried with the next flush, up to
+    WRITE_BUFFER_MAX_ATTEMPTS commits, before its writes are dropped.
+    
+    A synchronous write first flushes what is queued (keeping the write
+    order), then is committed on its own, so its result is exactly whether
+    that write reached Firestore - a failing telemetry write can never fail
+    an audit write, and a concurrent flush can never take it.
+    
+    Args:
+        firestore_db: Firestore client
+        max_ops: Queue length that triggers a flush
+        max_age_seconds: Maximum time a buffered write waits
+    """
+    
+    def __init__(self, firestore_db, max_ops=50, max_age_seconds=2.0):
+        self._db = firestore_db
+        self.max_ops = max_ops
+        self.max_age_seconds = max_age_seconds
+        self._ops = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._stats = {
+            'sync_writes': 0,
+            'buffered_writes': 0,
+            'commits': 0,
+            'committed_writes': 0,
+            'failed_commits': 0,
+            'requeued_writes': 0,
+            'dropped_writes': 0,
+        }
+    
+    def _start_timer(self):
+        """Schedule an age flush if none is pending (lock held)."""
+        if self._timer is None and self._ops:
+            self._timer = threading.Timer(self.max_age_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def set(self, doc_ref, data, merge=False, durability=DURABILITY_SYNC):
+        """
+        Write a document (sync) or queue the write (buffered).
+        
+        Returns:
+            bool: Sync - True if this write was committed; buffered - True once queued
+        """
+        if durability == DURABILITY_SYNC:
+            with self._flush_lock:
+                self._flush_locked()
+                with self._lock:
+                    self._stats['sync_writes'] += 1
+                try:
+                    doc_ref.set(data, merge=merge)
+                except Exception as e:
+                    with self._lock:
+                        self._stats['failed_commits'] += 1
+                    print(f"Error committing Firestore write: {e}")
+                    return False
+                with self._lock:
+                    self._stats['commits'] += 1
+                    self._stats['committed_writes'] += 1
+                return True
+        
+        with self._lock:
+            self._ops.append((doc_ref, data, merge, 0))
+            self._stats['buffered_writes'] += 1
+            full = len(self._ops) >= self.max_ops
+            if not full:
+                self._start_timer()
+        
+        if full:
+            self.flush()
+        return True
+    
+    def flush(self):
+        """
+        Commit everything queued (in batches of up to 500 writes).
+        
+        Returns:
+            bool: True if all commits succeeded (or nothing was queued)
+        """
+        with self._flush_lock:
+            return self._flush_locked()
+    
+    def _flush_locked(self):
+        """flush() body (flush lock held)."""
+        with self._lock:
+            ops, self._ops = self._ops, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        
+        ok = True
+        retry = []
+        for start in range(0, len(ops), FIRESTORE_BATCH_LIMIT):
+            chunk = ops[start:start + FIRESTORE_BATCH_LIMIT]
+            try:
+                batch = self._db.batch()
+                for doc_ref, data, merge, _attempts in chunk:
+                    batch.set(doc_ref, data, merge=merge)
+                batch.commit()
+                with self._lock:
+                    self._stats['commits'] += 1
+                    self._stats['committed_writes'] += len(chunk)
+            except Exception as e:
+                ok = False
+                print(f"Error committing Firestore write batch ({len(chunk)} writes): {e}")
+                with self._lock:
+                    self._stats['failed_commits'] += 1
+                for doc_ref, data, merge, attempts in chunk:
+                    if attempts + 1 < WRITE_BUFFER_MAX_ATTEMPTS:
+                        retry.append((doc_ref, data, merge, attempts + 1))
+                with self._lock:
+                    self._stats['requeued_writes'] += len(retry)
+                    self._stats['dropped_writes'] += len(chunk) - len(retry)
+        
+        if retry:
+            # Ahead of writes queued meanwhile, so the write order is kept
+            with self._lock:
+                self._ops = retry + self._ops
+                self._start_timer()
+        return ok
+    
+    def stats(self):
+        """Counters plus the current queue length."""
+        with self._lock:
+            return {**self._stats, 'pending_writes': len(self._ops)}
+
+_write_buffer = WriteBuffer(
+    db,
+    max_ops=FIRESTORE_WRITE_BUFFER_MAX_OPS,
+    max_age_seconds=FIRESTORE_WRITE_BUFFER_MAX_AGE_SECONDS
+) if db else None
+
+def flush_write_buffer():
+    """
+    Commit buffered writes (called when a Flask request ends)
+    
+    Returns:
+        bool: True if everything was committed
+    """
+    return _write_buffer.flush() if _write_buffer else True
+
+def get_write_buffer_stats():
+    """Write buffer counters for /api/metrics (None when Firestore is unavailable)."""
+    return _write_buffer.stats() if _write_buffer else None
+
+# ============================================================================
+# CALL SESSION RECORD (V4.1)
+# ============================================================================
+
+def _session_ref(call_sid):
+    return db.collection(CALL_SESSIONS_COLLECTION).document(call_sid)
+
+def update_call_session(call_sid, fields, durability=DURABILITY_SYNC):
+    """
+    Merge fields into the call session record (creating it if needed)
+    
+    Args:
+        call_sid: Twilio Call SID (document ID)
+        fields: Fields to set; nested dicts are merged, Firestore sentinels allowed
+        durability: DURABILITY_SYNC (audit data) or DURABILITY_BUFFERED (telemetry)
+        
+    Returns:
+        bool: True if stored (sync) or queued (buffered), False otherwise
+    """
+    if not db or not call_sid:
+        return False
+    
+    try:
+        return _write_buffer.set(_session_ref(call_sid), {
+            'call_sid': call_sid,
+            **fields,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }, merge=True, durability=durability)
+    except Exception as e:
+        print(f"Error updating call session {call_sid}: {e}")
+        return False
+
+def get_call_session(call_sid):
+    """
+    Retrieve the per-call session record
+    
+    Args:
+        call_sid: Twilio Call SID
+        
+    Returns:
+        dict: Session record ('last_status', 'final_status', 'call_duration', ...), or None if not found
+    """
+    if not db or not call_sid:
+        return None
+    
+    try:
+        doc = _session_ref(call_sid).get()
+        return doc.to_dict() if doc.exists else None
+    except Exception as e:
+        print(f"Error retrieving call session: {e}")
+        return None
+
+def link_child_call(parent_call_sid, child_call_sid, master_lead_item_id=None, durability=DURABILITY_BUFFERED):
+    """
+    Link a child leg (prospect call created by <Dial>) to its parent session
+    
+    Args:
+        parent_call_sid: Agent leg Call SID (from /dial)
+        child_call_sid: Prospect leg Call SID
+        master_lead_item_id: Master Lead item ID to store on the parent, if known
+        durability: DURABILITY_BUFFERED (default: committed with the next
+                    synchronous write) or DURABILITY_SYNC
+
+    Returns:
+        bool: True if both sides were stored, False otherwise
+    """
+    if not parent_call_sid or not child_call_sid or parent_call_sid == child_call_sid:
+        return False
+    parent_fields = {'child_call_sids': firestore.ArrayUnion([child_call_sid])}
+    if master_lead_item_id:
+        parent_fields['master_lead_item_id'] = master_lead_item_id
+    # Buffered by default: committed with the next synchronous write (e.g. the recording metadata)
+    child_stored = update_call_session(child_call_sid, {'parent_call_sid': parent_call_sid},
+                                       durability=durability)
+    parent_stored = update_call_session(parent_call_sid, parent_fields, durability=durability)
+    return child_stored and parent_stored
+
+def resolve_session_call_sid(call_sid, session=_NOT_LOADED):
+    """
+    Call SID of the session that owns a call's data (the parent for child legs)
+    
+    Args:
+        call_sid: Twilio Call SID from a webhook
+        session: Already loaded session for call_sid (optional)
+        
+    Returns:
+        tuple: (owning Call SID, its session dict or None)
+    """
+    if session is _NOT_LOADED:
+        session = get_call_session(call_sid)
+    parent_call_sid = (session or {}).get('parent_call_sid')
+    if parent_call_sid:
+        return parent_call_sid, get_call_session(parent_call_sid)
+    return call_sid, session
 
 # ============================================================================
 # CALL DISPOSITION LOGGING
 # ============================================================================
 
+def _disposition_fields(data):
+    return {
+        'disposition_code': data.get('disposition_code'),
+        'agent_notes': data.get('agent_notes', ''),
+        'motivation_level': data.get('motivation_level', ''),
+        'next_action_date': data.get('next_action_date', ''),
+        'asking_price': data.get('asking_price', ''),
+    }
+
+def record_call_disposition(data, item_id, call_sid, podio_item_id=None):
+    """
+    V4.1: Store the disposition and Call Activity item ID on the call session (one write)
+    
+    Replaces the separate disposition_logs entry and call_sid_mappings
+    document. Dispositions without a CallSid (manual entries) still go to
+    disposition_logs.
+    
+    Args:
+        data: Call disposition data from agent
+        item_id: Master Lead item ID
+        call_sid: Twilio Call SID (parent/agent leg)
+        podio_item_id: Podio Call Activity item ID, if created
+        
+    Returns:
+        bool: True if stored successfully, False otherwise
+    """
+    if not db:
+        print("Firestore not available, skipping audit log")
+        return False
+    if not call_sid:
+        return log_call_to_firestore(data, item_id, call_sid)
+    
+    fields = {
+        'master_lead_item_id': item_id,
+        'disposition': {**_disposition_fields(data), 'submitted_at': firestore.SERVER_TIMESTAMP}
+    }
+    if podio_item_id:
+        fields['podio_item_id'] = podio_item_id
+    stored = update_call_session(call_sid, fields)
+    if stored:
+        print(f"V4.1: Stored disposition on call session {call_sid} (Call Activity {podio_item_id})")
+    return stored
+
 def log_call_to_firestore(data, item_id, call_sid):
     """
     Log call disposition to Firestore for audit
@@ -25,23 +374,26 @@ def log_call_to_firestore(data, item_id, call_sid):
         
     Returns:
         bool: True if logged successfully, False otherwise
+        
+    Note:
+        V4.1: With a CallSid the disposition is stored on the call session
+        (record_call_disposition); disposition_logs is only used without one.
     """
     if not db:
         print("Firestore not available, skipping audit log")
         return False
+    if call_sid:
+        return record_call_disposition(data, item_id, call_sid)
     
     try:
         log_entry = {
             'item_id': item_id,
             'call_sid': call_sid,
-            'disposition_code': data.get('disposition_code'),
-            'agent_notes': data.get('agent_notes', ''),
-            'motivation_level': data.get('motivation_level', ''),
-            'next_action_date': data.get('next_action_date', ''),
-            'asking_price': data.get('asking_price', ''),
+            **_disposition_fields(data),
             'timestamp': firestore.SERVER_TIMESTAMP
         }
-        db.collection('disposition_logs').add(log_entry)
+        if not _write_buffer.set(db.collection('disposition_logs').document(), log_entry):
+            return False
         print(f"Logged disposition to Firestore for item {item_id}")
         return True
     except Exception as e:
@@ -65,24 +417,18 @@ def store_call_sid_mapping(call_sid, podio_item_id):
         
     Returns:
         bool: True if stored successfully, False otherwise
+        
+    Note:
+        V4.1: Stored as 'podio_item_id' on call_sessions/{call_sid}
     """
     if not db:
         print("Firestore not available, skipping CallSid mapping")
         return False
     
-    try:
-        mapping_entry = {
-            'call_sid': call_sid,
-            'podio_item_id': podio_item_id,
-            'timestamp': firestore.SERVER_TIMESTAMP
-        }
-        # Use call_sid as document ID for direct lookup
-        db.collection('call_sid_mappings').document(call_sid).set(mapping_entry)
+    stored = update_call_session(call_sid, {'podio_item_id': podio_item_id})
+    if stored:
         print(f"Stored CallSid mapping: {call_sid} → Podio Item {podio_item_id}")
-        return True
-    except Exception as e:
-        print(f"Error storing CallSid mapping: {e}")
-        return False
+    return stored
 
 def get_podio_item_id_from_call_sid(call_sid):
     """
@@ -101,8 +447,18 @@ def get_podio_item_id_from_call_sid(call_sid):
         print("Firestore not available, cannot retrieve CallSid mapping")
         return None
     
+    # V4.1: Call session first (follows the child → parent link)
+    _, session = resolve_session_call_sid(call_sid)
+    if session and session.get('podio_item_id'):
+        podio_item_id = session['podio_item_id']
+        print(f"Retrieved mapping: {call_sid} → Podio Item {podio_item_id}")
+        return podio_item_id
+    if session is not None or not CALL_SESSION_LEGACY_FALLBACK:
+        print(f"WARNING: No mapping found for CallSid {call_sid}")
+        return None
+    
     try:
-        # Direct document lookup using call_sid as document ID
+        # Legacy: direct document lookup using call_sid as document ID
         doc_ref = db.collection('call_sid_mappings').document(call_sid)
         doc = doc_ref.get()
         
@@ -123,7 +479,8 @@ def get_podio_item_id_from_call_sid(call_sid):
 # CALL STATUS LOGGING
 # ============================================================================
 
-def log_call_status_to_firestore(call_sid, call_status, direction, from_number, to_number):
+def log_call_status_to_firestore(call_sid, call_status, direction, from_number, to_number, call_duration=None,
+                                 durability=None):
     """
     Log call status updates to Firestore for monitoring
     
@@ -133,35 +490,47 @@ def log_call_status_to_firestore(call_sid, call_status, direction, from_number,
         direction: Call direction
         from_number: Caller phone number
         to_number: Recipient phone number
-        
+        call_duration: CallDuration from the callback (seconds), sent with 'completed'
+        durability: DURABILITY_SYNC or DURABILITY_BUFFERED (default: FIRESTORE_STATUS_DURABILITY)
+
     Returns:
         bool: True if logged successfully, False otherwise
+        
+    Note:
+        V4.1: Written to call_sessions/{call_sid} (one merge per callback)
+        instead of a new call_logs document. The status is appended to
+        'status_history'; final statuses also set 'final_status' and the
+        duration, which /submit_call_data reads instead of asking Twilio.
     """
     if not db:
         print("Firestore client not initialized. Skipping logging.")
         return False
     
-    try:
-        log_entry = {
-            "CallSid": call_sid,
-            "CallStatus": call_status,
-            "Direction": direction,
-            "From": from_number,
-            "To": to_number,
-            "Timestamp": firestore.SERVER_TIMESTAMP
-        }
-        db.collection("call_logs").add(log_entry)
-        print(f"Logged call status for Call SID: {call_sid} to Firestore.")
-        return True
-    except Exception as e:
-        print(f"Error logging to Firestore: {e}")
-        return False
+    fields = {key: value for key, value in (('direction', direction), ('from', from_number), ('to', to_number)) if value}
+    fields.update({
+        'last_status': call_status,
+        'status_history': firestore.ArrayUnion([{'status': call_status, 'at': time.time()}])
+    })
+    if call_status in TERMINAL_CALL_STATUSES:
+        fields['final_status'] = call_status
+        fields['ended_at'] = firestore.SERVER_TIMESTAMP
+    if call_duration not in (None, ''):
+        try:
+            fields['call_duration'] = int(call_duration)
+        except (TypeError, ValueError):
+            print(f"WARNING: Invalid CallDuration value: {call_duration}")
+    
+    # Telemetry: buffered by default (FIRESTORE_STATUS_DURABILITY)
+    logged = update_call_session(call_sid, fields, durability=durability or FIRESTORE_STATUS_DURABILITY)
+    if logged:
+        print(f"Logged call status for Call SID: {call_sid} to Firestore ({call_status}, duration: {call_duration}).")
+    return logged
 
 # ============================================================================
 # RECORDING LOOKUP BY CALLSID (V3.2.5)
 # ============================================================================
 
-def get_recording_by_call_sid(call_sid):
+def get_recording_by_call_sid(call_sid, session=_NOT_LOADED):
     """
     Retrieve recording info from Firestore by CallSid
     
@@ -171,6 +540,8 @@ def get_recording_by_call_sid(call_sid):
     
     Args:
         call_sid: Twilio Call SID
+        session: Already loaded call session for call_sid, or None if it does
+                 not exist (V4.1, optional - loaded when omitted)
         
     Returns:
         dict: Recording metadata if found, None otherwise
@@ -180,8 +551,24 @@ def get_recording_by_call_sid(call_sid):
         print("Firestore not available, cannot retrieve recording")
         return None
     
+    # V4.1: Recording metadata lives on the call session
+    if session is _NOT_LOADED:
+        session = get_call_session(call_sid)
+    recording = (session or {}).get('recording')
+    if recording and recording.get('recording_sid') and recording.get('recording_url'):
+        print(f"V3.2.5: Found existing recording for CallSid {call_sid}")
+        return {
+            'recording_sid': recording['recording_sid'],
+            'recording_url': recording['recording_url'],
+            'recording_duration': recording.get('recording_duration', 0)
+        }
+    if session is not None or not CALL_SESSION_LEGACY_FALLBACK:
+        # Calls with a session never wrote to the legacy collections
+        print(f"V3.2.5: No recording found yet for CallSid {call_sid}")
+        return None
+    
     try:
-        # Query for call log entry with matching CallSid
+        # Legacy: query call_logs written before V4.1
         call_logs_ref = db.collection('call_logs')
         query = call_logs_ref.where('CallSid', '==', call_sid).limit(1)
         docs = query.stream()
@@ -215,7 +602,7 @@ def update_call_recording_metadata(call_sid, recording_sid, recording_url, recor
     Update existing call log with recording metadata
     
     Args:
-        call_sid: Twilio Call SID (used to locate existing log)
+        call_sid: Twilio Call SID (the session that owns the call - the parent for <Dial> legs)
         recording_sid: Unique recording identifier
         recording_url: URL to access/download the recording (from Twilio)
         recording_duration: Length of recording in seconds
@@ -223,45 +610,53 @@ def update_call_recording_metadata(call_sid, recording_sid, recording_url, recor
         
     Returns:
         bool: True if updated successfully, False otherwise
+        
+    Note:
+        V4.1: Stored as 'recording' on call_sessions/{call_sid} with one
+        merge; no query for an existing call log is needed.
     """
     if not db:
         print("Firestore not available, skipping recording metadata update")
         return False
     
-    try:
-        # Query for call log entry with matching CallSid
-        call_logs_ref = db.collection('call_logs')
-        query = call_logs_ref.where('CallSid', '==', call_sid).limit(1)
-        docs = query.stream()
-        
-        # Create proxy URL that points to OUR endpoint (authentication-free playback)
-        # Instead of storing Twilio's URL, store our proxy endpoint URL
-        if base_url:
-            media_url = f"{base_url}/play_recording/{recording_sid}"
-        else:
-            # Fallback to localhost if base_url not provided
-            media_url = f"http://localhost:5000/play_recording/{recording_sid}"
-        
-        # Update the first matching document
-        updated = False
-        for doc in docs:
-            doc.reference.update({
-                'RecordingSid': recording_sid,
-                'RecordingUrl': media_url,  # Now points to OUR proxy endpoint
-                'RecordingDuration': recording_duration,
-                'RecordingTimestamp': firestore.SERVER_TIMESTAMP
-            })
-            print(f"Updated call log {doc.id} with recording metadata for CallSid {call_sid}")
-            print(f"Proxy URL: {media_url}")
-            updated = True
-            break
-        
-        if not updated:
-            print(f"WARNING: No call log found for CallSid {call_sid}")
-            return False
-            
-        return True
+    # Create proxy URL that points to OUR endpoint (authentication-free playback)
+    # Instead of storing Twilio's URL, store our proxy endpoint URL
+    if base_url:
+        media_url = f"{base_url}/play_recording/{recording_sid}"
+    else:
+        # Fallback to localhost if base_url not provided
+        media_url = f"http://localhost:5000/play_recording/{recording_sid}"
+    
+    updated = update_call_session(call_sid, {
+        'recording': {
+            'recording_sid': recording_sid,
+            'recording_url': media_url,  # Now points to OUR proxy endpoint
+            'recording_duration': recording_duration,
+            'recorded_at': firestore.SERVER_TIMESTAMP
+        }
+    })
+    if updated:
+        print(f"Updated call session {call_sid} with recording metadata")
+        print(f"Proxy URL: {media_url}")
+    return updated
+
+def mark_recording_podio_synced(call_sid, podio_item_id, durability=DURABILITY_BUFFERED):
+    """
+    Remember that the session's recording URL reached its Podio Call Activity
+    
+    Args:
+        call_sid: Twilio Call SID of the session that owns the recording
+        podio_item_id: Call Activity item ID whose RECORDING_URL field was set
+        durability: DURABILITY_BUFFERED (default) or DURABILITY_SYNC
+
+    Returns:
+        bool: True if stored (or queued), False otherwise
         
-    except Exception as e:
-        print(f"Error updating call log with recording metadata: {e}")
-        return False
\ No newline at end of file
+    Note:
+        V4.1: Lets scripts/reconcile_recordings.py skip recordings that are
+        already linked in Podio. Buffered by default - committed with the
+        next flush.
+    """
+    return update_call_session(call_sid, {
+        'recording': {'podio_synced_item_id': podio_item_id}
+    }, durability=durability)
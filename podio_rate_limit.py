@@ -0,0 +1,344 @@
+"""
+Podio Rate Governor - Header-Driven Token Bucket with Priorities
+
+Podio enforces per-user hourly quotas (5,000 requests/hour, 1,000/hour for
+rate-limited operations) and answers 420 (or 429) once a quota is spent.
+The governor keeps Podio traffic under that limit instead of discovering it:
+
+    - Token bucket sized to the hourly limit, refilled continuously
+    - Re-synced from X-Rate-Limit-Limit / X-Rate-Limit-Remaining on every
+      response, so traffic from other instances and scripts is accounted for
+    - Two priorities: interactive (agent requests) and background (cache
+      refreshes, bulk scripts). Background work leaves a reserve of the quota
+      untouched, is paced to a fixed rate, and yields while interactive
+      callers are waiting
+    - On 420/429 all callers pause (Retry-After or exponential backoff with
+      full jitter) and the request is retried
+
+This module lives outside the services package and only depends on the
+standard library and requests: importing services.* loads config.py, which
+needs Twilio and Firebase credentials, while scripts/ only have Podio ones.
+Scripts send their Podio calls through podio_request().
+
+Business Justification:
+    Pillar 5 (Scalability): Bulk jobs can no longer exhaust the quota that
+                            agents need to load leads and log calls
+
+Used By:
+    - services.podio.client (all app Podio API calls, via services.podio.rate_limit)
+    - services.podio.item_service (background revalidation runs at background priority)
+    - scripts/ (podio_request: OAuth, schema checks, listings, field setup, bulk deletions)
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import requests
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKGROUND = 'background'
+
+# Podio answers 420 when the hourly quota is exhausted (429 handled the same way)
+RATE_LIMITED_STATUS_CODES = (420, 429)
+
+# Podio's documented general limit (requests per hour per user)
+DEFAULT_RATE_LIMIT_PER_HOUR = 5000
+
+_current_priority = ContextVar('podio_request_priority', default=PRIORITY_INTERACTIVE)
+
+
+def get_request_priority():
+    """Priority for Podio calls made from the current context (default interactive)."""
+    return _current_priority.get()
+
+
+@contextmanager
+def podio_priority(priority):
+    """
+    Run Podio calls inside the block at the given priority.
+
+    Example:
+        >>> with podio_priority(PRIORITY_BACKGROUND):
+        ...     refresh_cached_items()
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateGovernor:
+    """
+    Thread-safe token bucket for one Podio user's quota.
+
+    Args:
+        limit_per_hour: Hourly request quota until a response header says otherwise
+        interactive_reserve: Fraction of the quota background callers may not use
+        background_per_second: Maximum background request rate (None = unpaced)
+        max_backoff_seconds: Cap for exponential backoff after 420/429
+        base_backoff_seconds: First backoff step
+    """
+
+    def __init__(self, limit_per_hour=DEFAULT_RATE_LIMIT_PER_HOUR, interactive_reserve=0.1,
+                 background_per_second=5.0, max_backoff_seconds=60.0, base_backoff_seconds=1.0):
+        self.interactive_reserve = interactive_reserve
+        self.background_interval = 1.0 / background_per_second if background_per_second else 0.0
+        self.max_backoff_seconds = max_backoff_seconds
+        self.base_backoff_seconds = base_backoff_seconds
+
+        self._limit = limit_per_hour
+        self._tokens = float(limit_per_hour)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._next_background_at = 0.0
+        self._interactive_waiting = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'interactive_requests': 0,
+            'background_requests': 0,
+            'rate_limited_responses': 0,
+            'throttled_waits': 0,
+            'wait_seconds': 0.0,
+            'acquire_timeouts': 0,
+        }
+        self._last_remaining = None
+
+    # ------------------------------------------------------------------
+    # Bucket bookkeeping (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._tokens = min(float(self._limit), self._tokens + elapsed * self._limit / 3600.0)
+            self._refilled_at = now
+
+    def _reserve(self):
+        return self._limit * self.interactive_reserve
+
+    def _wait_time(self, priority, now):
+        """Seconds until a request at this priority may go (0 = now)."""
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        needed = 1.0
+        if priority == PRIORITY_BACKGROUND:
+            if self._interactive_waiting:
+                return 0.05
+            needed += self._reserve()
+            if now < self._next_background_at:
+                return self._next_background_at - now
+
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) * 3600.0 / self._limit
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def acquire(self, priority=None, timeout=None):
+        """
+        Block until a request may be sent, then consume one token.
+
+        Args:
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+                      (default: priority of the current context)
+            timeout: Maximum seconds to wait (None = wait as long as needed)
+
+        Returns:
+            bool: True if a token was taken, False if the timeout expired
+        """
+        priority = priority or get_request_priority()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+
+        with self._condition:
+            if priority == PRIORITY_INTERACTIVE:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(priority, now)
+                    if wait <= 0:
+                        break
+                    if deadline is not None:
+                        if now >= deadline:
+                            self._stats['acquire_timeouts'] += 1
+                            return False
+                        wait = min(wait, deadline - now)
+                    if not waited:
+                        self._stats['throttled_waits'] += 1
+                    self._condition.wait(wait)
+                    waited += time.monotonic() - now
+
+                self._tokens -= 1.0
+                if priority == PRIORITY_BACKGROUND:
+                    self._next_background_at = max(now, self._next_background_at) + self.background_interval
+                self._stats[f'{priority}_requests'] += 1
+                self._stats['wait_seconds'] += waited
+                return True
+            finally:
+                if priority == PRIORITY_INTERACTIVE:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+
+    def observe(self, response):
+        """
+        Re-sync the bucket from Podio's rate-limit headers.
+
+        Args:
+            response: requests.Response (or anything with .headers)
+        """
+        headers = getattr(response, 'headers', None) or {}
+        limit = _header_int(headers, 'X-Rate-Limit-Limit')
+        remaining = _header_int(headers, 'X-Rate-Limit-Remaining')
+        if limit is None and remaining is None:
+            return
+
+        with self._condition:
+            self._refill(time.monotonic())
+            if limit:
+                self._limit = limit
+            if remaining is not None:
+                # The server's count includes every client on this Podio user
+                self._tokens = float(min(remaining, self._limit))
+                self._last_remaining = remaining
+            self._condition.notify_all()
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Delay before retrying a rate-limited request.
+
+        Args:
+            attempt: 0-based retry number
+            retry_after: Server-provided Retry-After in seconds, if any
+
+        Returns:
+            float: Seconds to wait (Retry-After, else full-jitter exponential backoff)
+        """
+        if retry_after is not None:
+            return min(float(retry_after), self.max_backoff_seconds) + random.uniform(0, self.base_backoff_seconds)
+        ceiling = min(self.max_backoff_seconds, self.base_backoff_seconds * (2 ** attempt))
+        return random.uniform(self.base_backoff_seconds / 2, ceiling)
+
+    def rate_limited(self, response, attempt):
+        """
+        Record a 420/429 and pause every caller.
+
+        Returns:
+            float: Seconds the governor is paused
+        """
+        retry_after = _header_int(getattr(response, 'headers', None) or {}, 'Retry-After')
+        delay = self.backoff_delay(attempt, retry_after)
+        with self._condition:
+            self._stats['rate_limited_responses'] += 1
+            # Quota is spent: allow a single probe once the pause ends, then
+            # let the probe's headers re-sync the bucket
+            self._tokens = 1.0
+            self._refilled_at = time.monotonic()
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._condition.notify_all()
+        print(f"V4.1: Podio rate limit hit (HTTP {response.status_code}) - pausing {delay:.1f}s")
+        return delay
+
+    def call(self, send, priority=None, max_attempts=4, acquire_timeout=None):
+        """
+        Send a request under the governor, retrying on 420/429.
+
+        Args:
+            send: Zero-argument callable returning a requests.Response
+            priority: Request priority (default: current context)
+            max_attempts: Total attempts including retries
+            acquire_timeout: Maximum seconds to wait for a token per attempt;
+                             on timeout the request is sent anyway (Podio stays authoritative)
+
+        Returns:
+            requests.Response: Final response (may still be 420/429 after max_attempts)
+        """
+        response = None
+        for attempt in range(max_attempts):
+            self.acquire(priority, timeout=acquire_timeout)
+            response = send()
+            self.observe(response)
+            if response.status_code not in RATE_LIMITED_STATUS_CODES:
+                return response
+            if attempt + 1 < max_attempts:
+                self.rate_limited(response, attempt)
+        return response
+
+    def stats(self):
+        """
+        Snapshot of governor state and counters.
+
+        Returns:
+            dict: Counters plus current limit, estimated tokens and pause
+        """
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                **self._stats,
+                'wait_seconds': round(self._stats['wait_seconds'], 3),
+                'limit_per_hour': self._limit,
+                'estimated_remaining': int(self._tokens),
+                'last_remaining_header': self._last_remaining,
+                'interactive_reserve': int(self._reserve()),
+                'paused_for_seconds': round(max(0.0, self._paused_until - now), 3),
+            }
+
+
+# Governor shared by podio_request() calls in one script process
+_script_governor = None
+_script_governor_lock = threading.Lock()
+
+
+def get_script_governor():
+    """
+    Get the governor used by podio_request() (created on first use).
+
+    Returns:
+        RateGovernor: Process-wide governor with the default Podio quota
+    """
+    global _script_governor
+
+    if _script_governor is None:
+        with _script_governor_lock:
+            if _script_governor is None:
+                _script_governor = RateGovernor()
+    return _script_governor
+
+
+def podio_request(method, url, priority=PRIORITY_BACKGROUND, governor=None, **kwargs):
+    """
+    Send a Podio request (API or OAuth) from a script under the rate governor.
+
+    Args:
+        method: HTTP method ('GET', 'POST', 'PUT', 'DELETE')
+        url: Full Podio URL
+        priority: PRIORITY_BACKGROUND (default: bulk work leaves the agent
+                  reserve untouched) or PRIORITY_INTERACTIVE
+        governor: RateGovernor to use (default: get_script_governor())
+        **kwargs: Passed to requests.request (headers, json, data, params, timeout)
+
+    Returns:
+        requests.Response: Final response (420/429 are retried with backoff)
+
+    Example:
+        >>> response = podio_request('POST', f'https://api.podio.com/item/app/{app_id}/filter',
+        ...                          headers={'Authorization': f'OAuth2 {token}'}, json={'limit': 500})
+    """
+    governor = governor or get_script_governor()
+    return governor.call(lambda: requests.request(method, url, **kwargs), priority=priority)
@@ -32,6 +32,7 @@ from services.podio.oauth import refresh_podio_token, _podio_token
 # Item CRUD operations
 from services.podio.item_service import (
     get_podio_item,
+    get_podio_items,  # V4.1: Batch fetch via paged app filter
     create_call_activity_item,
     update_call_activity_recording,
     generate_title,
@@ -49,6 +50,7 @@ from services.podio.field_extraction import (
 from services.podio.intelligence import (
     FIELD_BUNDLES,
     get_lead_intelligence,
+    extract_lead_intelligence,
 )
 
 # Task creation (V3.3 disposition automation)
@@ -21,12 +21,14 @@ NOTE: Field 53 (Stacking Bonus Points) was REMOVED by Advisor as redundant with
 import os
 import sys
 import json
-import requests
 from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Podio calls are paced by the rate governor and retried on 420/429 (V4.1)
+from podio_rate_limit import podio_request
+
 from config import (
     PODIO_CLIENT_ID,
     PODIO_CLIENT_SECRET,
@@ -60,7 +62,8 @@ def refresh_podio_token():
     
     try:
         # Get OAuth token from Podio
-        response = requests.post(
+        response = podio_request(
+            'POST',
             'https://podio.com/oauth/token',
             data={
                 'grant_type': 'password',
@@ -101,7 +104,8 @@ def check_field_exists(token, app_id, field_label):
         dict: Field data if exists, None otherwise
     """
     try:
-        response = requests.get(
+        response = podio_request(
+            'GET',
             f'https://api.podio.com/app/{app_id}',
             headers={
                 'Authorization': f'OAuth2 {token}',
@@ -186,7 +190,8 @@ def create_podio_field(token, app_id, field_config):
         print(f"  📤 API Payload: {json.dumps(payload, indent=2)}")
         
         # Make API request
-        response = requests.post(
+        response = podio_request(
+            'POST',
             f'https://api.podio.com/app/{app_id}/field',
             headers={
                 'Authorization': f'OAuth2 {token}',
@@ -223,7 +228,8 @@ def validate_fields(token, app_id, expected_field_labels):
         bool: True if all fields exist, False otherwise
     """
     try:
-        response = requests.get(
+        response = podio_request(
+            'GET',
             f'https://api.podio.com/app/{app_id}',
             headers={
                 'Authorization': f'OAuth2 {token}',
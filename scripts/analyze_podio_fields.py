@@ -6,9 +6,14 @@ Script to analyze Call Activity App fields and identify duplicates/legacy fields
 import os
 import sys
 import json
-import requests
 from dotenv import load_dotenv
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Podio calls are paced by the rate governor and retried on 420/429 (V4.1)
+from podio_rate_limit import podio_request
+
 # Load environment variables
 load_dotenv()
 
@@ -25,7 +30,8 @@ def get_podio_token():
         raise Exception("Podio credentials not fully configured.")
     
     try:
-        response = requests.post(
+        response = podio_request(
+            'POST',
             'https://podio.com/oauth/token',
             data={
                 'grant_type': 'password',
@@ -46,7 +52,8 @@ def get_podio_token():
 def get_app_fields(access_token, app_id):
     """Get all fields from the app"""
     try:
-        response = requests.get(
+        response = podio_request(
+            'GET',
             f'https://api.podio.com/app/{app_id}',
             headers={
                 'Authorization': f'OAuth2 {access_token}',
@@ -0,0 +1,229 @@
+"""
+Backfill call_sessions from the Pre-V4.1 Firestore Collections
+
+Purpose: V4.1 keeps one document per call in call_sessions/{CallSid}. Calls
+logged before V4.1 are spread over call_logs (one random-ID document per
+status callback), call_sid_mappings and disposition_logs. This script merges
+them into call_sessions so CALL_SESSION_LEGACY_FALLBACK can be turned off.
+
+This script:
+1. Reads call_logs, call_sid_mappings and disposition_logs (with a CallSid)
+2. Groups everything by CallSid into the call_sessions layout
+   (status history, final status, recording, Podio item IDs, disposition)
+3. For calls that already have a call_sessions document, adds only the
+   fields (and nested recording/disposition keys) that document is missing,
+   so data written by V4.1 is never overwritten - unless --overwrite is given
+4. Writes in batches of 400 documents; legacy collections are left untouched
+
+Usage:
+    python scripts/backfill_call_sessions.py --dry-run
+    python scripts/backfill_call_sessions.py
+    python scripts/backfill_call_sessions.py --overwrite
+
+Requires GCP_SERVICE_ACCOUNT_JSON (loaded from .env). Safe to re-run.
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+load_dotenv()
+
+from config import db
+from db_service import CALL_SESSIONS_COLLECTION, TERMINAL_CALL_STATUSES
+
+BATCH_SIZE = 400
+
+
+def _epoch(value):
+    """Firestore timestamp (datetime) -> epoch seconds, None if missing."""
+    return value.timestamp() if hasattr(value, 'timestamp') else None
+
+
+def load_legacy_sessions():
+    """Group the legacy collections by CallSid."""
+    sessions = {}
+
+    def session_for(call_sid):
+        return sessions.setdefault(call_sid, {'call_sid': call_sid, 'status_history': []})
+
+    print("Reading call_logs...")
+    count = 0
+    for doc in db.collection('call_logs').stream():
+        data = doc.to_dict()
+        call_sid = data.get('CallSid')
+        if not call_sid:
+            continue
+        count += 1
+        session = session_for(call_sid)
+        for key, field in (('direction', 'Direction'), ('from', 'From'), ('to', 'To')):
+            if data.get(field):
+                session[key] = data[field]
+        if data.get('CallStatus'):
+            session['status_history'].append({'status': data['CallStatus'], 'at': _epoch(data.get('Timestamp'))})
+        if data.get('RecordingSid') and data.get('RecordingUrl'):
+            session['recording'] = {
+                'recording_sid': data['RecordingSid'],
+                'recording_url': data['RecordingUrl'],
+                'recording_duration': data.get('RecordingDuration', 0),
+                'recorded_at': data.get('RecordingTimestamp'),
+            }
+    print(f"✓ {count} call_logs documents")
+
+    print("Reading call_sid_mappings...")
+    count = 0
+    for doc in db.collection('call_sid_mappings').stream():
+        data = doc.to_dict()
+        if data.get('podio_item_id'):
+            session_for(doc.id)['podio_item_id'] = data['podio_item_id']
+            count += 1
+    print(f"✓ {count} call_sid_mappings documents")
+
+    print("Reading disposition_logs...")
+    count = 0
+    latest = {}
+    for doc in db.collection('disposition_logs').stream():
+        data = doc.to_dict()
+        call_sid = data.get('call_sid')
+        if not call_sid:
+            continue
+        count += 1
+        submitted = _epoch(data.get('timestamp')) or 0
+        if call_sid in latest and latest[call_sid] > submitted:
+            continue
+        latest[call_sid] = submitted
+        session = session_for(call_sid)
+        session['master_lead_item_id'] = data.get('item_id')
+        session['disposition'] = {
+            'disposition_code': data.get('disposition_code'),
+            'agent_notes': data.get('agent_notes', ''),
+            'motivation_level': data.get('motivation_level', ''),
+            'next_action_date': data.get('next_action_date', ''),
+            'asking_price': data.get('asking_price', ''),
+            'submitted_at': data.get('timestamp'),
+        }
+    print(f"✓ {count} disposition_logs documents with a CallSid")
+
+    # Derive last/final status from the ordered history
+    for session in sessions.values():
+        history = sorted(session['status_history'], key=lambda entry: entry['at'] or 0)
+        session['status_history'] = history
+        if history:
+            session['last_status'] = history[-1]['status']
+            final = [entry['status'] for entry in history if entry['status'] in TERMINAL_CALL_STATUSES]
+            if final:
+                session['final_status'] = final[-1]
+        session['backfilled'] = True
+
+    return sessions
+
+
+def missing_fields(legacy, existing):
+    """
+    Legacy fields an existing call_sessions document does not have yet.
+
+    Nested maps (recording, disposition) are compared key by key, so e.g. a
+    session that only holds recording.podio_synced_item_id still receives the
+    legacy recording SID and URL. Fields the document already has are kept.
+
+    Returns:
+        dict: Fields to merge into the document (empty if nothing is missing)
+    """
+    missing = {}
+    for key, value in legacy.items():
+        if key not in existing or existing[key] in (None, '', [], {}):
+            missing[key] = value
+        elif isinstance(value, dict) and isinstance(existing[key], dict):
+            nested = missing_fields(value, existing[key])
+            if nested:
+                missing[key] = nested
+    return missing
+
+
+def plan_writes(sessions, existing, overwrite=False):
+    """
+    Documents to write: full legacy sessions for new calls (and for all calls
+    with overwrite), only the missing fields for calls already in call_sessions.
+
+    Args:
+        sessions: Legacy sessions by CallSid (load_legacy_sessions)
+        existing: Existing call_sessions documents by CallSid
+        overwrite: Merge every legacy field, even ones V4.1 already wrote
+
+    Returns:
+        tuple: (list of (call_sid, fields), count of new sessions,
+                count of existing sessions that were complete already)
+    """
+    writes = []
+    created = 0
+    complete = 0
+    for call_sid, session in sessions.items():
+        if overwrite or call_sid not in existing:
+            writes.append((call_sid, session))
+            created += call_sid not in existing
+            continue
+        fields = missing_fields({key: value for key, value in session.items() if key != 'backfilled'},
+                                existing[call_sid])
+        if fields:
+            fields['backfilled'] = True
+            writes.append((call_sid, fields))
+        else:
+            complete += 1
+    return writes, created, complete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be written')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Merge every legacy field into existing call_sessions documents, not just missing ones')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BACKFILL call_sessions (V4.1)")
+    print("=" * 60)
+
+    if not db:
+        print("❌ ERROR: Firestore is not configured (GCP_SERVICE_ACCOUNT_JSON)")
+        sys.exit(1)
+
+    sessions = load_legacy_sessions()
+
+    print(f"Reading {CALL_SESSIONS_COLLECTION}...")
+    existing = {doc.id: doc.to_dict() or {} for doc in db.collection(CALL_SESSIONS_COLLECTION).stream()}
+    pending, created, complete = plan_writes(sessions, existing, overwrite=args.overwrite)
+
+    print(f"\nCalls found: {len(sessions)}")
+    print(f"Already in {CALL_SESSIONS_COLLECTION}: {len(sessions) - created}")
+    print(f"  complete (nothing to add): {complete}")
+    print(f"To write: {len(pending)} ({created} new, {len(pending) - created} merged into existing)")
+
+    if args.dry_run:
+        for call_sid, fields in pending[:5]:
+            print(f"  {call_sid}: {'new' if call_sid not in existing else 'merge'} {sorted(fields)}")
+        print("\nDry run - nothing written.")
+        return
+
+    collection = db.collection(CALL_SESSIONS_COLLECTION)
+    written = 0
+    for start in range(0, len(pending), BATCH_SIZE):
+        batch = db.batch()
+        for call_sid, fields in pending[start:start + BATCH_SIZE]:
+            batch.set(collection.document(call_sid), fields, merge=True)
+        batch.commit()
+        written += len(pending[start:start + BATCH_SIZE])
+        print(f"  Wrote {written}/{len(pending)}")
+
+    print("\n" + "=" * 60)
+    print(f"✅ Backfilled {written} call sessions")
+    print("Set CALL_SESSION_LEGACY_FALLBACK=false once all instances run V4.1.")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
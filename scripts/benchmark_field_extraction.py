@@ -0,0 +1,219 @@
+"""
+Benchmark: Podio Field Extraction (linear scan vs FieldIndex)
+
+Purpose: Measure per-lead extraction cost before and after the V4.1 FieldIndex.
+The /workspace route plus get_lead_intelligence() perform ~45-55 field lookups
+per lead; the legacy implementation scanned item['fields'] (and recompiled the
+HTML-strip regex) on every lookup.
+
+This script:
+1. Loads real Master Lead payloads (--items) or generates synthetic ~60-field items
+2. Runs the per-lead lookup workload with the legacy linear-scan functions
+3. Runs the same workload with build_field_index() once per lead and with the
+   one-off wrappers (a scan per lookup)
+4. Verifies all three produce identical values and prints timings
+
+Usage:
+    python scripts/benchmark_field_extraction.py
+    python scripts/benchmark_field_extraction.py --items lead_items.json --iterations 2000
+
+    lead_items.json may be a Podio filter response ({"items": [...]}),
+    a list of items, or a single item.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+
+# Load field_extraction.py directly so the benchmark runs without the full
+# app configuration (config.py requires Twilio/Podio credentials at import)
+_MODULE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'services', 'podio', 'field_extraction.py'
+)
+_spec = importlib.util.spec_from_file_location('field_extraction', _MODULE_PATH)
+field_extraction = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(field_extraction)
+
+
+# ============================================================================
+# LEGACY IMPLEMENTATION (pre-V4.1, linear scan per lookup)
+# ============================================================================
+
+def legacy_extract_field_value(item, field_label):
+    for field in item.get('fields', []):
+        if field.get('label') == field_label:
+            values = field.get('values', [])
+            if values:
+                value = values[0]
+                if isinstance(value, dict):
+                    inner_value = value.get('value', '')
+                    if isinstance(inner_value, dict):
+                        text = inner_value.get('text', '')
+                    else:
+                        text = str(inner_value) if inner_value is not None else ''
+                else:
+                    text = str(value)
+                text = re.sub(r'<[^>]+>', '', text)
+                return text.strip()
+    return ''
+
+
+def legacy_extract_field_value_by_id(item, field_id, field_type=None):
+    if not item:
+        return None
+    for field in item.get('fields', []):
+        if field.get('field_id') == int(field_id):
+            # Decoding is unchanged in V4.1 - only the lookup strategy differs
+            return field_extraction._decode_typed_value(field, field_type)
+    return None
+
+
+# ============================================================================
+# SYNTHETIC PAYLOAD
+# ============================================================================
+
+_SYNTHETIC_TYPES = [
+    ('text', lambda i: [{'value': f'<p>Value {i}</p>'}]),
+    ('number', lambda i: [{'value': f'{i * 3}.0000'}]),
+    ('money', lambda i: [{'value': f'{i * 1000}.0000', 'currency': 'USD'}]),
+    ('category', lambda i: [{'value': {'id': i, 'text': f'Option {i}', 'status': 'active'}}]),
+    ('date', lambda i: [{'start': '2025-11-30', 'start_date': '2025-11-30', 'end': None}]),
+    ('phone', lambda i: [{'type': 'home', 'value': f'555000{i:04d}'}]),
+]
+
+
+def build_synthetic_item(item_id, field_count=60):
+    """Build a Master Lead-shaped item with `field_count` populated fields."""
+    fields = []
+    for i in range(field_count):
+        field_type, make_values = _SYNTHETIC_TYPES[i % len(_SYNTHETIC_TYPES)]
+        fields.append({
+            'field_id': 274896000 + i,
+            'external_id': f'field-{i}',
+            'label': f'Field {i}',
+            'type': field_type,
+            'values': make_values(i) if i % 7 else [],  # some empty fields, like real leads
+        })
+    return {'item_id': item_id, 'title': f'Lead {item_id}', 'fields': fields}
+
+
+def load_items(path):
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict) and 'items' in data:
+        return data['items']
+    if isinstance(data, list):
+        return data
+    return [data]
+
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+
+def build_workload(items, id_lookups, label_lookups):
+    """Pick the field IDs and labels a /workspace load would read."""
+    field_ids = []
+    labels = []
+    for field in items[0].get('fields', []):
+        if field.get('field_id') is not None and field['field_id'] not in field_ids:
+            field_ids.append(field['field_id'])
+        if field.get('label') and field['label'] not in labels:
+            labels.append(field['label'])
+    # Spread lookups across the field list (real lookups hit early and late fields)
+    step_ids = max(1, len(field_ids) // max(1, id_lookups))
+    step_labels = max(1, len(labels) // max(1, label_lookups))
+    return field_ids[::step_ids][:id_lookups], labels[::step_labels][:label_lookups]
+
+
+def run_legacy(items, field_ids, labels):
+    results = []
+    for item in items:
+        results.append((
+            [legacy_extract_field_value_by_id(item, fid) for fid in field_ids],
+            [legacy_extract_field_value(item, label) for label in labels],
+        ))
+    return results
+
+
+def run_field_index(items, field_ids, labels):
+    results = []
+    for item in items:
+        index = field_extraction.build_field_index(item)  # once per lead (includes build cost)
+        results.append((
+            [index.value_by_id(fid) for fid in field_ids],
+            [index.value_by_label(label) for label in labels],
+        ))
+    return results
+
+
+def run_wrappers(items, field_ids, labels):
+    results = []
+    for item in items:
+        results.append((
+            [field_extraction.extract_field_value_by_id(item, fid) for fid in field_ids],
+            [field_extraction.extract_field_value(item, label) for label in labels],
+        ))
+    return results
+
+
+def time_it(fn, items, field_ids, labels, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(items, field_ids, labels)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', help='JSON file with real Podio item payload(s)')
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--id-lookups', type=int, default=45, help='Field-ID lookups per lead')
+    parser.add_argument('--label-lookups', type=int, default=11, help='Label lookups per lead')
+    args = parser.parse_args()
+
+    if args.items:
+        items = load_items(args.items)
+        source = args.items
+    else:
+        items = [build_synthetic_item(3200000000 + i) for i in range(10)]
+        source = 'synthetic (60 fields per item)'
+
+    if not items:
+        print("No items to benchmark")
+        sys.exit(1)
+
+    field_ids, labels = build_workload(items, args.id_lookups, args.label_lookups)
+
+    print("=" * 60)
+    print("PODIO FIELD EXTRACTION BENCHMARK")
+    print("=" * 60)
+    print(f"Items: {len(items)} from {source}")
+    print(f"Per-lead workload: {len(field_ids)} ID lookups + {len(labels)} label lookups")
+    print(f"Iterations: {args.iterations}")
+
+    legacy = run_legacy(items, field_ids, labels)
+    if legacy != run_field_index(items, field_ids, labels) or legacy != run_wrappers(items, field_ids, labels):
+        print("❌ Results differ between implementations")
+        sys.exit(1)
+    print("✓ All implementations return identical values\n")
+
+    leads = len(items) * args.iterations
+    timings = [
+        ('Legacy linear scan', time_it(run_legacy, items, field_ids, labels, args.iterations)),
+        ('FieldIndex (build per lead)', time_it(run_field_index, items, field_ids, labels, args.iterations)),
+        ('Wrappers (one-off scans)', time_it(run_wrappers, items, field_ids, labels, args.iterations)),
+    ]
+    baseline = timings[0][1]
+    for name, elapsed in timings:
+        per_lead_us = elapsed / leads * 1e6
+        print(f"{name:<30} {per_lead_us:9.1f} µs/lead   {baseline / elapsed:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Benchmark: Podio Full vs Micro Item Views (500-item pages)
+
+Purpose: Measure payload size and JSON parse time of a 500-item Master Lead
+page with the full item view vs the V4.1 compact view used by queue listings
+(items.view(micro).fields(fields) + client-side field projection).
+
+This script:
+1. Builds a 500-item page in each view - full, micro+fields (queue rows) and
+   plain micro (title-only listings) - synthetic by default, or fetched live
+   from the Master Lead app with --live
+2. Reports payload bytes per page
+3. Times json.loads (+ projection to the declared fields) per page
+
+Usage:
+    python scripts/benchmark_item_views.py
+    python scripts/benchmark_item_views.py --live --iterations 20
+
+    --live requires PODIO_CLIENT_ID, PODIO_CLIENT_SECRET, PODIO_USERNAME and
+    PODIO_PASSWORD (loaded from .env) and makes three filter calls.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Podio calls are paced by the rate governor and retried on 420/429 (V4.1)
+from podio_rate_limit import podio_request, PRIORITY_INTERACTIVE
+
+# Load environment variables
+load_dotenv()
+
+# Master Lead App ID (from config.py)
+MASTER_LEAD_APP_ID = 30549135
+
+# Queue listing fields (from config.py): lead_score, lead_tier, owner_phone
+SUMMARY_FIELD_IDS = [274896114, 274896115, 274909275]
+
+PAGE_SIZE = 500
+MICRO_FIELDS_PARAM = 'items.view(micro).fields(fields)'
+
+
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+
+def _synthetic_field(field_id, index):
+    """Podio full-view field: values plus label/config metadata."""
+    field_type = ('text', 'number', 'money', 'category', 'date', 'phone')[index % 6]
+    values = {
+        'text': [{'value': f'<p>Synthetic value {index} for lead enrichment</p>'}],
+        'number': [{'value': f'{index * 3}.0000'}],
+        'money': [{'value': f'{index * 1000}.0000', 'currency': 'USD'}],
+        'category': [{'value': {'id': index, 'text': f'Option {index}', 'status': 'active', 'color': 'DCEBD8'}}],
+        'date': [{'start': '2025-11-30 00:00:00', 'start_date': '2025-11-30', 'start_time': None,
+                  'end': None, 'end_date': None, 'end_time': None}],
+        'phone': [{'type': 'home', 'value': f'555000{index:04d}'}],
+    }[field_type]
+    return {
+        'field_id': field_id,
+        'external_id': f'synthetic-field-{index}',
+        'label': f'Synthetic Field {index}',
+        'type': field_type,
+        'status': 'active',
+        'config': {
+            'label': f'Synthetic Field {index}',
+            'description': 'Populated by the data pipeline',
+            'required': False,
+            'visible': True,
+            'delta': index,
+            'settings': {'size': 'large'} if field_type == 'text' else {},
+        },
+        'values': values,
+    }
+
+
+def build_synthetic_full_page(field_count=60):
+    field_ids = SUMMARY_FIELD_IDS + [274896000 + i for i in range(field_count - len(SUMMARY_FIELD_IDS))]
+    items = []
+    for n in range(PAGE_SIZE):
+        item_id = 3200000000 + n
+        items.append({
+            'item_id': item_id,
+            'app_item_id': n + 1,
+            'title': f'Lead {n + 1} - 123 Main St',
+            'link': f'https://podio.com/thecityvault/leads/apps/master-lead/items/{n + 1}',
+            'created_on': '2025-11-30 12:00:00',
+            'last_event_on': '2025-12-01 08:30:00',
+            'created_by': {'user_id': 1, 'name': 'Data Pipeline', 'type': 'user', 'avatar': 123, 'image': None},
+            'current_revision': {'revision': 3, 'created_on': '2025-12-01 08:30:00'},
+            'comment_count': 0,
+            'file_count': 0,
+            'tags': [],
+            'rights': ['view', 'update', 'delete', 'comment', 'rate', 'subscribe'],
+            'fields': [_synthetic_field(field_id, i) for i, field_id in enumerate(field_ids)],
+        })
+    return {'filtered': PAGE_SIZE, 'total': PAGE_SIZE, 'items': items}
+
+
+def to_micro_page(full_page, with_fields=True):
+    """
+    Approximate items.view(micro)[.fields(fields)] for the same items.
+
+    Assumes compact views carry field values without per-field config;
+    run with --live to measure Podio's actual payloads.
+    """
+    items = []
+    for item in full_page['items']:
+        micro = {
+            'item_id': item['item_id'],
+            'app_item_id': item['app_item_id'],
+            'title': item['title'],
+            'link': item['link'],
+        }
+        if with_fields:
+            micro['fields'] = [
+                {key: field[key] for key in ('field_id', 'external_id', 'label', 'type', 'values')}
+                for field in item['fields']
+            ]
+        items.append(micro)
+    return {'filtered': full_page['filtered'], 'total': full_page['total'], 'items': items}
+
+
+def project(page, field_ids):
+    """Client-side projection (mirrors services.podio.item_service.project_item)."""
+    wanted = set(field_ids)
+    return [
+        {
+            'item_id': item.get('item_id'),
+            'title': item.get('title'),
+            'fields': [
+                {key: field[key] for key in ('field_id', 'label', 'type', 'values') if key in field}
+                for field in item.get('fields', []) if field.get('field_id') in wanted
+            ],
+        }
+        for item in page.get('items', [])
+    ]
+
+
+def fetch_live_pages():
+    """Fetch the same 500-item page in each view."""
+    auth = podio_request(
+        'POST',
+        'https://podio.com/oauth/token',
+        data={
+            'grant_type': 'password',
+            'client_id': os.getenv('PODIO_CLIENT_ID'),
+            'client_secret': os.getenv('PODIO_CLIENT_SECRET'),
+            'username': os.getenv('PODIO_USERNAME'),
+            'password': os.getenv('PODIO_PASSWORD')
+        }
+    )
+    if auth.status_code != 200:
+        raise Exception(f"Failed to get token: {auth.status_code} - {auth.text}")
+    headers = {'Authorization': f"OAuth2 {auth.json()['access_token']}"}
+    url = f'https://api.podio.com/item/app/{MASTER_LEAD_APP_ID}/filter'
+    body = {'limit': PAGE_SIZE, 'offset': 0, 'sort_by': 'created_on'}
+
+    pages = {}
+    for name, params in (('full', None),
+                         ('micro+fields', {'fields': MICRO_FIELDS_PARAM}),
+                         ('micro', {'fields': 'items.view(micro)'})):
+        start = time.perf_counter()
+        # Interactive priority: three calls, no background pacing in the timings
+        response = podio_request('POST', url, priority=PRIORITY_INTERACTIVE, headers=headers, params=params,
+                                 json=body)
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise Exception(f"Filter ({name}) failed: {response.status_code} - {response.text}")
+        pages[name] = (response.content, elapsed)
+    return pages
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def time_parse(raw, iterations, field_ids):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        project(json.loads(raw), field_ids)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--live', action='store_true', help='Fetch real pages from the Master Lead app')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PODIO ITEM VIEW BENCHMARK (500-item page)")
+    print("=" * 60)
+
+    network = {}
+    if args.live:
+        missing = [var for var in ('PODIO_CLIENT_ID', 'PODIO_CLIENT_SECRET', 'PODIO_USERNAME', 'PODIO_PASSWORD')
+                   if not os.getenv(var)]
+        if missing:
+            print(f"❌ ERROR: Missing environment variables: {', '.join(missing)}")
+            sys.exit(1)
+        pages = fetch_live_pages()
+        raw = {name: content for name, (content, _elapsed) in pages.items()}
+        network = {name: elapsed for name, (_content, elapsed) in pages.items()}
+        print(f"Source: live Master Lead app {MASTER_LEAD_APP_ID}")
+    else:
+        full_page = build_synthetic_full_page()
+        raw = {
+            'full': json.dumps(full_page).encode(),
+            'micro+fields': json.dumps(to_micro_page(full_page)).encode(),
+            'micro': json.dumps(to_micro_page(full_page, with_fields=False)).encode(),
+        }
+        print("Source: synthetic (60 fields per item)")
+
+    print(f"Declared fields: {SUMMARY_FIELD_IDS}")
+    print(f"Iterations: {args.iterations}\n")
+
+    results = {}
+    for name in ('full', 'micro+fields', 'micro'):
+        results[name] = (len(raw[name]), time_parse(raw[name], args.iterations, SUMMARY_FIELD_IDS))
+
+    full_bytes, full_parse = results['full']
+    for name, (size, parse) in results.items():
+        line = f"{name:<13} {size / 1024:10.1f} KiB   parse+project {parse * 1000:8.1f} ms"
+        if name in network:
+            line += f"   network {network[name] * 1000:8.1f} ms"
+        line += f"   ({full_bytes / size:4.1f}x smaller, {full_parse / parse:4.1f}x faster)" if name != 'full' else ''
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Benchmark: Recording Delivery Modes (Function Wall Time per Playback)
+
+Purpose: Compare how long /play_recording keeps the function busy per
+playback with each RECORDING_DELIVERY_MODE:
+
+    proxy (no cache):  every playback streams the MP3 from Twilio through the function
+    proxy (cached):    repeat playbacks stream the MP3 from the local recording cache
+    redirect:          the function answers with a 302 to Twilio's pre-signed media URL
+
+This script:
+1. Default: runs app.py in-process against a local stand-in for Twilio's
+   media endpoint (authenticated .mp3 URL that redirects to a storage URL
+   serving --size-mb at --mbps), so no Twilio account is needed
+2. Plays the same recording --playbacks times in each mode and reports the
+   function wall time (request start to last byte leaving the function)
+   and the bytes that went through the function
+3. --live: measures a deployment instead - time until the deployment has
+   sent its whole response (302 or audio) for one recording
+
+Usage:
+    python scripts/benchmark_recording_delivery.py
+    python scripts/benchmark_recording_delivery.py --size-mb 8 --mbps 40 --playbacks 20
+    python scripts/benchmark_recording_delivery.py --live https://your-app.vercel.app --recording-sid RExxx
+
+    Run --live once per deployment (e.g. a preview deployment with
+    RECORDING_DELIVERY_MODE=redirect next to production with proxy).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+import requests
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+load_dotenv()
+
+RECORDING_SID = 'RE' + '0' * 32
+CHUNK_BYTES = 64 * 1024
+
+
+# ============================================================================
+# LOCAL TWILIO MEDIA STAND-IN
+# ============================================================================
+
+def start_media_server(size_bytes, mbps):
+    """
+    Serve /.../Recordings/<sid>.mp3 (302) and /storage/<sid>.mp3 (bytes at `mbps` megabits/s).
+
+    Returns:
+        ThreadingHTTPServer: Running server (call shutdown() when done)
+    """
+    body = bytes(size_bytes)
+    seconds_per_chunk = CHUNK_BYTES * 8 / (mbps * 1_000_000)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            name = self.path.rsplit('/', 1)[-1].split('?')[0]
+            if '/Recordings/' in self.path:
+                self.send_response(302)
+                self.send_header('Location', f'/storage/{name}?Expires=300&Signature=benchmark')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            for start in range(0, len(body), CHUNK_BYTES):
+                time.sleep(seconds_per_chunk)
+                self.wfile.write(body[start:start + CHUNK_BYTES])
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def summarize(name, timings_ms, bytes_through):
+    timings_ms = sorted(timings_ms)
+    p95 = timings_ms[max(int(len(timings_ms) * 0.95) - 1, 0)]
+    print(f"{name:<22} p50 {statistics.median(timings_ms):8.1f} ms   p95 {p95:8.1f} ms   "
+          f"mean {statistics.mean(timings_ms):8.1f} ms   {bytes_through / len(timings_ms) / 1024:8.0f} KB/playback")
+
+
+def run_local(args):
+    # Stand-in credentials for config.py when no .env is present (the media server ignores them)
+    for var, value in (('TWILIO_ACCOUNT_SID', 'AC' + '0' * 32), ('TWILIO_AUTH_TOKEN', 'benchmark'),
+                       ('RECORDING_CACHE_DIR', '/tmp/benchmark_recording_cache')):
+        os.environ.setdefault(var, value)
+
+    import shutil
+    import twilio_service
+    import services.recordings.cache as recording_cache
+    import services.recordings.delivery as recording_delivery
+    from app import app
+
+    shutil.rmtree(os.environ['RECORDING_CACHE_DIR'], ignore_errors=True)
+    server = start_media_server(int(args.size_mb * 1024 * 1024), args.mbps)
+    twilio_service.RECORDING_MEDIA_URL = (
+        f"http://127.0.0.1:{server.server_address[1]}/2010-04-01/Accounts/{{account_sid}}/Recordings/{{recording_sid}}.mp3"
+    )
+    print(f"Recording: {args.size_mb} MB, upstream {args.mbps} Mbit/s, {args.playbacks} playbacks per mode\n")
+
+    modes = (
+        ('proxy (no cache)', 'proxy', False),
+        ('proxy (cached)', 'proxy', True),
+        ('redirect', 'redirect', False),
+    )
+    client = app.test_client()
+    for name, mode, cache_enabled in modes:
+        recording_delivery.RECORDING_DELIVERY_MODE = mode
+        recording_cache.RECORDING_CACHE_ENABLED = cache_enabled
+        if cache_enabled:
+            # Warm the cache: the first playback downloads from upstream
+            client.get(f'/play_recording/{RECORDING_SID}').close()
+
+        timings_ms = []
+        bytes_through = 0
+        for _ in range(args.playbacks):
+            start = time.perf_counter()
+            response = client.get(f'/play_recording/{RECORDING_SID}', buffered=True)
+            timings_ms.append((time.perf_counter() - start) * 1000)
+            bytes_through += len(response.data)
+            if mode == 'redirect' and response.status_code != 302:
+                print(f"⚠️ Expected 302 in redirect mode, got {response.status_code}")
+            response.close()
+        summarize(name, timings_ms, bytes_through)
+
+    print("\n(In-process client: no client-side bandwidth limit, so proxy modes are lower bounds -")
+    print(" a real listener keeps the function busy until its own download finishes.)")
+    server.shutdown()
+    shutil.rmtree(os.environ['RECORDING_CACHE_DIR'], ignore_errors=True)
+
+
+def run_live(args):
+    url = f"{args.live.rstrip('/')}/play_recording/{args.recording_sid}"
+    print(f"Deployment: {url}, {args.playbacks} playbacks\n")
+
+    timings_ms = []
+    bytes_through = 0
+    statuses = set()
+    for _ in range(args.playbacks):
+        start = time.perf_counter()
+        response = requests.get(url, allow_redirects=False)
+        timings_ms.append((time.perf_counter() - start) * 1000)
+        bytes_through += len(response.content)
+        statuses.add(response.status_code)
+
+    mode = 'redirect' if statuses == {302} else 'proxy' if statuses <= {200, 206} else f'mixed {sorted(statuses)}'
+    summarize(mode, timings_ms, bytes_through)
+    print("\n(Includes network time between this machine and the deployment.)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=4.0, help='Simulated recording size (default: 4)')
+    parser.add_argument('--mbps', type=float, default=50.0, help='Simulated upstream bandwidth in Mbit/s')
+    parser.add_argument('--playbacks', type=int, default=10)
+    parser.add_argument('--live', metavar='BASE_URL', help='Measure a deployment instead of the local app')
+    parser.add_argument('--recording-sid', help='Recording SID for --live')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RECORDING DELIVERY BENCHMARK (function wall time per playback)")
+    print("=" * 60)
+
+    if args.live:
+        if not args.recording_sid:
+            print("❌ ERROR: --live requires --recording-sid")
+            sys.exit(1)
+        run_live(args)
+    else:
+        run_local(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,9 +17,12 @@ Usage:
 
 import os
 import sys
-import time
 from dotenv import load_dotenv
-import requests
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from podio_rate_limit import podio_request
 
 # Load environment variables
 load_dotenv()
@@ -32,7 +35,8 @@ def get_podio_token():
     """Get Podio OAuth access token using password grant"""
     print("Authenticating with Podio...")
     
-    response = requests.post(
+    response = podio_request(
+        'POST',
         'https://podio.com/oauth/token',
         data={
             'grant_type': 'password',
@@ -63,7 +67,8 @@ def get_all_items(token, app_id):
     print(f"\nFetching items from Master Lead app (ID: {app_id})...")
     
     while True:
-        response = requests.post(
+        response = podio_request(
+            'POST',
             f'https://api.podio.com/item/app/{app_id}/filter',
             headers={
                 'Authorization': f'OAuth2 {token}',
@@ -92,14 +97,14 @@ def get_all_items(token, app_id):
             break
             
         offset += limit
-        time.sleep(0.5)  # Rate limiting
     
     return all_items
 
 
 def delete_item(token, item_id):
     """Delete a single Podio item"""
-    response = requests.delete(
+    response = podio_request(
+        'DELETE',
         f'https://api.podio.com/item/{item_id}',
         headers={
             'Authorization': f'OAuth2 {token}'
@@ -180,12 +185,6 @@ def main():
                 print(f"✗ Error: {e}")
                 error_count += 1
                 errors.append(item_id)
-            
-            # Rate limiting - Podio has request limits
-            if i % 10 == 0:
-                time.sleep(1)  # 1 second pause every 10 deletions
-            else:
-                time.sleep(0.2)  # 200ms between individual deletions
         
         # Summary
         print("\n" + "=" * 60)
@@ -2,15 +2,22 @@
 Quick script to list available Master Lead items for testing
 """
 import os
+import sys
 from dotenv import load_dotenv
-import requests
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Podio calls are paced by the rate governor and retried on 420/429 (V4.1)
+from podio_rate_limit import podio_request
 
 # Load environment variables
 load_dotenv()
 
 def get_podio_token():
     """Get Podio OAuth access token"""
-    response = requests.post(
+    response = podio_request(
+        'POST',
         'https://podio.com/oauth/token',
         data={
             'grant_type': 'password',
@@ -37,12 +44,15 @@ def main():
     print(f"Fetching items from Master Lead app (ID: {app_id})...")
     
     # Get items from the app using Podio API
-    response = requests.post(
+    # V4.1: Micro view - only item_id/title are printed, so skip field values
+    response = podio_request(
+        'POST',
         f'https://api.podio.com/item/app/{app_id}/filter',
         headers={
             'Authorization': f'OAuth2 {token}',
             'Content-Type': 'application/json'
         },
+        params={'fields': 'items.view(micro)'},
         json={'limit': 10}
     )
     
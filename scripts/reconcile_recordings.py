@@ -0,0 +1,356 @@
+"""
+Reconcile Twilio Recordings with Call Sessions, Podio and the Archive
+
+Purpose: /recording_status can only link a recording to Podio when it finds
+the call's Call Activity. Recordings whose callback could not be linked
+("No Podio mapping found") or arrived before the Call Activity existed never
+get a RECORDING_URL in Podio. This job walks Twilio's recordings list for a
+date window and repairs them in bulk.
+
+This script:
+1. Pages through Twilio's recordings for --start (inclusive) to --end
+   (exclusive), UTC
+2. Joins each recording to its call session in Firestore (child legs to
+   the parent session, asking Twilio for the parent CallSid when the
+   session does not know it - as /recording_status does)
+3. Archives the MP3 (RECORDING_ARCHIVE_BACKEND, --archive-dir); recordings
+   already in the archive are not downloaded again
+4. Stores missing recording metadata on the owning session, so a Call
+   Activity created later picks the recording up
+5. Sets RECORDING_URL on the session's Call Activity with
+   update_call_activity_recording unless the session records it as synced
+   (Podio calls run at background priority)
+
+Each page is processed by --workers threads. After every page the position
+in Twilio's list and the failed recordings are saved to --checkpoint; a new
+run with the same window continues after the last finished page and retries
+the failed recordings first. The first run also re-sends the URL of
+recordings linked before the sync marker existed (same value, no change).
+
+Usage:
+    python scripts/reconcile_recordings.py --start 2026-10-01 --end 2026-10-15 --dry-run
+    python scripts/reconcile_recordings.py --start 2026-10-01 --end 2026-10-15 --base-url https://your-app.vercel.app
+    python scripts/reconcile_recordings.py --start 2026-10-01 --end 2026-10-15 --restart
+
+Requires Twilio credentials and GCP_SERVICE_ACCOUNT_JSON (loaded from .env).
+Safe to re-run.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from twilio.base.exceptions import TwilioRestException
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+load_dotenv()
+
+from config import db, client, FANOUT_MAX_WORKERS, WEBHOOK_PUBLIC_BASE_URL
+from podio_service import update_call_activity_recording
+from db_service import (
+    get_call_session,
+    resolve_session_call_sid,
+    link_child_call,
+    update_call_recording_metadata,
+    mark_recording_podio_synced,
+    flush_write_buffer,
+)
+from services.podio.rate_limit import podio_priority, PRIORITY_BACKGROUND
+from services.recordings.archive import (
+    get_archive_storage,
+    archive_recording,
+    RecordingArchiveError,
+    ARCHIVE_STORED,
+)
+
+PAGE_SIZE = 100
+CHECKPOINT_VERSION = 1
+
+
+def _parse_when(value):
+    """'YYYY-MM-DD' or ISO datetime -> aware UTC datetime."""
+    when = datetime.fromisoformat(value)
+    return when.replace(tzinfo=timezone.utc) if when.tzinfo is None else when.astimezone(timezone.utc)
+
+
+# ============================================================================
+# PER-RECORDING RECONCILIATION
+# ============================================================================
+
+def find_session(call_sid, dry_run):
+    """
+    Call session that owns a recording's call.
+
+    Returns:
+        tuple: (owning Call SID, session dict or None, outcomes list)
+
+    Raises:
+        Exception: Twilio parent CallSid lookup failed (retried on the next run)
+    """
+    session_call_sid, session = resolve_session_call_sid(call_sid)
+    if session is not None and (session_call_sid != call_sid or session.get('podio_item_id')):
+        return session_call_sid, session, []
+
+    # Child leg that was never linked (or no session at all): ask Twilio
+    parent_call_sid = client.calls(call_sid).fetch().parent_call_sid
+    if not parent_call_sid:
+        return session_call_sid, session, []
+    parent = get_call_session(parent_call_sid)
+    if parent is None:
+        return session_call_sid, session, []
+    if not dry_run:
+        link_child_call(parent_call_sid, call_sid)
+    return parent_call_sid, parent, ['linked_parent']
+
+
+def reconcile_recording(recording, storage, base_url, dry_run):
+    """
+    Archive one recording and repair its Firestore and Podio links.
+
+    Args:
+        recording: Twilio RecordingInstance (sid, call_sid, status, duration)
+        storage: Archive RecordingStorage, or None to skip archiving
+        base_url: Public base URL of the app (proxy playback URL)
+        dry_run: Only report what would change
+
+    Returns:
+        tuple: (outcome names, failed: bool - retry on the next run)
+    """
+    recording_sid = recording.sid
+    if recording.status != 'completed':
+        return ['not_completed'], False
+
+    outcomes = []
+    failed = False
+
+    if storage is not None:
+        if dry_run:
+            outcomes.append('already_archived' if storage.local_path(recording_sid) else 'to_archive')
+        else:
+            try:
+                archived = archive_recording(storage, recording_sid)
+                outcomes.append('archived' if archived == ARCHIVE_STORED else 'already_archived')
+            except (RecordingArchiveError, OSError) as e:
+                print(f"❌ {recording_sid}: archive failed: {e}")
+                outcomes.append('archive_failed')
+                failed = True
+
+    try:
+        session_call_sid, session, linked = find_session(recording.call_sid, dry_run)
+    except Exception as e:
+        print(f"❌ {recording_sid}: parent CallSid lookup for {recording.call_sid} failed: {e}")
+        return outcomes + ['lookup_failed'], True
+    outcomes += linked
+    if session is None:
+        return outcomes + ['no_session'], failed
+
+    stored_recording = session.get('recording') or {}
+    if stored_recording.get('recording_sid') not in (None, recording_sid):
+        # The call's session links another recording - leave Podio alone
+        return outcomes + ['other_recording'], failed
+
+    if not stored_recording.get('recording_sid'):
+        if dry_run:
+            outcomes.append('metadata_to_store')
+        elif update_call_recording_metadata(
+            call_sid=session_call_sid,
+            recording_sid=recording_sid,
+            recording_url=recording.uri,
+            recording_duration=int(recording.duration) if recording.duration else 0,
+            base_url=base_url
+        ):
+            outcomes.append('metadata_stored')
+        else:
+            return outcomes + ['metadata_failed'], True
+
+    podio_item_id = session.get('podio_item_id')
+    if not podio_item_id:
+        # Picked up from the session when the disposition creates the Call Activity
+        return outcomes + ['no_call_activity'], failed
+    if stored_recording.get('podio_synced_item_id') == podio_item_id:
+        return outcomes + ['podio_already_synced'], failed
+    if dry_run:
+        return outcomes + ['podio_to_update'], failed
+
+    success, result = update_call_activity_recording(
+        call_activity_item_id=podio_item_id,
+        recording_url=f"{base_url}/play_recording/{recording_sid}"
+    )
+    if not success:
+        print(f"❌ {recording_sid}: Podio update of {podio_item_id} failed: {result}")
+        return outcomes + ['podio_failed'], True
+    mark_recording_podio_synced(session_call_sid, podio_item_id)
+    return outcomes + ['podio_updated'], failed
+
+
+def reconcile_batch(pool, recordings, storage, base_url, dry_run):
+    """
+    Reconcile recordings on the worker pool.
+
+    Returns:
+        tuple: (Counter of outcomes, set of failed Recording SIDs)
+    """
+    def work(recording):
+        with podio_priority(PRIORITY_BACKGROUND):
+            try:
+                return reconcile_recording(recording, storage, base_url, dry_run)
+            except Exception as e:
+                print(f"❌ {recording.sid}: {e}")
+                return ['error'], True
+
+    counts = Counter()
+    failed = set()
+    for recording, (outcomes, recording_failed) in zip(recordings, pool.map(work, recordings)):
+        counts.update(outcomes)
+        if recording_failed:
+            failed.add(recording.sid)
+
+    # Parent links and sync markers are buffered writes
+    flush_write_buffer()
+    return counts, failed
+
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+def load_checkpoint(path, window):
+    """Saved state for this window, or None to start from the first page."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('version') != CHECKPOINT_VERSION or state.get('window') != window:
+        print(f"⚠️ Checkpoint {path} is for another window - starting over")
+        return None
+    return state
+
+
+def save_checkpoint(path, state):
+    """Write the checkpoint atomically."""
+    partial = f"{path}.part"
+    with open(partial, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(partial, path)
+
+
+def main():
+    today = datetime.now(timezone.utc).date()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--start', default=(today - timedelta(days=7)).isoformat(),
+                        help='Window start, UTC date or ISO datetime (default: 7 days ago)')
+    parser.add_argument('--end', default=today.isoformat(), help='Window end, exclusive (default: today)')
+    parser.add_argument('--base-url', default=WEBHOOK_PUBLIC_BASE_URL,
+                        help='Public app URL for playback links (default: WEBHOOK_PUBLIC_BASE_URL)')
+    parser.add_argument('--workers', type=int, default=FANOUT_MAX_WORKERS)
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--archive-dir', help='Archive directory (default: RECORDING_ARCHIVE_DIR)')
+    parser.add_argument('--no-archive', action='store_true', help='Only repair Firestore and Podio')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: recording_reconcile_<start>_<end>.json)')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start from the first page')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change, write nothing')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RECONCILE RECORDINGS (V4.1)")
+    print("=" * 60)
+
+    if not db:
+        print("❌ ERROR: Firestore is not configured (GCP_SERVICE_ACCOUNT_JSON)")
+        sys.exit(1)
+    if not args.base_url and not args.dry_run:
+        print("❌ ERROR: --base-url (or WEBHOOK_PUBLIC_BASE_URL) is required for the playback links")
+        sys.exit(1)
+    base_url = (args.base_url or '').rstrip('/')
+
+    start, end = _parse_when(args.start), _parse_when(args.end)
+    window = {'start': start.isoformat(), 'end': end.isoformat()}
+    checkpoint_path = args.checkpoint or f"recording_reconcile_{start:%Y%m%dT%H%M}_{end:%Y%m%dT%H%M}.json"
+
+    storage = None
+    if not args.no_archive:
+        try:
+            storage = get_archive_storage(args.archive_dir)
+        except OSError as e:
+            print(f"❌ ERROR: Cannot use the recording archive: {e}")
+            sys.exit(1)
+
+    state = None if args.restart or args.dry_run else load_checkpoint(checkpoint_path, window)
+    if state is None:
+        state = {'version': CHECKPOINT_VERSION, 'window': window, 'next_page_url': None,
+                 'pages': 0, 'counts': {}, 'failed': [], 'completed': False}
+    else:
+        print(f"Resuming from {checkpoint_path}: {state['pages']} pages done, "
+              f"{len(state['failed'])} failed recordings to retry")
+
+    def checkpoint(counts, failed):
+        state['counts'] = dict(Counter(state['counts']) + counts)
+        state['failed'] = sorted(failed)
+        if not args.dry_run:
+            save_checkpoint(checkpoint_path, state)
+
+    print(f"Window: {window['start']} to {window['end']}")
+    print(f"Workers: {args.workers}, archive: {storage.name if storage else 'off'}"
+          f"{', DRY RUN' if args.dry_run else ''}\n")
+
+    failed = set(state['failed'])
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix='reconcile') as pool:
+        if failed:
+            retry = []
+            for recording_sid in sorted(failed):
+                try:
+                    retry.append(client.recordings(recording_sid).fetch())
+                except TwilioRestException as e:
+                    if e.status == 404:
+                        print(f"⚠️ {recording_sid}: deleted from Twilio - no longer retried")
+                        failed.discard(recording_sid)
+                    else:
+                        print(f"⚠️ {recording_sid}: could not be fetched from Twilio: {e}")
+                except Exception as e:
+                    print(f"⚠️ {recording_sid}: could not be fetched from Twilio: {e}")
+            counts, still_failed = reconcile_batch(pool, retry, storage, base_url, args.dry_run)
+            failed = (failed - {recording.sid for recording in retry}) | still_failed
+            checkpoint(counts, failed)
+            print(f"  Retried {len(retry)} failed recordings, {len(still_failed)} still failing")
+
+        if state['completed']:
+            page = None
+            print("Window already complete (use --restart to walk it again)")
+        elif state['next_page_url']:
+            page = client.recordings.get_page(state['next_page_url'])
+        else:
+            page = client.recordings.page(date_created_after=start, date_created_before=end,
+                                          page_size=args.page_size)
+
+        while page is not None:
+            recordings = list(page)
+            counts, page_failed = reconcile_batch(pool, recordings, storage, base_url, args.dry_run)
+            failed |= page_failed
+            state['pages'] += 1
+            state['next_page_url'] = page.next_page_url
+            state['completed'] = page.next_page_url is None
+            checkpoint(counts, failed)
+            print(f"  Page {state['pages']}: {len(recordings)} recordings, {len(page_failed)} failed")
+            page = page.next_page()
+
+    print("\n" + "=" * 60)
+    for outcome, count in sorted(state['counts'].items()):
+        print(f"  {outcome:<22} {count}")
+    if failed:
+        print(f"\n⚠️ {len(failed)} recordings failed - re-run to retry them ({checkpoint_path})")
+    elif args.dry_run:
+        print("\nDry run - nothing written.")
+    else:
+        print(f"\n✅ Window reconciled ({checkpoint_path})")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,14 @@ monolithic podio_service.py to improve maintainability and security auditing.
 
 Modules:
     podio: Podio API integration services (oauth, items, fields, intelligence, tasks)
+    fanout: Dependency-graph execution of I/O steps on a bounded thread pool (V4.1)
+    disposition: /submit_call_data workflow built on fanout, sync or via the outbox (V4.1)
+    outbox: Durable write-behind queue for disposition writes (V4.1)
+    idempotency: Replay protection for /submit_call_data (V4.1)
+    webhook_queue: Durable per-CallSid ordered queue for Twilio callbacks (V4.1)
+    webhooks: Fast-ack ingestion and processors for /call_status, /recording_status (V4.1)
+    recordings: Local recording cache for /play_recording (V4.1)
+    stores: Shared SQLite/backend-selection plumbing for the token, idempotency, outbox and webhook stores (V4.1)
 """
 
 # Re-export for backward compatibility
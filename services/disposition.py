@@ -0,0 +1,424 @@
+"""
+Call Disposition Workflow - Concurrent Side Effects for /submit_call_data
+
+Turns an agent's disposition into Podio/Firestore writes, expressed as a
+dependency graph and executed with services.fanout:
+
+    call_session (Firestore) ─> call_duration ─> call_activity (Podio) ─┬─> call_session_update (Firestore)
+                                                                      └─> follow_up_task (Podio)
+
+One document get on call_sessions/{CallSid} provides the duration recorded
+by /call_status and any recording that arrived before the form was
+submitted (the Twilio API is only asked for the duration when the
+'completed' callback has not arrived). After the Call Activity item is
+created, the Podio item ID and the disposition are stored on the session
+in one write while the follow-up task is created.
+
+In outbox write mode the payload is persisted first (services.outbox) and
+the agent gets a 202 with an outbox id; a drain worker then runs the same
+graph with retries. Finished steps are stored on the entry, so a retry never
+creates a second Call Activity item or task.
+
+Business Justification:
+    Pillar 4 (Disposition Funnel): Agents get control back in roughly the
+                                   slowest single call instead of the sum
+    Pillar 5 (Scalability): Per-step timings in every response
+
+Used By:
+    - app.py (/submit_call_data, /api/outbox/*)
+"""
+
+import random
+import threading
+import time
+import uuid
+
+from config import (
+    db,
+    DISPOSITION_TASK_MAPPING,
+    DISPOSITION_WRITE_MODE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETRY_BASE_SECONDS,
+    OUTBOX_RETRY_MAX_SECONDS,
+    OUTBOX_LEASE_SECONDS,
+)
+from twilio_service import get_call_duration, get_recording_url
+from podio_service import create_call_activity_item, create_follow_up_task
+from db_service import record_call_disposition, get_recording_by_call_sid, get_call_session
+from services.fanout import Step, run_steps, step_timings, STEP_FAILED, STEP_SKIPPED
+from services.outbox import get_outbox_store, OUTBOX_PENDING, OUTBOX_PROCESSING, OUTBOX_DONE, OUTBOX_FAILED
+
+DISPOSITION_OUTBOX_KIND = 'call_disposition'
+
+WRITE_MODE_SYNC = 'sync'
+WRITE_MODE_OUTBOX = 'outbox'
+
+
+class DispositionError(Exception):
+    """Raised by a step when a required Podio/Firestore write fails."""
+
+
+# ============================================================================
+# STEPS
+# ============================================================================
+
+def _load_call_session(call_sid):
+    """
+    V4.1: Read the call session once for the duration and recording.
+
+    Returns:
+        dict: {'call_duration', 'recording_url'} (JSON-safe, values may be None)
+    """
+    if not call_sid:
+        return {'call_duration': None, 'recording_url': None}
+
+    session = get_call_session(call_sid)
+    # V3.2.5 FIX: Check if recording already arrived via webhook (race condition fix)
+    # The recording_status webhook may arrive BEFORE the user submits the form
+    # If so, the recording is already in Firestore and we can use it
+    existing_recording = get_recording_by_call_sid(call_sid, session=session)
+    if existing_recording:
+        recording_url = existing_recording.get('recording_url')
+        print(f"✅ V3.2.5: Found existing recording in Firestore: {recording_url}")
+    else:
+        # Fall back to original behavior (try Twilio API, returns None per V3.2.3 design)
+        recording_url = get_recording_url(call_sid)
+        print(f"V3.2.5: No existing recording found, will be added via webhook later")
+
+    return {
+        'call_duration': (session or {}).get('call_duration'),
+        'recording_url': recording_url,
+    }
+
+
+def _fetch_call_duration(call_sid, session_values):
+    """
+    V4.1: Duration recorded by the /call_status 'completed' callback; the
+    Twilio API is only called when that callback has not arrived yet.
+    """
+    if not call_sid:
+        return None
+    if session_values.get('call_duration') is not None:
+        return session_values['call_duration']
+    print(f"V4.1: No recorded duration for {call_sid} yet - fetching from Twilio")
+    return get_call_duration(call_sid)
+
+
+def _create_call_activity(data, item_id, call_sid, call_duration, recording_url):
+    success, result = create_call_activity_item(
+        data,
+        item_id,
+        call_sid,
+        call_duration,
+        recording_url
+    )
+    if not success:
+        raise DispositionError(result)
+    return result.get('item_id')
+
+
+def _update_call_session(data, item_id, call_sid, podio_item_id, strict=False):
+    """
+    V4.1: CallSid → Podio item mapping (V3.2.2) and disposition audit log in
+    one write to the call session (disposition_logs when there is no CallSid).
+    """
+    stored = record_call_disposition(data, item_id, call_sid, podio_item_id)
+    if strict and not stored and db:
+        raise DispositionError(f"Could not store disposition on call session {call_sid}")
+    return stored
+
+
+def _create_task_for_disposition(data, item_id, strict=False):
+    """
+    V3.3: Create the follow-up task if the disposition requires one.
+
+    With strict=True (outbox drain) a failed task creation raises so the
+    entry is retried; otherwise it is logged and the request still succeeds.
+    """
+    disposition_code = data.get('disposition_code')
+    if not (disposition_code and disposition_code in DISPOSITION_TASK_MAPPING):
+        print(f"V3.3: Disposition '{disposition_code}' not found in task mapping or no disposition provided")
+        return None
+
+    task_config = DISPOSITION_TASK_MAPPING[disposition_code]
+    if not task_config.get('create_task'):
+        print(f"V3.3: Disposition '{disposition_code}' does not require task creation")
+        return None
+
+    print(f"V3.3: Disposition '{disposition_code}' triggers task creation")
+
+    # V3.3 Enhancement: Allow agent to override default due date
+    task_success, task_result = create_follow_up_task(
+        master_lead_item_id=item_id,
+        task_properties=task_config,
+        agent_specified_date=data.get('next_action_date')  # From form field
+    )
+
+    if task_success:
+        task_item_id = task_result.get('item_id')
+        print(f"✅ V3.3: Created follow-up task {task_item_id} for disposition '{disposition_code}'")
+        return task_item_id
+
+    # Don't fail the entire request if task creation fails
+    print(f"⚠️ V3.3: Task creation failed: {task_result}")
+    if strict:
+        raise DispositionError(f"Task creation failed: {task_result}")
+    return None
+
+
+# ============================================================================
+# WORKFLOW
+# ============================================================================
+
+def build_disposition_steps(data, strict=False):
+    """
+    Build the dependency graph for one disposition.
+
+    Args:
+        data: Disposition payload from the Agent Workspace (item_id, call_sid, form fields)
+        strict: Treat failed session/task writes as step failures
+                (outbox drain retries them; the sync flow tolerates them)
+
+    Returns:
+        list: services.fanout.Step objects
+    """
+    item_id = data.get('item_id')
+    call_sid = data.get('call_sid')
+
+    return [
+        # One Firestore read for duration + recording, Twilio only if the duration is missing
+        Step('call_session', lambda r: _load_call_session(call_sid)),
+        Step('call_duration', lambda r: _fetch_call_duration(call_sid, r['call_session']),
+             depends_on=('call_session',)),
+        # Create once the reads are in
+        Step('call_activity',
+             lambda r: _create_call_activity(data, item_id, call_sid, r['call_duration'],
+                                             r['call_session']['recording_url']),
+             depends_on=('call_session', 'call_duration')),
+        # Post-create writes (concurrent; skipped if the create failed)
+        Step('call_session_update',
+             lambda r: _update_call_session(data, item_id, call_sid, r['call_activity'], strict),
+             depends_on=('call_activity',)),
+        Step('follow_up_task', lambda r: _create_task_for_disposition(data, item_id, strict),
+             depends_on=('call_activity',)),
+    ]
+
+
+def process_call_disposition(data):
+    """
+    Run the disposition workflow and build the /submit_call_data response.
+
+    Args:
+        data: Disposition payload from the Agent Workspace
+
+    Returns:
+        tuple: (response body dict, HTTP status code)
+
+    Note:
+        Response bodies match the sequential flow ('success', 'podio_item_id',
+        'message' / 'error') plus 'timings' (per step) and 'total_ms'.
+    """
+    start = time.perf_counter()
+    results = run_steps(build_disposition_steps(data))
+    timings = step_timings(results)
+    total_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    print(f"V4.1: Disposition steps for item {data.get('item_id')} finished in {total_ms} ms: {timings}")
+
+    create = results['call_activity']
+    if not create.ok:
+        error = create.error
+        if create.status == STEP_SKIPPED:
+            # Report the read that failed rather than the skip
+            error = next((result.error for result in results.values() if result.status == STEP_FAILED), error)
+        return {
+            'success': False,
+            'error': error,
+            'timings': timings,
+            'total_ms': total_ms,
+        }, 500
+
+    return {
+        'success': True,
+        'podio_item_id': create.value,
+        'message': 'Data written to Podio successfully',
+        'timings': timings,
+        'total_ms': total_ms,
+    }, 200
+
+
+# ============================================================================
+# OUTBOX WRITE MODE (V4.1)
+# ============================================================================
+
+def get_write_mode():
+    """
+    Resolve the /submit_call_data write mode.
+
+    Returns:
+        str: WRITE_MODE_OUTBOX if DISPOSITION_WRITE_MODE is 'outbox',
+             WRITE_MODE_SYNC otherwise (the default)
+    """
+    mode = (DISPOSITION_WRITE_MODE or WRITE_MODE_SYNC).lower()
+    return WRITE_MODE_OUTBOX if mode == WRITE_MODE_OUTBOX else WRITE_MODE_SYNC
+
+
+def _retry_delay(attempts):
+    """Full-jitter exponential backoff before the next drain attempt."""
+    ceiling = min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return random.uniform(OUTBOX_RETRY_BASE_SECONDS / 2, max(ceiling, OUTBOX_RETRY_BASE_SECONDS / 2))
+
+
+def _outbox_step(step, entry_id, owner, done_steps, store):
+    """Wrap a step so a value recorded by an earlier attempt is reused, and a new one is recorded."""
+
+    def run(values):
+        if step.name in done_steps:
+            return done_steps[step.name]
+        value = step.fn(values)
+        if not store.record_step(entry_id, owner, step.name, value):
+            print(f"⚠️ V4.1: Outbox lease lost on {entry_id} while recording '{step.name}'")
+        return value
+
+    return Step(step.name, run, step.depends_on)
+
+
+def process_outbox_entry(entry, owner):
+    """
+    Run one claimed disposition entry and settle it.
+
+    Args:
+        entry: Entry record returned by OutboxStore.claim
+        owner: Worker ID holding the lease
+
+    Returns:
+        str: Resulting status (OUTBOX_DONE, OUTBOX_PENDING or OUTBOX_FAILED)
+    """
+    store = get_outbox_store()
+    entry_id = entry['id']
+    data = entry['payload']
+    done_steps = entry.get('steps') or {}
+
+    steps = [
+        _outbox_step(step, entry_id, owner, done_steps, store)
+        for step in build_disposition_steps(data, strict=True)
+    ]
+    start = time.perf_counter()
+    results = run_steps(steps)
+    total_ms = round((time.perf_counter() - start) * 1000, 1)
+    timings = step_timings(results)
+
+    failed = [name for name, result in results.items() if not result.ok]
+    if not failed:
+        result = {
+            'podio_item_id': results['call_activity'].value,
+            'task_item_id': results['follow_up_task'].value,
+        }
+        store.settle(entry_id, owner, OUTBOX_DONE, result=result)
+        print(f"✅ V4.1: Outbox {entry_id} done in {total_ms} ms (attempt {entry['attempts']}): {timings}")
+        return OUTBOX_DONE
+
+    error = next(
+        (results[name].error for name in failed if results[name].status == STEP_FAILED),
+        results[failed[0]].error
+    )
+    if entry['attempts'] >= OUTBOX_MAX_ATTEMPTS:
+        store.settle(entry_id, owner, OUTBOX_FAILED, error=error)
+        print(f"❌ V4.1: Outbox {entry_id} failed after {entry['attempts']} attempts: {error}")
+        return OUTBOX_FAILED
+
+    delay = _retry_delay(entry['attempts'])
+    store.settle(entry_id, owner, OUTBOX_PENDING, error=error, due_at=time.time() + delay)
+    print(f"⚠️ V4.1: Outbox {entry_id} attempt {entry['attempts']} failed ({error}) - retrying in {delay:.0f}s")
+    return OUTBOX_PENDING
+
+
+def drain_disposition_outbox(limit=10, entry_id=None):
+    """
+    Claim and process due outbox entries.
+
+    Args:
+        limit: Maximum entries to process in this call
+        entry_id: Process only this entry (used right after enqueue)
+
+    Returns:
+        dict: Counts per resulting status plus 'claimed'
+    """
+    owner = uuid.uuid4().hex
+    summary = {'claimed': 0, OUTBOX_DONE: 0, OUTBOX_PENDING: 0, OUTBOX_FAILED: 0}
+    store = get_outbox_store()
+
+    for entry in store.claim(owner, OUTBOX_LEASE_SECONDS, limit=limit, entry_id=entry_id):
+        summary['claimed'] += 1
+        if entry.get('kind') != DISPOSITION_OUTBOX_KIND:
+            continue
+        try:
+            status = process_outbox_entry(entry, owner)
+        except Exception as e:
+            # Storage error while settling: the lease expires and the entry is retried
+            print(f"Error processing outbox entry {entry['id']}: {e}")
+            continue
+        summary[status] += 1
+
+    return summary
+
+
+def _drain_in_background(entry_id):
+    def run():
+        try:
+            drain_disposition_outbox(limit=1, entry_id=entry_id)
+        except Exception as e:
+            print(f"Error draining outbox entry {entry_id}: {e}")
+
+    threading.Thread(target=run, name=f'outbox-{entry_id[:8]}', daemon=True).start()
+
+
+def enqueue_call_disposition(data):
+    """
+    Persist a disposition and start writing it in the background.
+
+    Args:
+        data: Disposition payload from the Agent Workspace
+
+    Returns:
+        dict: The stored outbox entry
+
+    Note:
+        The background drain is best effort (a serverless instance may be
+        frozen after responding). Entries it does not finish are picked up by
+        /api/outbox/drain or by the next status poll.
+    """
+    entry = get_outbox_store().enqueue(DISPOSITION_OUTBOX_KIND, data)
+    print(f"V4.1: Disposition for item {data.get('item_id')} queued as outbox {entry['id']}")
+    _drain_in_background(entry['id'])
+    return entry
+
+
+def get_disposition_status(entry_id):
+    """
+    Status of a queued disposition for the workspace to poll.
+
+    Args:
+        entry_id: Outbox entry ID returned by /submit_call_data
+
+    Returns:
+        dict or None: {'outbox_id', 'status', 'attempts', 'podio_item_id',
+                       'completed_steps', 'last_error'}, or None if unknown
+    """
+    entry = get_outbox_store().get(entry_id)
+    if not entry or entry.get('kind') != DISPOSITION_OUTBOX_KIND:
+        return None
+
+    # Nudge entries whose background drain never ran (frozen instance, crash)
+    if entry['status'] in (OUTBOX_PENDING, OUTBOX_PROCESSING) and (entry.get('due_at') or 0) <= time.time():
+        _drain_in_background(entry_id)
+
+    result = entry.get('result') or {}
+    return {
+        'outbox_id': entry['id'],
+        'status': entry['status'],
+        'attempts': entry.get('attempts', 0),
+        'podio_item_id': result.get('podio_item_id') or (entry.get('steps') or {}).get('call_activity'),
+        'completed_steps': sorted((entry.get('steps') or {}).keys()),
+        'last_error': entry.get('last_error'),
+    }
@@ -0,0 +1,387 @@
+"""
+Idempotency Store - Replay Protection for /submit_call_data
+
+Browser retries and double-clicks used to create duplicate Call Activity
+items and follow-up tasks. Each submission now carries an idempotency key
+(client nonce, or call_sid + item_id); the first request with a key runs and
+its response is stored, repeats get the stored response back without any
+Podio writes, and a repeat that arrives while the first is still running is
+told to retry.
+
+Key records (dicts):
+    state: 'in_progress' or 'completed'
+    owner: Request that holds the in-progress lock
+    locked_until: Epoch seconds when an abandoned in-progress lock may be taken over
+    body / status_code: Stored response once completed
+    expires_at: Epoch seconds after which the record is ignored and evicted
+
+Backends:
+    firestore: Shared across all Vercel instances (uses config.db); set a
+               Firestore TTL policy on 'expire_at' to delete old records
+    sqlite: Local file stand-in for development and single-host deployments
+    memory: Per-process only (bounded, oldest entries evicted first)
+
+Business Justification:
+    Pillar 4 (Disposition Funnel): One disposition, one Call Activity item,
+                                   one follow-up task - no cleanup scripts
+    Pillar 1 (Compliance): Call history in Podio stays accurate
+
+Used By:
+    - app.py (/submit_call_data)
+"""
+
+import datetime
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import (
+    IDEMPOTENCY_STORE,
+    IDEMPOTENCY_STORE_PATH,
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_LOCK_SECONDS,
+)
+from services.stores import SQLiteStore, StoreSelector
+
+IDEMPOTENCY_COLLECTION = 'submission_keys'
+
+KEY_STARTED = 'started'
+KEY_IN_PROGRESS = 'in_progress'
+KEY_COMPLETED = 'completed'
+
+# Bound for the process-local backend
+MEMORY_MAX_KEYS = 10000
+
+
+def submission_key(data, header_key=None):
+    """
+    Derive the idempotency key for a disposition submission.
+
+    Args:
+        data: Disposition payload
+        header_key: Value of the Idempotency-Key request header, if any
+
+    Returns:
+        str or None: Hashed key ('nonce:...' or 'call:call_sid:item_id' before
+                     hashing), or None when the request carries neither
+    """
+    nonce = header_key or data.get('idempotency_key')
+    if nonce:
+        raw = f"nonce:{nonce}"
+    elif data.get('call_sid') and data.get('item_id'):
+        raw = f"call:{data['call_sid']}:{data['item_id']}"
+    else:
+        return None
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _begin_decision(record, owner, now, lock_seconds):
+    """
+    Shared begin() logic for all backends.
+
+    Returns:
+        tuple: (outcome, record to write or None, stored record or None)
+    """
+    if record and record.get('expires_at', 0) > now:
+        if record.get('state') == KEY_COMPLETED:
+            return KEY_COMPLETED, None, record
+        if record.get('locked_until', 0) > now:
+            return KEY_IN_PROGRESS, None, record
+    new_record = {
+        'state': KEY_IN_PROGRESS,
+        'owner': owner,
+        'locked_until': now + lock_seconds,
+        'body': None,
+        'status_code': None,
+        'expires_at': now + lock_seconds,
+    }
+    return KEY_STARTED, new_record, None
+
+
+class IdempotencyStore:
+    """
+    Interface for idempotency key storage.
+
+    Implementations may raise on storage errors; callers then process the
+    request without replay protection rather than rejecting it.
+    """
+
+    name = 'base'
+
+    def begin(self, key, owner, lock_seconds):
+        """
+        Claim a key for processing.
+
+        Returns:
+            tuple: (KEY_STARTED, None) if `owner` should process the request,
+                   (KEY_IN_PROGRESS, None) if another request holds it,
+                   (KEY_COMPLETED, record) with the stored response
+        """
+        raise NotImplementedError
+
+    def complete(self, key, owner, body, status_code, ttl_seconds):
+        """Store the response for replay until ttl_seconds from now."""
+        raise NotImplementedError
+
+    def release(self, key, owner):
+        """Drop an in-progress claim (the request failed and may be retried)."""
+        raise NotImplementedError
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Process-local store (no sharing between instances)."""
+
+    name = 'memory'
+
+    def __init__(self, max_keys=MEMORY_MAX_KEYS):
+        self._records = OrderedDict()
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        for key in [k for k, record in self._records.items() if record['expires_at'] <= now]:
+            del self._records[key]
+        while len(self._records) > self._max_keys:
+            self._records.popitem(last=False)
+
+    def begin(self, key, owner, lock_seconds):
+        with self._lock:
+            now = time.time()
+            self._evict(now)
+            outcome, new_record, stored = _begin_decision(self._records.get(key), owner, now, lock_seconds)
+            if new_record:
+                self._records[key] = new_record
+                self._records.move_to_end(key)
+            return outcome, dict(stored) if stored else None
+
+    def complete(self, key, owner, body, status_code, ttl_seconds):
+        with self._lock:
+            record = self._records.get(key)
+            if record and record['owner'] == owner:
+                record.update({
+                    'state': KEY_COMPLETED,
+                    'body': body,
+                    'status_code': status_code,
+                    'expires_at': time.time() + ttl_seconds,
+                })
+
+    def release(self, key, owner):
+        with self._lock:
+            record = self._records.get(key)
+            if record and record['owner'] == owner and record['state'] == KEY_IN_PROGRESS:
+                del self._records[key]
+
+
+class SQLiteIdempotencyStore(SQLiteStore, IdempotencyStore):
+    """
+    Local file store shared by all processes on one host.
+
+    Uses BEGIN IMMEDIATE so two processes can never both claim a key.
+    Expired rows are deleted on every begin().
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS idempotency_keys ('
+        'key TEXT PRIMARY KEY, state TEXT, owner TEXT, locked_until REAL, '
+        'body TEXT, status_code INTEGER, expires_at REAL)',
+        'CREATE INDEX IF NOT EXISTS idempotency_keys_expires_at ON idempotency_keys (expires_at)',
+    )
+
+    def begin(self, key, owner, lock_seconds):
+        def _begin(conn):
+            now = time.time()
+            conn.execute('DELETE FROM idempotency_keys WHERE expires_at <= ?', (now,))
+            row = conn.execute(
+                'SELECT state, owner, locked_until, body, status_code, expires_at '
+                'FROM idempotency_keys WHERE key = ?', (key,)
+            ).fetchone()
+            record = None
+            if row:
+                record = dict(zip(('state', 'owner', 'locked_until', 'body', 'status_code', 'expires_at'), row))
+                record['body'] = json.loads(record['body']) if record['body'] else None
+            outcome, new_record, stored = _begin_decision(record, owner, now, lock_seconds)
+            if new_record:
+                conn.execute(
+                    'INSERT OR REPLACE INTO idempotency_keys '
+                    '(key, state, owner, locked_until, body, status_code, expires_at) '
+                    'VALUES (?, ?, ?, ?, NULL, NULL, ?)',
+                    (key, new_record['state'], owner, new_record['locked_until'], new_record['expires_at'])
+                )
+            return outcome, stored
+
+        return self._transaction(_begin)
+
+    def complete(self, key, owner, body, status_code, ttl_seconds):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE idempotency_keys SET state = ?, body = ?, status_code = ?, expires_at = ? '
+                'WHERE key = ? AND owner = ?',
+                (KEY_COMPLETED, json.dumps(body), status_code, time.time() + ttl_seconds, key, owner)
+            )
+
+    def release(self, key, owner):
+        with self._connect() as conn:
+            conn.execute(
+                'DELETE FROM idempotency_keys WHERE key = ? AND owner = ? AND state = ?',
+                (key, owner, KEY_IN_PROGRESS)
+            )
+
+
+class FirestoreIdempotencyStore(IdempotencyStore):
+    """
+    Firestore-backed store shared by every Vercel instance.
+
+    Claims run in a Firestore transaction. Records carry 'expire_at' (a
+    timestamp) for a Firestore TTL policy; expired records that have not
+    been deleted yet are ignored.
+    """
+
+    name = 'firestore'
+
+    def __init__(self, firestore_db):
+        self._db = firestore_db
+        self._collection = firestore_db.collection(IDEMPOTENCY_COLLECTION)
+
+    @staticmethod
+    def _expire_at(expires_at):
+        return datetime.datetime.fromtimestamp(expires_at, tz=datetime.timezone.utc)
+
+    def begin(self, key, owner, lock_seconds):
+        from firebase_admin import firestore
+
+        doc_ref = self._collection.document(key)
+
+        @firestore.transactional
+        def _begin(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            record = snapshot.to_dict() if snapshot.exists else None
+            outcome, new_record, stored = _begin_decision(record, owner, time.time(), lock_seconds)
+            if new_record:
+                transaction.set(doc_ref, {**new_record, 'expire_at': self._expire_at(new_record['expires_at'])})
+            return outcome, stored
+
+        return _begin(self._db.transaction())
+
+    def complete(self, key, owner, body, status_code, ttl_seconds):
+        from firebase_admin import firestore
+
+        doc_ref = self._collection.document(key)
+        expires_at = time.time() + ttl_seconds
+
+        @firestore.transactional
+        def _complete(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get('owner') == owner:
+                transaction.update(doc_ref, {
+                    'state': KEY_COMPLETED,
+                    'body': body,
+                    'status_code': status_code,
+                    'expires_at': expires_at,
+                    'expire_at': self._expire_at(expires_at),
+                })
+
+        _complete(self._db.transaction())
+
+    def release(self, key, owner):
+        from firebase_admin import firestore
+
+        doc_ref = self._collection.document(key)
+
+        @firestore.transactional
+        def _release(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if snapshot.exists:
+                record = snapshot.to_dict()
+                if record.get('owner') == owner and record.get('state') == KEY_IN_PROGRESS:
+                    transaction.delete(doc_ref)
+
+        _release(self._db.transaction())
+
+
+_idempotency_store = StoreSelector(
+    'IDEMPOTENCY_STORE', IDEMPOTENCY_STORE, 'Idempotency store',
+    firestore=FirestoreIdempotencyStore, sqlite=SQLiteIdempotencyStore, memory=MemoryIdempotencyStore,
+    sqlite_path=IDEMPOTENCY_STORE_PATH,
+)
+
+
+def get_idempotency_store():
+    """
+    Get the configured idempotency store (created on first use).
+
+    IDEMPOTENCY_STORE selects the backend: 'firestore', 'sqlite' or 'memory'.
+    Unset means Firestore when config.db is available, otherwise SQLite.
+
+    Returns:
+        IdempotencyStore: Shared store instance
+    """
+    return _idempotency_store.get()
+
+
+def run_idempotent(key, handler):
+    """
+    Run a request handler at most once per idempotency key.
+
+    Args:
+        key: Key from submission_key() (None = no replay protection)
+        handler: Zero-argument callable returning (body dict, status code)
+
+    Returns:
+        tuple: (body, status code, outcome) where outcome is KEY_STARTED for a
+               fresh run, KEY_COMPLETED for a replayed response, or
+               KEY_IN_PROGRESS when an earlier request with the key is still
+               running (body is a 409 error)
+
+    Note:
+        Only 2xx responses are stored. On errors the key is released so the
+        agent can resubmit. If the store itself fails, the handler runs
+        without protection (a duplicate is better than a lost disposition).
+    """
+    if not key:
+        body, status_code = handler()
+        return body, status_code, KEY_STARTED
+
+    store = get_idempotency_store()
+    owner = uuid.uuid4().hex
+    try:
+        outcome, record = store.begin(key, owner, IDEMPOTENCY_LOCK_SECONDS)
+    except Exception as e:
+        print(f"⚠️ V4.1: Idempotency store unavailable ({e}) - processing without replay protection")
+        body, status_code = handler()
+        return body, status_code, KEY_STARTED
+
+    if outcome == KEY_COMPLETED:
+        print(f"V4.1: Replaying stored response for idempotency key {key[:12]}")
+        return record['body'], record['status_code'], KEY_COMPLETED
+    if outcome == KEY_IN_PROGRESS:
+        print(f"V4.1: Duplicate submission while idempotency key {key[:12]} is in progress")
+        return {
+            'success': False,
+            'error': 'This disposition is already being submitted',
+            'in_progress': True,
+        }, 409, KEY_IN_PROGRESS
+
+    try:
+        body, status_code = handler()
+    except Exception:
+        _safe_release(store, key, owner)
+        raise
+
+    try:
+        if 200 <= status_code < 300:
+            store.complete(key, owner, body, status_code, IDEMPOTENCY_TTL_SECONDS)
+        else:
+            store.release(key, owner)
+    except Exception as e:
+        print(f"⚠️ V4.1: Could not store idempotency result for {key[:12]}: {e}")
+    return body, status_code, KEY_STARTED
+
+
+def _safe_release(store, key, owner):
+    try:
+        store.release(key, owner)
+    except Exception as e:
+        print(f"⚠️ V4.1: Could not release idempotency key {key[:12]}: {e}")
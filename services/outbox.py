@@ -0,0 +1,405 @@
+"""
+Outbox Store - Durable Write-Behind Queue for Podio/Firestore Side Effects
+
+Persists the intent of a write (e.g. an agent's call disposition) before any
+Podio call is made, so the request can be acknowledged immediately and the
+work retried until it succeeds. Workers claim due entries under a short lease;
+an entry whose worker dies becomes due again when the lease expires.
+
+Entry records (dicts):
+    id: Outbox entry ID (hex)
+    kind: Workflow name (e.g. 'call_disposition')
+    payload: JSON-serializable input for the workflow
+    status: 'pending', 'processing', 'done' or 'failed'
+    attempts: Number of times the entry has been claimed
+    due_at: Epoch seconds when the entry may next be claimed
+            (next retry while pending, lease expiry while processing,
+            None once done/failed)
+    lease_owner: Worker holding the current lease
+    steps: Completed step name -> value (lets retries skip finished writes)
+    result: Final result dict once done
+    last_error: Error from the most recent failed attempt
+    created_at / updated_at: Epoch seconds
+
+Backends:
+    firestore: Shared across all Vercel instances (uses config.db)
+    sqlite: Local file stand-in for development and single-host deployments
+    memory: Per-process only (entries are lost on restart)
+
+Business Justification:
+    Pillar 4 (Disposition Funnel): A disposition is never lost because Podio
+                                   was slow or down when the agent submitted
+    Pillar 5 (Scalability): Agent throughput no longer depends on Podio latency
+
+Used By:
+    - services.disposition (outbox write mode for /submit_call_data)
+"""
+
+import json
+import threading
+import time
+import uuid
+
+from config import OUTBOX_STORE, OUTBOX_STORE_PATH
+from services.stores import SQLiteStore, StoreSelector
+
+OUTBOX_COLLECTION = 'disposition_outbox'
+
+OUTBOX_PENDING = 'pending'
+OUTBOX_PROCESSING = 'processing'
+OUTBOX_DONE = 'done'
+OUTBOX_FAILED = 'failed'
+
+
+def _new_entry(kind, payload):
+    now = time.time()
+    return {
+        'id': uuid.uuid4().hex,
+        'kind': kind,
+        'payload': payload,
+        'status': OUTBOX_PENDING,
+        'attempts': 0,
+        'due_at': now,
+        'lease_owner': None,
+        'steps': {},
+        'result': None,
+        'last_error': None,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def _claim_fields(entry, owner, lease_seconds, now):
+    return {
+        'status': OUTBOX_PROCESSING,
+        'attempts': entry.get('attempts', 0) + 1,
+        'due_at': now + lease_seconds,
+        'lease_owner': owner,
+        'updated_at': now,
+    }
+
+
+def _is_due(entry, now):
+    return (entry.get('status') in (OUTBOX_PENDING, OUTBOX_PROCESSING)
+            and entry.get('due_at') is not None and entry['due_at'] <= now)
+
+
+class OutboxStore:
+    """
+    Interface for outbox persistence.
+
+    Implementations may raise on storage errors. Only the worker holding an
+    entry's lease may record steps or settle it.
+    """
+
+    name = 'base'
+
+    def enqueue(self, kind, payload):
+        """
+        Persist a new pending entry (due immediately).
+
+        Returns:
+            dict: The stored entry record
+        """
+        raise NotImplementedError
+
+    def get(self, entry_id):
+        """Return the entry record, or None if unknown."""
+        raise NotImplementedError
+
+    def claim(self, owner, lease_seconds, limit=10, entry_id=None):
+        """
+        Lease due entries to `owner` (increments their attempt count).
+
+        Args:
+            owner: Worker ID
+            lease_seconds: How long the claim is exclusive
+            limit: Maximum entries to claim
+            entry_id: Claim only this entry (if it is due)
+
+        Returns:
+            list: Claimed entry records
+        """
+        raise NotImplementedError
+
+    def record_step(self, entry_id, owner, step, value):
+        """Store a completed step's value. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def settle(self, entry_id, owner, status, result=None, error=None, due_at=None):
+        """
+        Finish an attempt: OUTBOX_DONE, OUTBOX_FAILED, or OUTBOX_PENDING with
+        the next retry time in `due_at`. Returns False if the lease was lost.
+        """
+        raise NotImplementedError
+
+
+class MemoryOutboxStore(OutboxStore):
+    """Process-local store (no durability, no sharing between instances)."""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _copy(self, entry):
+        return json.loads(json.dumps(entry))
+
+    def enqueue(self, kind, payload):
+        entry = _new_entry(kind, payload)
+        with self._lock:
+            self._entries[entry['id']] = entry
+            return self._copy(entry)
+
+    def get(self, entry_id):
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            return self._copy(entry) if entry else None
+
+    def claim(self, owner, lease_seconds, limit=10, entry_id=None):
+        with self._lock:
+            now = time.time()
+            if entry_id:
+                candidates = [self._entries[entry_id]] if entry_id in self._entries else []
+            else:
+                candidates = sorted(self._entries.values(), key=lambda e: e['due_at'] or 0)
+            claimed = []
+            for entry in candidates:
+                if len(claimed) >= limit:
+                    break
+                if _is_due(entry, now):
+                    entry.update(_claim_fields(entry, owner, lease_seconds, now))
+                    claimed.append(self._copy(entry))
+            return claimed
+
+    def record_step(self, entry_id, owner, step, value):
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if not entry or entry['lease_owner'] != owner:
+                return False
+            entry['steps'][step] = value
+            entry['updated_at'] = time.time()
+            return True
+
+    def settle(self, entry_id, owner, status, result=None, error=None, due_at=None):
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if not entry or entry['lease_owner'] != owner:
+                return False
+            entry.update({
+                'status': status,
+                'result': result,
+                'last_error': error,
+                'due_at': due_at if status == OUTBOX_PENDING else None,
+                'lease_owner': None,
+                'updated_at': time.time(),
+            })
+            return True
+
+
+class SQLiteOutboxStore(SQLiteStore, OutboxStore):
+    """
+    Local file store shared by all processes on one host.
+
+    Uses BEGIN IMMEDIATE so claims are atomic across processes.
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS outbox ('
+        'id TEXT PRIMARY KEY, kind TEXT, payload TEXT, status TEXT, attempts INTEGER, '
+        'due_at REAL, lease_owner TEXT, steps TEXT, result TEXT, last_error TEXT, '
+        'created_at REAL, updated_at REAL)',
+        'CREATE INDEX IF NOT EXISTS outbox_due_at ON outbox (due_at)',
+    )
+
+    _COLUMNS = ('id', 'kind', 'payload', 'status', 'attempts', 'due_at', 'lease_owner',
+                'steps', 'result', 'last_error', 'created_at', 'updated_at')
+    _JSON_COLUMNS = ('payload', 'steps', 'result')
+
+    def _row_to_entry(self, row):
+        entry = dict(zip(self._COLUMNS, row))
+        for column in self._JSON_COLUMNS:
+            entry[column] = json.loads(entry[column]) if entry[column] is not None else None
+        return entry
+
+    def _select(self, conn, where, params):
+        return [
+            self._row_to_entry(row)
+            for row in conn.execute(f"SELECT {', '.join(self._COLUMNS)} FROM outbox WHERE {where}", params)
+        ]
+
+    def enqueue(self, kind, payload):
+        entry = _new_entry(kind, payload)
+        row = [json.dumps(entry[c]) if c in self._JSON_COLUMNS else entry[c] for c in self._COLUMNS]
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO outbox ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                row
+            )
+        return entry
+
+    def get(self, entry_id):
+        with self._connect() as conn:
+            entries = self._select(conn, 'id = ?', (entry_id,))
+        return entries[0] if entries else None
+
+    def claim(self, owner, lease_seconds, limit=10, entry_id=None):
+        def _claim(conn):
+            now = time.time()
+            if entry_id:
+                entries = self._select(conn, 'id = ? AND due_at <= ?', (entry_id, now))
+            else:
+                entries = self._select(conn, 'due_at <= ? ORDER BY due_at LIMIT ?', (now, limit))
+            claimed = []
+            for entry in entries:
+                if not _is_due(entry, now):
+                    continue
+                fields = _claim_fields(entry, owner, lease_seconds, now)
+                conn.execute(
+                    'UPDATE outbox SET status = ?, attempts = ?, due_at = ?, lease_owner = ?, updated_at = ? '
+                    'WHERE id = ?',
+                    (fields['status'], fields['attempts'], fields['due_at'], fields['lease_owner'],
+                     fields['updated_at'], entry['id'])
+                )
+                entry.update(fields)
+                claimed.append(entry)
+            return claimed
+
+        return self._transaction(_claim)
+
+    def record_step(self, entry_id, owner, step, value):
+        def _record(conn):
+            row = conn.execute(
+                'SELECT steps FROM outbox WHERE id = ? AND lease_owner = ?', (entry_id, owner)
+            ).fetchone()
+            if not row:
+                return False
+            steps = json.loads(row[0] or '{}')
+            steps[step] = value
+            conn.execute(
+                'UPDATE outbox SET steps = ?, updated_at = ? WHERE id = ?',
+                (json.dumps(steps), time.time(), entry_id)
+            )
+            return True
+
+        return self._transaction(_record)
+
+    def settle(self, entry_id, owner, status, result=None, error=None, due_at=None):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE outbox SET status = ?, result = ?, last_error = ?, due_at = ?, lease_owner = NULL, '
+                'updated_at = ? WHERE id = ? AND lease_owner = ?',
+                (status, json.dumps(result) if result is not None else None, error,
+                 due_at if status == OUTBOX_PENDING else None, time.time(), entry_id, owner)
+            )
+            return cursor.rowcount == 1
+
+
+class FirestoreOutboxStore(OutboxStore):
+    """
+    Firestore-backed store shared by every Vercel instance.
+
+    Claims and settlement run in Firestore transactions so two instances can
+    never work the same entry at once. `due_at` is the only field queried,
+    so no composite index is needed.
+    """
+
+    name = 'firestore'
+
+    def __init__(self, firestore_db):
+        self._db = firestore_db
+        self._collection = firestore_db.collection(OUTBOX_COLLECTION)
+
+    def enqueue(self, kind, payload):
+        entry = _new_entry(kind, payload)
+        self._collection.document(entry['id']).create(entry)
+        return entry
+
+    def get(self, entry_id):
+        snapshot = self._collection.document(entry_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def _claim_one(self, doc_ref, owner, lease_seconds):
+        from firebase_admin import firestore
+
+        @firestore.transactional
+        def _claim(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            entry = snapshot.to_dict()
+            now = time.time()
+            if not _is_due(entry, now):
+                return None
+            fields = _claim_fields(entry, owner, lease_seconds, now)
+            transaction.update(doc_ref, fields)
+            entry.update(fields)
+            return entry
+
+        return _claim(self._db.transaction())
+
+    def claim(self, owner, lease_seconds, limit=10, entry_id=None):
+        if entry_id:
+            doc_refs = [self._collection.document(entry_id)]
+        else:
+            query = self._collection.where('due_at', '<=', time.time()).order_by('due_at').limit(limit)
+            doc_refs = [snapshot.reference for snapshot in query.stream()]
+
+        claimed = []
+        for doc_ref in doc_refs:
+            entry = self._claim_one(doc_ref, owner, lease_seconds)
+            if entry:
+                claimed.append(entry)
+        return claimed
+
+    def _update_if_owner(self, entry_id, owner, fields):
+        from firebase_admin import firestore
+
+        doc_ref = self._collection.document(entry_id)
+
+        @firestore.transactional
+        def _update(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists or snapshot.to_dict().get('lease_owner') != owner:
+                return False
+            transaction.update(doc_ref, fields)
+            return True
+
+        return _update(self._db.transaction())
+
+    def record_step(self, entry_id, owner, step, value):
+        return self._update_if_owner(entry_id, owner, {
+            f'steps.{step}': value,
+            'updated_at': time.time(),
+        })
+
+    def settle(self, entry_id, owner, status, result=None, error=None, due_at=None):
+        return self._update_if_owner(entry_id, owner, {
+            'status': status,
+            'result': result,
+            'last_error': error,
+            'due_at': due_at if status == OUTBOX_PENDING else None,
+            'lease_owner': None,
+            'updated_at': time.time(),
+        })
+
+
+_outbox_store = StoreSelector(
+    'OUTBOX_STORE', OUTBOX_STORE, 'Disposition outbox store',
+    firestore=FirestoreOutboxStore, sqlite=SQLiteOutboxStore, memory=MemoryOutboxStore,
+    sqlite_path=OUTBOX_STORE_PATH,
+)
+
+
+def get_outbox_store():
+    """
+    Get the configured outbox store (created on first use).
+
+    OUTBOX_STORE selects the backend: 'firestore', 'sqlite' or 'memory'.
+    Unset means Firestore when config.db is available, otherwise SQLite.
+
+    Returns:
+        OutboxStore: Shared store instance
+    """
+    return _outbox_store.get()
@@ -6,6 +6,11 @@ extracted from the monolithic podio_service.py for improved maintainability.
 
 Modules:
     oauth: OAuth token refresh and credential management
+    request_stats: Per-request counters for outbound Podio calls
+    token_store: Shared OAuth token persistence across serverless instances
+    session / client: Pooled keep-alive HTTP session and authenticated API client
+    rate_limit: Header-driven rate governor with interactive/background priorities
+    item_cache: TTL/LRU cache for Master Lead items (invalidated by /podio_hook)
     item_service: Item retrieval and CRUD operations for Podio items
     field_extraction: Field value extraction and parsing utilities
     intelligence: Lead intelligence extraction (V4.0 Phase 1/2)
@@ -23,30 +28,79 @@ Business Justification:
 from services.podio.oauth import (
     refresh_podio_token,
     get_token,
+    invalidate_podio_token,
+    get_auth_call_count,
     _podio_token
 )
 
+# Per-request Podio call counters (V4.1)
+from services.podio.request_stats import (
+    reset_request_stats,
+    get_request_stats,
+    PODIO_AUTH_CALLS,
+    PODIO_ITEM_FETCHES,
+)
+
+# Pooled, authenticated Podio API client (V4.1)
+from services.podio.client import (
+    PodioClient,
+    PodioAuthError,
+    get_podio_client,
+    get_rate_governor,
+    get_rate_governor_stats,
+)
+
+# Podio rate governor priorities (V4.1)
+from services.podio.rate_limit import (
+    RateGovernor,
+    podio_priority,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+)
+
 # Re-export Item Service functions for backward compatibility
 from services.podio.item_service import (
     get_podio_item,
+    get_podio_items,
+    list_podio_items,
+    project_item,
+    build_item_fields_param,
+    ITEM_VIEW_MICRO,
+    ITEM_VIEW_MINI,
+    ITEM_VIEW_FULL,
+    reset_request_item_memo,
     create_call_activity_item,
     update_call_activity_recording,
+    verify_podio_hook,
     # Helper functions
     generate_title,
     convert_to_iso_date,
     parse_currency,
 )
 
+# Master Lead item cache hooks and metrics (V4.1)
+from services.podio.item_cache import (
+    invalidate_cached_item,
+    clear_item_cache,
+    get_item_cache_stats,
+)
+
 # Re-export Field Extraction functions for backward compatibility
 from services.podio.field_extraction import (
     extract_field_value,
     extract_field_value_by_id,
+    FieldIndex,
+    build_field_index,
 )
 
 # Re-export Intelligence functions for backward compatibility (V4.0.8)
 from services.podio.intelligence import (
     FIELD_BUNDLES,
     get_lead_intelligence,
+    extract_lead_intelligence,
+    LEAD_SUMMARY_FIELDS,
+    summarize_lead,
+    list_lead_summaries,
 )
 
 # Re-export Task Service functions for backward compatibility (V4.0.8 final extraction)
@@ -59,19 +113,56 @@ __all__ = [
     # OAuth functions
     'refresh_podio_token',
     'get_token',
+    'invalidate_podio_token',
+    'get_auth_call_count',
+    # Request stats
+    'reset_request_stats',
+    'get_request_stats',
+    'PODIO_AUTH_CALLS',
+    'PODIO_ITEM_FETCHES',
+    # API client
+    'PodioClient',
+    'PodioAuthError',
+    'get_podio_client',
+    'get_rate_governor',
+    'get_rate_governor_stats',
+    # Rate governor
+    'RateGovernor',
+    'podio_priority',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_BACKGROUND',
     # Item Service functions
     'get_podio_item',
+    'get_podio_items',
+    'list_podio_items',
+    'project_item',
+    'build_item_fields_param',
+    'ITEM_VIEW_MICRO',
+    'ITEM_VIEW_MINI',
+    'ITEM_VIEW_FULL',
+    'reset_request_item_memo',
     'create_call_activity_item',
     'update_call_activity_recording',
+    'verify_podio_hook',
     'generate_title',
     'convert_to_iso_date',
     'parse_currency',
+    # Item cache
+    'invalidate_cached_item',
+    'clear_item_cache',
+    'get_item_cache_stats',
     # Field Extraction functions
     'extract_field_value',
     'extract_field_value_by_id',
+    'FieldIndex',
+    'build_field_index',
     # Intelligence functions
     'FIELD_BUNDLES',
     'get_lead_intelligence',
+    'extract_lead_intelligence',
+    'LEAD_SUMMARY_FIELDS',
+    'summarize_lead',
+    'list_lead_summaries',
     # Task Service functions
     'create_follow_up_task',
 ]
\ No newline at end of file
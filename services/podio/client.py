@@ -0,0 +1,163 @@
+"""
+Podio API Client - Authenticated Requests over the Pooled Session
+
+Single entry point for Podio REST calls. Injects the OAuth header from the
+token cache, applies default timeouts, and transparently renews the token
+once when Podio answers 401. Every call passes through the shared rate
+governor (V4.1), which paces requests and retries 420/429 responses.
+
+Business Justification:
+    Pillar 1 (Compliance): One place where Podio credentials touch outbound requests
+    Pillar 5 (Scalability): Keep-alive connection reuse for every Podio call
+
+Dependencies:
+    - services.podio.session: Pooled requests.Session and default timeouts
+    - services.podio.oauth: Token cache and renewal
+    - services.podio.rate_limit: Header-driven rate governor
+
+Used By:
+    - services.podio.item_service
+    - services.podio.task_service
+"""
+
+from services.podio.session import get_session, PODIO_API_URL, DEFAULT_TIMEOUT
+from services.podio.oauth import get_token, refresh_podio_token
+from services.podio.rate_limit import (
+    RateGovernor,
+    get_request_priority,
+    PRIORITY_INTERACTIVE,
+)
+from config import (
+    PODIO_RATE_LIMIT_PER_HOUR,
+    PODIO_RATE_INTERACTIVE_RESERVE,
+    PODIO_RATE_BACKGROUND_PER_SECOND,
+    PODIO_RATE_MAX_BACKOFF_SECONDS,
+    PODIO_RATE_INTERACTIVE_MAX_WAIT_SECONDS,
+)
+
+# Agent-facing requests retry a rate limit once and never wait long for a token;
+# background work waits as long as needed and retries more
+INTERACTIVE_MAX_ATTEMPTS = 2
+BACKGROUND_MAX_ATTEMPTS = 4
+
+_rate_governor = RateGovernor(
+    limit_per_hour=PODIO_RATE_LIMIT_PER_HOUR,
+    interactive_reserve=PODIO_RATE_INTERACTIVE_RESERVE,
+    background_per_second=PODIO_RATE_BACKGROUND_PER_SECOND,
+    max_backoff_seconds=PODIO_RATE_MAX_BACKOFF_SECONDS,
+)
+
+
+def get_rate_governor():
+    """
+    Get the process-wide Podio rate governor.
+
+    Returns:
+        RateGovernor: Governor shared by every PodioClient in this instance
+    """
+    return _rate_governor
+
+
+def get_rate_governor_stats():
+    """Quota, throttling and 420/429 metrics for the Podio rate governor."""
+    return _rate_governor.stats()
+
+
+class PodioAuthError(Exception):
+    """Raised when no Podio access token can be obtained."""
+
+
+class PodioClient:
+    """
+    Thin wrapper around the pooled session for Podio API calls.
+
+    Methods return the raw requests.Response so callers keep their existing
+    status-code handling. Paths are relative to https://api.podio.com.
+    """
+
+    def __init__(self, base_url=PODIO_API_URL, session=None, timeout=DEFAULT_TIMEOUT, governor=None):
+        self.base_url = base_url.rstrip('/')
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.governor = governor or _rate_governor
+
+    def request(self, method, path, **kwargs):
+        """
+        Send an authenticated request.
+
+        Args:
+            method: HTTP method ('GET', 'POST', ...)
+            path: API path, e.g. '/item/app/123/filter'
+            **kwargs: Passed through to requests (json, params, timeout, ...)
+
+        Returns:
+            requests.Response: Podio response (420/429 only if retries were exhausted)
+
+        Raises:
+            PodioAuthError: If no access token can be obtained
+            requests.RequestException: On transport failures
+        """
+        token = get_token()
+        if not token:
+            raise PodioAuthError('Podio authentication failed')
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        extra_headers = kwargs.pop('headers', None) or {}
+        kwargs.setdefault('timeout', self.timeout)
+
+        response = self._send(method, url, token, extra_headers, kwargs)
+
+        if response.status_code == 401:
+            # Token revoked or expired early - renew once and retry
+            print(f"Podio returned 401 for {method} {path} - renewing token and retrying")
+            token = refresh_podio_token(force=True)
+            if not token:
+                raise PodioAuthError('Podio authentication failed')
+            response = self._send(method, url, token, extra_headers, kwargs)
+
+        return response
+
+    def _send(self, method, url, token, extra_headers, kwargs):
+        headers = {'Authorization': f'OAuth2 {token}', **extra_headers}
+        priority = get_request_priority()
+        if priority == PRIORITY_INTERACTIVE:
+            max_attempts = INTERACTIVE_MAX_ATTEMPTS
+            acquire_timeout = PODIO_RATE_INTERACTIVE_MAX_WAIT_SECONDS
+        else:
+            max_attempts = BACKGROUND_MAX_ATTEMPTS
+            acquire_timeout = None
+        return self.governor.call(
+            lambda: self.session.request(method, url, headers=headers, **kwargs),
+            priority=priority,
+            max_attempts=max_attempts,
+            acquire_timeout=acquire_timeout,
+        )
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+
+_podio_client = None
+
+
+def get_podio_client():
+    """
+    Get the shared PodioClient instance.
+
+    Returns:
+        PodioClient: Client bound to the pooled session
+    """
+    global _podio_client
+
+    if _podio_client is None:
+        _podio_client = PodioClient()
+    return _podio_client
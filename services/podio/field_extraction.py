@@ -4,6 +4,12 @@ Podio Field Extraction Service - Field Value Parsing Utilities
 Handles extraction and normalization of field values from Podio items.
 Supports all Podio field types: text, category, money, number, date.
 
+V4.1: FieldIndex builds O(1) lookup tables (by field_id and by label) in one
+pass over an item. Callers doing many lookups build it once per request with
+build_field_index(item); extract_field_value / extract_field_value_by_id
+remain for one-off lookups. See scripts/benchmark_field_extraction.py for
+before/after numbers.
+
 Business Justification:
     Pillar 3 (Data Pipeline): Field extraction isolated enables future enhancements
         like caching, batched extraction, and type-specific validation
@@ -13,6 +19,198 @@ Extracted from podio_service.py for improved modularity.
 """
 import re
 
+# Compiled once - previously recompiled on every extraction call
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _decode_label_value(value):
+    """
+    Decode the first value of a field for label-based extraction (V3.6 rules).
+    
+    Returns:
+        str: Text with HTML tags stripped
+    """
+    # Handle different field types
+    if isinstance(value, dict):
+        inner_value = value.get('value', '')
+        
+        # V3.6 FIX: Handle category fields with nested {'text': '...'} structure
+        if isinstance(inner_value, dict):
+            # Category field - extract 'text' property
+            text = inner_value.get('text', '')
+        else:
+            # Text field or other - convert to string
+            text = str(inner_value) if inner_value is not None else ''
+    else:
+        text = str(value)
+    
+    # Strip HTML tags (e.g., <p>Name</p> -> Name)
+    text = _HTML_TAG_RE.sub('', text)
+    return text.strip()
+
+
+def _decode_typed_value(field, field_type=None):
+    """
+    Decode the first value of a field by Podio field type (V4.0.5 rules).
+    
+    Args:
+        field: Podio field dict with 'type' and 'values'
+        field_type: Optional type hint overriding the field metadata
+        
+    Returns:
+        Typed value (see extract_field_value_by_id), or None if empty
+    """
+    values = field.get('values', [])
+    if not values:
+        return None
+    
+    value = values[0]
+    # Use provided field_type or auto-detect from field metadata
+    detected_type = field.get('type')
+    field_type = field_type or detected_type
+    
+    # Handle different Podio field types
+    if field_type == 'category':
+        # Category fields: [{'value': {'text': 'WARM', ...}}]
+        # Extract nested 'value' dict first
+        if isinstance(value, dict) and 'value' in value:
+            inner_value = value['value']
+            return inner_value.get('text') if isinstance(inner_value, dict) else str(inner_value)
+        # Fallback for direct structure (shouldn't happen but defensive)
+        return value.get('text') if isinstance(value, dict) else str(value)
+    elif field_type == 'money':
+        # Money fields: [{'value': '323000.0000', 'currency': 'USD'}]
+        # Already handles nested 'value' correctly
+        return float(value.get('value')) if isinstance(value, dict) else None
+    elif field_type == 'number':
+        # Number fields: [{'value': '65.0000'}]
+        # Extract nested 'value' string first
+        if isinstance(value, dict) and 'value' in value:
+            try:
+                return float(value['value']) if value['value'] else None
+            except (ValueError, TypeError):
+                return None
+        # Fallback for direct value (old behavior)
+        try:
+            return float(value) if value else None
+        except (ValueError, TypeError):
+            return None
+    elif field_type == 'date':
+        # Date fields return dict with 'start' key (YYYY-MM-DD format)
+        return value.get('start') if isinstance(value, dict) else str(value)
+    elif field_type == 'phone':
+        # Phone fields: [{'type': 'home', 'value': '7578748884'}]
+        # V4.0.9 FIX: Handle phone field extraction properly
+        if isinstance(value, dict) and 'value' in value:
+            return value.get('value', '')
+        return str(value) if value else None
+    elif field_type == 'text':
+        # Text fields: [{'value': '<p>R0090271</p>'}]
+        # Extract nested 'value' first
+        if isinstance(value, dict) and 'value' in value:
+            text = value['value']
+        else:
+            text = str(value) if value else None
+        
+        if text:
+            text = _HTML_TAG_RE.sub('', str(text))
+            return text.strip()
+        return None
+    else:
+        # Default: return raw value
+        return value
+
+
+# ============================================================================
+# FIELD INDEX (V4.1)
+# ============================================================================
+
+_MISSING = object()
+
+
+class FieldIndex:
+    """
+    O(1) field lookups for one Podio item (V4.1)
+    
+    Built with a single pass over item['fields']; decoded values are memoized
+    so repeated lookups of the same field cost a dict hit.
+    
+    Lookup semantics match the original linear scans:
+        - by field_id: first field with that ID (None if its values are empty)
+        - by label: first field with that label that has a value ('' if none)
+        
+    Examples:
+        >>> index = FieldIndex({'fields': [{'field_id': 1, 'label': 'Name', 'type': 'text',
+        ...                                 'values': [{'value': '<p>John</p>'}]}]})
+        >>> index.value_by_id(1)
+        'John'
+        >>> index.value_by_label('Name')
+        'John'
+        
+    Note:
+        The index reflects the item as it was when built; build a new one
+        after changing item['fields'].
+    """
+    
+    __slots__ = ('_by_id', '_by_label', '_typed_values', '_label_values')
+    
+    def __init__(self, item):
+        self._by_id = {}
+        self._by_label = {}
+        self._typed_values = {}
+        self._label_values = {}
+        
+        for field in (item or {}).get('fields', []):
+            field_id = field.get('field_id')
+            if field_id is not None and field_id not in self._by_id:
+                self._by_id[field_id] = field
+            label = field.get('label')
+            if label is not None and label not in self._by_label and field.get('values'):
+                self._by_label[label] = field
+    
+    def field(self, field_id):
+        """Raw Podio field dict for a field ID, or None."""
+        if field_id is None:
+            return None
+        return self._by_id.get(int(field_id))
+    
+    def value_by_id(self, field_id, field_type=None):
+        """Typed value for a field ID (see extract_field_value_by_id)."""
+        if field_id is None:
+            return None
+        key = (int(field_id), field_type)
+        value = self._typed_values.get(key, _MISSING)
+        if value is _MISSING:
+            field = self._by_id.get(key[0])
+            value = _decode_typed_value(field, field_type) if field is not None else None
+            self._typed_values[key] = value
+        return value
+    
+    def value_by_label(self, field_label):
+        """HTML-stripped text for a field label (see extract_field_value)."""
+        value = self._label_values.get(field_label)
+        if value is None:
+            field = self._by_label.get(field_label)
+            value = _decode_label_value(field['values'][0]) if field is not None else ''
+            self._label_values[field_label] = value
+        return value
+
+
+def build_field_index(item):
+    """
+    Build a FieldIndex for a Podio item.
+    
+    Build one per request and pass it to the code doing the lookups; the
+    index is not cached between calls.
+    
+    Args:
+        item: Podio item dictionary containing 'fields' array
+        
+    Returns:
+        FieldIndex: Index with O(1) lookups by field_id and label
+    """
+    return FieldIndex(item)
+
 
 def extract_field_value(item, field_label):
     """
@@ -39,30 +237,13 @@ def extract_field_value(item, field_label):
         - Text fields: {'value': '<p>Name</p>'} -> strips HTML
         - Category fields: {'value': {'text': 'NED Listing', ...}} -> extracts 'text'
         - Other fields: converts to string
+        
+        V4.1: One-off lookup; for several lookups on the same item use
+        build_field_index(item).value_by_label().
     """
-    for field in item.get('fields', []):
-        if field.get('label') == field_label:
-            values = field.get('values', [])
-            if values:
-                value = values[0]
-                
-                # Handle different field types
-                if isinstance(value, dict):
-                    inner_value = value.get('value', '')
-                    
-                    # V3.6 FIX: Handle category fields with nested {'text': '...'} structure
-                    if isinstance(inner_value, dict):
-                        # Category field - extract 'text' property
-                        text = inner_value.get('text', '')
-                    else:
-                        # Text field or other - convert to string
-                        text = str(inner_value) if inner_value is not None else ''
-                else:
-                    text = str(value)
-                
-                # Strip HTML tags (e.g., <p>Name</p> -> Name)
-                text = re.sub(r'<[^>]+>', '', text)
-                return text.strip()
+    for field in (item or {}).get('fields', []):
+        if field.get('label') == field_label and field.get('values'):
+            return _decode_label_value(field['values'][0])
     return ''
 
 
@@ -98,69 +279,17 @@ def extract_field_value_by_id(item, field_id, field_type=None):
     Note:
         Handles all Podio field types: number, category, money, text, date.
         Returns None for graceful degradation in UI.
+        
+        V4.1: One-off lookup; for several lookups on the same item use
+        build_field_index(item).value_by_id().
     """
     if not item:
         return None
     
+    if field_id is None:
+        return None
+    field_id = int(field_id)
     for field in item.get('fields', []):
-        if field.get('field_id') == int(field_id):
-            values = field.get('values', [])
-            if not values:
-                return None
-            
-            value = values[0]
-            # Use provided field_type or auto-detect from field metadata
-            detected_type = field.get('type')
-            field_type = field_type or detected_type
-            
-            # Handle different Podio field types
-            if field_type == 'category':
-                # Category fields: [{'value': {'text': 'WARM', ...}}]
-                # Extract nested 'value' dict first
-                if isinstance(value, dict) and 'value' in value:
-                    inner_value = value['value']
-                    return inner_value.get('text') if isinstance(inner_value, dict) else str(inner_value)
-                # Fallback for direct structure (shouldn't happen but defensive)
-                return value.get('text') if isinstance(value, dict) else str(value)
-            elif field_type == 'money':
-                # Money fields: [{'value': '323000.0000', 'currency': 'USD'}]
-                # Already handles nested 'value' correctly
-                return float(value.get('value')) if isinstance(value, dict) else None
-            elif field_type == 'number':
-                # Number fields: [{'value': '65.0000'}]
-                # Extract nested 'value' string first
-                if isinstance(value, dict) and 'value' in value:
-                    try:
-                        return float(value['value']) if value['value'] else None
-                    except (ValueError, TypeError):
-                        return None
-                # Fallback for direct value (old behavior)
-                try:
-                    return float(value) if value else None
-                except (ValueError, TypeError):
-                    return None
-            elif field_type == 'date':
-                # Date fields return dict with 'start' key (YYYY-MM-DD format)
-                return value.get('start') if isinstance(value, dict) else str(value)
-            elif field_type == 'phone':
-                # Phone fields: [{'type': 'home', 'value': '7578748884'}]
-                # V4.0.9 FIX: Handle phone field extraction properly
-                if isinstance(value, dict) and 'value' in value:
-                    return value.get('value', '')
-                return str(value) if value else None
-            elif field_type == 'text':
-                # Text fields: [{'value': '<p>R0090271</p>'}]
-                # Extract nested 'value' first
-                if isinstance(value, dict) and 'value' in value:
-                    text = value['value']
-                else:
-                    text = str(value) if value else None
-                
-                if text:
-                    text = re.sub(r'<[^>]+>', '', str(text))
-                    return text.strip()
-                return None
-            else:
-                # Default: return raw value
-                return value
-    return None
\ No newline at end of file
+        if field.get('field_id') == field_id:
+            return _decode_typed_value(field, field_type)
+    return None
@@ -11,12 +11,18 @@ Supports lead-type-aware bundle extraction per Contract v2.0:
 
 This is the core business intelligence layer for Pillar 2 (Conversion Analytics).
 
+V4.1: Extraction is driven by a compiled plan. INTELLIGENCE_FIELDS maps each
+output key to its (field_id, field_type); FIELD_BUNDLES lists the keys per
+lead type. Both are compiled at import into (key, field_id, field_type)
+tuples, and each item's fields are walked once. Adding a bundle (e.g. Phase 4
+Code Violation) is a data change.
+
 Extracted from podio_service.py as part of modularization effort.
 See services/podio/__init__.py for package overview.
 """
 
-from services.podio.item_service import get_podio_item
-from services.podio.field_extraction import extract_field_value_by_id
+from services.podio.item_service import get_podio_item, list_podio_items
+from services.podio.field_extraction import _decode_typed_value
 from config import (
     # V4.0 Enriched Data Field IDs (Contract v1.1.2) - Universal
     LEAD_SCORE_FIELD_ID,
@@ -76,6 +82,105 @@ from config import (
     VACANCY_DURATION_MONTHS_FIELD_ID,
 )
 
+# ============================================================================
+# INTELLIGENCE FIELD SPECS (V4.1)
+# ============================================================================
+
+# Output key -> (Podio field_id, field_type)
+# field_type None = auto-detect from the field metadata (same as extract_field_value_by_id)
+# field_id None = not yet provisioned in Podio; the key is returned as None
+INTELLIGENCE_FIELDS = {
+    # V4.0 Enriched Data Fields (Contract v1.1.2) - Universal
+    'lead_score': (LEAD_SCORE_FIELD_ID, None),
+    'lead_tier': (LEAD_TIER_FIELD_ID, None),
+    'estimated_property_value': (ESTIMATED_PROPERTY_VALUE_FIELD_ID, None),
+    'equity_percentage': (EQUITY_PERCENTAGE_FIELD_ID, None),
+    'estimated_equity': (ESTIMATED_EQUITY_FIELD_ID, None),
+    'year_built': (YEAR_BUILT_FIELD_ID, None),
+    'property_type': (PROPERTY_TYPE_FIELD_ID, None),
+    'validated_mailing_address': (VALIDATED_MAILING_ADDRESS_FIELD_ID, None),
+    'first_publication_date': (FIRST_PUBLICATION_DATE_FIELD_ID, None),
+    'law_firm_name': (LAW_FIRM_NAME_FIELD_ID, None),
+    # V3.6 Contact Fields (Contract v1.1.3)
+    'owner_name': (OWNER_NAME_FIELD_ID, None),
+    'owner_phone': (OWNER_PHONE_FIELD_ID, None),
+    'owner_email': (OWNER_EMAIL_FIELD_ID, None),
+    'owner_mailing_address': (OWNER_MAILING_ADDRESS_FIELD_ID, None),
+    'lead_type': (LEAD_TYPE_FIELD_ID, None),
+    # V4.0 Phase 1 - NED Listing
+    'auction_date': (AUCTION_DATE_FIELD_ID, None),
+    'balance_due': (BALANCE_DUE_FIELD_ID, None),
+    'opening_bid': (OPENING_BID_FIELD_ID, None),
+    # V4.0 Phase 1 - Foreclosure Auction
+    'auction_platform': (AUCTION_PLATFORM_FIELD_ID, None),
+    'auction_date_platform': (AUCTION_DATE_PLATFORM_FIELD_ID, None),
+    'opening_bid_platform': (OPENING_BID_PLATFORM_FIELD_ID, None),
+    'auction_location': (AUCTION_LOCATION_FIELD_ID, None),
+    'registration_deadline': (REGISTRATION_DEADLINE_FIELD_ID, None),
+    # V4.0 Phase 1 - Compliance & Secondary Owner (universal)
+    'owner_occupied': (OWNER_OCCUPIED_FIELD_ID, None),
+    'owner_name_secondary': (OWNER_NAME_SECONDARY_FIELD_ID, None),
+    'owner_phone_secondary': (OWNER_PHONE_SECONDARY_FIELD_ID, None),
+    'owner_email_secondary': (OWNER_EMAIL_SECONDARY_FIELD_ID, None),
+    # V4.0 Phase 2a - Probate/Estate
+    'executor_name': (EXECUTOR_NAME_FIELD_ID, None),
+    'probate_case_number': (PROBATE_CASE_NUMBER_FIELD_ID, None),
+    'probate_filing_date': (PROBATE_FILING_DATE_FIELD_ID, None),
+    'estate_value': (ESTATE_VALUE_FIELD_ID, None),
+    'decedent_name': (DECEDENT_NAME_FIELD_ID, None),
+    'court_jurisdiction': (COURT_JURISDICTION_FIELD_ID, None),
+    # V4.0 Phase 2b/2c - Tax Lien (including Multi-Year)
+    'tax_debt_amount': (TAX_DEBT_AMOUNT_FIELD_ID, None),
+    'delinquency_start_date': (DELINQUENCY_START_DATE_FIELD_ID, None),
+    'redemption_deadline': (REDEMPTION_DEADLINE_FIELD_ID, None),
+    'lien_type': (LIEN_TYPE_FIELD_ID, None),
+    'tax_delinquency_summary': (TAX_DELINQUENCY_SUMMARY_FIELD_ID, None),
+    'delinquent_years_count': (DELINQUENT_YEARS_COUNT_FIELD_ID, None),
+    # V4.0 Phase 2d - Stacked Distress Signals (Contract v2.2)
+    'active_distress_signals': (ACTIVE_DISTRESS_SIGNALS_FIELD_ID, None),
+    'distress_signal_count': (DISTRESS_SIGNAL_COUNT_FIELD_ID, None),
+    'multi_signal_lead': (MULTI_SIGNAL_LEAD_FIELD_ID, None),
+    # V4.0 Phase 3 - Absentee Owner / Tired Landlord
+    'portfolio_count': (PORTFOLIO_COUNT_FIELD_ID, None),
+    'ownership_tenure_years': (OWNERSHIP_TENURE_YEARS_FIELD_ID, None),
+    'out_of_state_owner': (OUT_OF_STATE_OWNER_FIELD_ID, None),
+    'last_sale_date': (LAST_SALE_DATE_FIELD_ID, None),
+    'vacancy_duration_months': (VACANCY_DURATION_MONTHS_FIELD_ID, None),
+}
+
+# Universal fields (always extracted - 16 fields from v1.1.2/v1.1.3), in UI order
+UNIVERSAL_FIELDS = [
+    # Priority Metrics (ui_priority 1-2) - MOST IMPORTANT
+    'lead_score',
+    'lead_tier',
+    # Deal Qualification (ui_priority 3-5) - FINANCIAL INTELLIGENCE
+    'estimated_property_value',
+    'equity_percentage',
+    'estimated_equity',           # May be calculated via V4.0.10 fallback
+    # Property Details (ui_priority 6-7) - CONTEXT
+    'year_built',
+    'property_type',
+    # Contact & Context (ui_priority 9) - APN hidden, address displayed
+    'validated_mailing_address',
+    # Timeline & Compliance (ui_priority 10-11) - REGULATORY
+    'first_publication_date',
+    'law_firm_name',
+    # V3.6 Contact Fields (Contract v1.1.3)
+    'owner_name',
+    'owner_phone',                # Click-to-dial enabled
+    'owner_email',
+    'owner_mailing_address',
+    'lead_type',
+]
+
+# Compliance & Secondary Owner fields (apply to ALL lead types)
+COMPLIANCE_FIELDS = [
+    'owner_occupied',             # Compliance & Risk Section (CRITICAL)
+    'owner_name_secondary',       # Secondary Owner Contact (co-owners)
+    'owner_phone_secondary',
+    'owner_email_secondary',
+]
+
 # ============================================================================
 # LEAD-TYPE-SPECIFIC FIELD BUNDLES (Contract v2.0)
 # ============================================================================
@@ -137,188 +242,251 @@ FIELD_BUNDLES = {
         "last_sale_date",             # Date of last property sale
         "vacancy_duration_months"     # Months vacant - CRITICAL for tired landlord
     ],
-    # Code Violation - Phase 4 (future)
+    # Code Violation - Phase 4 (future): add the bundle here and its keys to INTELLIGENCE_FIELDS
+}
+
+# Key into FIELD_BUNDLES for the universal stacking group (not a lead type)
+STACKING_BUNDLE = "stacking_signals"
+
+# Log line per bundle (bundles without an entry get a generic message)
+BUNDLE_LOG_MESSAGES = {
+    "NED Listing": "V4.0 Phase 1: Extracted NED Listing bundle",
+    "Foreclosure Auction": "V4.0 Phase 1: Extracted Foreclosure Auction bundle",
+    "Probate/Estate": "V4.0 Phase 2a: Extracted Probate/Estate bundle",
+    "Tax Lien": "V4.0 Phase 2b/2c: Extracted Tax Lien bundle (6 fields)",
+    "Absentee Owner": "V4.0 Phase 3: Extracted Absentee Owner bundle (5 fields)",
+    "Tired Landlord": "V4.0 Phase 3: Extracted Tired Landlord bundle (4 fields)",
 }
 
+# ============================================================================
+# COMPILED EXTRACTION PLAN (built once at import)
+# ============================================================================
+
+def _compile_plan(keys, exclude=()):
+    """
+    Compile output keys into a tuple of (key, field_id, field_type).
+
+    Args:
+        keys: Output keys (must exist in INTELLIGENCE_FIELDS)
+        exclude: Keys already produced by an earlier plan
+
+    Returns:
+        tuple: Plan entries; field_id is an int, or None if not provisioned
+    """
+    plan = []
+    for key in keys:
+        if key in exclude:
+            continue
+        field_id, field_type = INTELLIGENCE_FIELDS[key]
+        plan.append((key, int(field_id) if field_id is not None else None, field_type))
+    return tuple(plan)
+
+
+UNIVERSAL_PLAN = _compile_plan(UNIVERSAL_FIELDS)
+
+# Bundle keys already extracted as universal fields are not repeated
+BUNDLE_PLANS = {
+    lead_type: _compile_plan(keys, exclude=UNIVERSAL_FIELDS)
+    for lead_type, keys in FIELD_BUNDLES.items()
+    if lead_type != STACKING_BUNDLE
+}
+
+COMPLIANCE_PLAN = _compile_plan(COMPLIANCE_FIELDS)
+
+# Stacking signals are only extracted once the fields exist in Podio (Contract v2.2)
+STACKING_PLAN = (
+    _compile_plan(FIELD_BUNDLES[STACKING_BUNDLE])
+    if ACTIVE_DISTRESS_SIGNALS_FIELD_ID is not None else ()
+)
+
+# Queue/list views only need these (fetched with a compact item view - V4.1)
+LEAD_SUMMARY_FIELDS = [
+    'lead_score',
+    'lead_tier',
+    'owner_phone',
+]
+
+SUMMARY_PLAN = _compile_plan(LEAD_SUMMARY_FIELDS)
+
+# Every field_id any plan may read - the single pass keeps only these fields
+_PLAN_FIELD_IDS = frozenset(
+    field_id
+    for plan in (UNIVERSAL_PLAN, COMPLIANCE_PLAN, STACKING_PLAN, *BUNDLE_PLANS.values())
+    for _key, field_id, _field_type in plan
+    if field_id is not None
+)
+
+
+def _collect_plan_fields(item):
+    """
+    Single pass over item['fields'] keeping the first field for each planned ID.
+
+    Returns:
+        dict: field_id -> raw Podio field dict
+    """
+    fields_by_id = {}
+    for field in item.get('fields', []):
+        field_id = field.get('field_id')
+        if field_id in _PLAN_FIELD_IDS and field_id not in fields_by_id:
+            fields_by_id[field_id] = field
+    return fields_by_id
+
+
+def _apply_plan(plan, fields_by_id, intelligence):
+    """Decode every plan entry into the intelligence dict (None when missing)."""
+    for key, field_id, field_type in plan:
+        field = fields_by_id.get(field_id)
+        intelligence[key] = _decode_typed_value(field, field_type) if field is not None else None
+
+
 # ============================================================================
 # LEAD INTELLIGENCE EXTRACTION (Contract v2.0)
 # ============================================================================
 
 def get_lead_intelligence(item_id):
     """
-    Extract all V4.0 Phase 1 enriched intelligence fields from Podio Master Lead item
-    with lead-type-aware bundle extraction per Contract v2.0.
-    
+    Retrieve a Master Lead from Podio and extract its intelligence fields.
+
     Args:
         item_id: Podio Master Lead item ID to retrieve and extract from
-        
+
     Returns:
         dict: Intelligence data with all enriched fields, or empty dict if item not found
-        
+
+    Note:
+        Routes that already hold the fetched item should call
+        extract_lead_intelligence(item) directly to avoid a second Podio fetch.
+    """
+    # Retrieve the lead item from Podio
+    item = get_podio_item(item_id)
+
+    if not item:
+        print(f"WARNING: Could not retrieve item {item_id} for intelligence extraction")
+        return {}
+
+    return extract_lead_intelligence(item)
+
+
+def extract_lead_intelligence(item):
+    """
+    Extract all V4.0 Phase 1 enriched intelligence fields from an already fetched
+    Podio Master Lead item with lead-type-aware bundle extraction per Contract v2.0.
+
+    Args:
+        item: Podio Master Lead item dict (as returned by get_podio_item)
+
+    Returns:
+        dict: Intelligence data with all enriched fields, or empty dict if item is empty
+
     Note:
         All fields return None if not populated (graceful degradation).
         UI layer must handle None values appropriately (display "Unknown" or "N/A").
-        This function retrieves the item from Podio and extracts up to 28 total fields:
+        This function extracts up to 28 total fields:
         - 11 V4.0 enriched fields (Contract v1.1.2) - Universal
         - 5 V3.6 contact fields (Contract v1.1.3) - Universal
         - 12 V4.0 Phase 1 fields (Contract v2.0) - Lead-type-specific + universal compliance
-        
+
     Lead-Type-Aware Extraction:
         - lead_type is extracted first to determine which bundle to include
         - Universal fields are always extracted
         - Lead-type-specific bundle fields are extracted based on lead_type
         - Secondary owner and owner_occupied fields are always extracted (apply to ALL lead types)
+
+    V4.1 Compiled Plan:
+        The item's fields are walked once (_collect_plan_fields); each plan is
+        then a tuple of (key, field_id, field_type) decoded in order. Output
+        keys, order and values match the previous per-field extraction.
     """
-    # Retrieve the lead item from Podio
-    item = get_podio_item(item_id)
-    
     if not item:
-        print(f"WARNING: Could not retrieve item {item_id} for intelligence extraction")
         return {}
-    
-    # STEP 1: Extract lead_type FIRST (determines bundle extraction)
-    lead_type = extract_field_value_by_id(item, LEAD_TYPE_FIELD_ID)
-    
+
+    item_id = item.get('item_id')
+
+    # STEP 1: Single pass over the item's fields
+    fields_by_id = _collect_plan_fields(item)
+
     # STEP 2: Extract Universal Fields (always included - 16 fields from v1.1.2/v1.1.3)
-    
-    # Deal Qualification fields (extracted first for fallback calculation)
-    estimated_property_value = extract_field_value_by_id(item, ESTIMATED_PROPERTY_VALUE_FIELD_ID)
-    equity_percentage = extract_field_value_by_id(item, EQUITY_PERCENTAGE_FIELD_ID)
-    estimated_equity = extract_field_value_by_id(item, ESTIMATED_EQUITY_FIELD_ID)
-    
+    intelligence = {}
+    _apply_plan(UNIVERSAL_PLAN, fields_by_id, intelligence)
+    lead_type = intelligence.get('lead_type')
+
     # V4.0.10 FIX: Calculate estimated_equity if not populated in Podio
     # Fallback: estimated_equity = estimated_property_value * (equity_percentage / 100)
-    if estimated_equity is None and estimated_property_value is not None and equity_percentage is not None:
+    estimated_property_value = intelligence.get('estimated_property_value')
+    equity_percentage = intelligence.get('equity_percentage')
+    if intelligence.get('estimated_equity') is None and estimated_property_value is not None and equity_percentage is not None:
         try:
             estimated_equity = estimated_property_value * (equity_percentage / 100.0)
             print(f"V4.0.10: Calculated estimated_equity via fallback: ${estimated_equity:,.0f} (${estimated_property_value:,.0f} × {equity_percentage:.1f}%)")
         except (TypeError, ValueError) as e:
             print(f"V4.0.10: Could not calculate estimated_equity fallback: {e}")
             estimated_equity = None
-    
-    intelligence = {
-        # Priority Metrics (ui_priority 1-2) - MOST IMPORTANT
-        'lead_score': extract_field_value_by_id(item, LEAD_SCORE_FIELD_ID),
-        'lead_tier': extract_field_value_by_id(item, LEAD_TIER_FIELD_ID),
-        
-        # Deal Qualification (ui_priority 3-5) - FINANCIAL INTELLIGENCE
-        'estimated_property_value': estimated_property_value,
-        'equity_percentage': equity_percentage,
-        'estimated_equity': estimated_equity,  # May be calculated via V4.0.10 fallback
-        
-        # Property Details (ui_priority 6-7) - CONTEXT
-        'year_built': extract_field_value_by_id(item, YEAR_BUILT_FIELD_ID),
-        'property_type': extract_field_value_by_id(item, PROPERTY_TYPE_FIELD_ID),
-        
-        # Contact & Context (ui_priority 9) - APN hidden, address displayed
-        'validated_mailing_address': extract_field_value_by_id(item, VALIDATED_MAILING_ADDRESS_FIELD_ID),
-        
-        # Timeline & Compliance (ui_priority 10-11) - REGULATORY
-        'first_publication_date': extract_field_value_by_id(item, FIRST_PUBLICATION_DATE_FIELD_ID),
-        'law_firm_name': extract_field_value_by_id(item, LAW_FIRM_NAME_FIELD_ID),
-        
-        # V3.6 Contact Fields (Contract v1.1.3)
-        'owner_name': extract_field_value_by_id(item, OWNER_NAME_FIELD_ID),
-        'owner_phone': extract_field_value_by_id(item, OWNER_PHONE_FIELD_ID),  # Click-to-dial enabled
-        'owner_email': extract_field_value_by_id(item, OWNER_EMAIL_FIELD_ID),
-        'owner_mailing_address': extract_field_value_by_id(item, OWNER_MAILING_ADDRESS_FIELD_ID),
-        'lead_type': lead_type,  # Already extracted above
-    }
-    
+        intelligence['estimated_equity'] = estimated_equity
+
     # STEP 3: Extract Lead-Type-Specific Bundle Fields (Contract v2.0)
-    if lead_type == "NED Listing":
-        # NED Foreclosure Bundle
-        intelligence.update({
-            'auction_date': extract_field_value_by_id(item, AUCTION_DATE_FIELD_ID),
-            'balance_due': extract_field_value_by_id(item, BALANCE_DUE_FIELD_ID),
-            'opening_bid': extract_field_value_by_id(item, OPENING_BID_FIELD_ID),
-        })
-        print(f"V4.0 Phase 1: Extracted NED Listing bundle for item {item_id}")
-        
-    elif lead_type == "Foreclosure Auction":
-        # Foreclosure Auction Bundle
-        intelligence.update({
-            'auction_platform': extract_field_value_by_id(item, AUCTION_PLATFORM_FIELD_ID),
-            'auction_date_platform': extract_field_value_by_id(item, AUCTION_DATE_PLATFORM_FIELD_ID),
-            'opening_bid_platform': extract_field_value_by_id(item, OPENING_BID_PLATFORM_FIELD_ID),
-            'auction_location': extract_field_value_by_id(item, AUCTION_LOCATION_FIELD_ID),
-            'registration_deadline': extract_field_value_by_id(item, REGISTRATION_DEADLINE_FIELD_ID),
-        })
-        print(f"V4.0 Phase 1: Extracted Foreclosure Auction bundle for item {item_id}")
-        
-    elif lead_type == "Probate/Estate":
-        # V4.0 Phase 2a - Probate/Estate Bundle (6 fields)
-        intelligence.update({
-            'executor_name': extract_field_value_by_id(item, EXECUTOR_NAME_FIELD_ID),
-            'probate_case_number': extract_field_value_by_id(item, PROBATE_CASE_NUMBER_FIELD_ID),
-            'probate_filing_date': extract_field_value_by_id(item, PROBATE_FILING_DATE_FIELD_ID),
-            'estate_value': extract_field_value_by_id(item, ESTATE_VALUE_FIELD_ID),
-            'decedent_name': extract_field_value_by_id(item, DECEDENT_NAME_FIELD_ID),
-            'court_jurisdiction': extract_field_value_by_id(item, COURT_JURISDICTION_FIELD_ID),
-        })
-        print(f"V4.0 Phase 2a: Extracted Probate/Estate bundle for item {item_id}")
-        
-    elif lead_type == "Tax Lien":
-        # V4.0 Phase 2b/2c - Tax Lien Bundle (6 fields, including Multi-Year)
-        intelligence.update({
-            'tax_debt_amount': extract_field_value_by_id(item, TAX_DEBT_AMOUNT_FIELD_ID),
-            'delinquency_start_date': extract_field_value_by_id(item, DELINQUENCY_START_DATE_FIELD_ID),
-            'redemption_deadline': extract_field_value_by_id(item, REDEMPTION_DEADLINE_FIELD_ID),
-            'lien_type': extract_field_value_by_id(item, LIEN_TYPE_FIELD_ID),
-            'tax_delinquency_summary': extract_field_value_by_id(item, TAX_DELINQUENCY_SUMMARY_FIELD_ID),
-            'delinquent_years_count': extract_field_value_by_id(item, DELINQUENT_YEARS_COUNT_FIELD_ID),
-        })
-        print(f"V4.0 Phase 2b/2c: Extracted Tax Lien bundle (6 fields) for item {item_id}")
-        
-    elif lead_type == "Absentee Owner":
-        # V4.0 Phase 3 - Absentee Owner Bundle (5 fields)
-        intelligence.update({
-            'portfolio_count': extract_field_value_by_id(item, PORTFOLIO_COUNT_FIELD_ID),
-            'ownership_tenure_years': extract_field_value_by_id(item, OWNERSHIP_TENURE_YEARS_FIELD_ID),
-            'out_of_state_owner': extract_field_value_by_id(item, OUT_OF_STATE_OWNER_FIELD_ID),
-            'last_sale_date': extract_field_value_by_id(item, LAST_SALE_DATE_FIELD_ID),
-            'vacancy_duration_months': extract_field_value_by_id(item, VACANCY_DURATION_MONTHS_FIELD_ID),
-        })
-        print(f"V4.0 Phase 3: Extracted Absentee Owner bundle (5 fields) for item {item_id}")
-        
-    elif lead_type == "Tired Landlord":
-        # V4.0 Phase 3 - Tired Landlord Bundle (4 fields - shares with Absentee Owner)
-        intelligence.update({
-            'portfolio_count': extract_field_value_by_id(item, PORTFOLIO_COUNT_FIELD_ID),
-            'ownership_tenure_years': extract_field_value_by_id(item, OWNERSHIP_TENURE_YEARS_FIELD_ID),
-            'last_sale_date': extract_field_value_by_id(item, LAST_SALE_DATE_FIELD_ID),
-            'vacancy_duration_months': extract_field_value_by_id(item, VACANCY_DURATION_MONTHS_FIELD_ID),
-        })
-        print(f"V4.0 Phase 3: Extracted Tired Landlord bundle (4 fields) for item {item_id}")
-        
+    bundle_plan = BUNDLE_PLANS.get(lead_type) if isinstance(lead_type, str) else None
+    if bundle_plan is not None:
+        _apply_plan(bundle_plan, fields_by_id, intelligence)
+        message = BUNDLE_LOG_MESSAGES.get(lead_type, f"V4.1: Extracted {lead_type} bundle ({len(bundle_plan)} fields)")
+        print(f"{message} for item {item_id}")
     else:
         # Unknown or unsupported lead type - log for Phase 4 development
         if lead_type:
             print(f"V4.0: Lead type '{lead_type}' not yet supported - Phase 4 bundle")
         else:
             print(f"V4.0: No lead_type set for item {item_id}")
-    
+
     # STEP 4: Extract Universal Compliance & Secondary Owner Fields (apply to ALL lead types)
-    # These fields are critical for compliance and apply regardless of lead type
-    intelligence.update({
-        # Compliance & Risk Section (CRITICAL - applies to all lead types)
-        'owner_occupied': extract_field_value_by_id(item, OWNER_OCCUPIED_FIELD_ID),
-        
-        # Secondary Owner Contact (applies to all lead types with co-owners)
-        'owner_name_secondary': extract_field_value_by_id(item, OWNER_NAME_SECONDARY_FIELD_ID),
-        'owner_phone_secondary': extract_field_value_by_id(item, OWNER_PHONE_SECONDARY_FIELD_ID),
-        'owner_email_secondary': extract_field_value_by_id(item, OWNER_EMAIL_SECONDARY_FIELD_ID),
-    })
-    
+    _apply_plan(COMPLIANCE_PLAN, fields_by_id, intelligence)
+
     # STEP 5: Extract Stacked Distress Signals (Contract v2.2 - UNIVERSAL)
-    # These fields apply to ALL lead types that have multiple distress signals
-    # Field IDs may be None until script runs - graceful degradation via extract function
-    if ACTIVE_DISTRESS_SIGNALS_FIELD_ID is not None:
-        intelligence.update({
-            'active_distress_signals': extract_field_value_by_id(item, ACTIVE_DISTRESS_SIGNALS_FIELD_ID),
-            'distress_signal_count': extract_field_value_by_id(item, DISTRESS_SIGNAL_COUNT_FIELD_ID),
-            'multi_signal_lead': extract_field_value_by_id(item, MULTI_SIGNAL_LEAD_FIELD_ID),
-        })
+    if STACKING_PLAN:
+        _apply_plan(STACKING_PLAN, fields_by_id, intelligence)
         print(f"V4.0 Phase 2d: Extracted Stacking Signals bundle for item {item_id}")
+
+    return intelligence
+
+
+# ============================================================================
+# LEAD SUMMARIES FOR QUEUES (V4.1 compact views)
+# ============================================================================
+
+def summarize_lead(item):
+    """
+    Build a queue row (item_id, title + LEAD_SUMMARY_FIELDS) from a Podio item.
     
-    return intelligence
\ No newline at end of file
+    Args:
+        item: Full or projected Podio Master Lead item
+        
+    Returns:
+        dict: Summary row, or empty dict if item is empty
+    """
+    if not item:
+        return {}
+    
+    summary = {'item_id': item.get('item_id'), 'title': item.get('title')}
+    fields_by_id = {}
+    for field in item.get('fields', []):
+        field_id = field.get('field_id')
+        if field_id not in fields_by_id:
+            fields_by_id[field_id] = field
+    _apply_plan(SUMMARY_PLAN, fields_by_id, summary)
+    return summary
+
+
+def list_lead_summaries(limit=100, offset=0):
+    """
+    List Master Leads for a queue with a compact (micro) item view.
+    
+    Args:
+        limit: Page size (max 500)
+        offset: Page offset
+        
+    Returns:
+        tuple: (summaries: list, total: int), or (None, 0) on error
+    """
+    field_ids = [field_id for _key, field_id, _field_type in SUMMARY_PLAN if field_id is not None]
+    items, total = list_podio_items(field_ids=field_ids, limit=limit, offset=offset)
+    if items is None:
+        return None, 0
+    return [summarize_lead(item) for item in items], total
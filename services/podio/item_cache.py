@@ -0,0 +1,233 @@
+"""
+Podio Item Cache - Bounded TTL/LRU Cache for Master Lead Items
+
+Agents reopen the same lead several times per session (dial, hang up,
+dispose, redial secondary). This cache keeps recently fetched Master Lead
+items in process memory so those reopens skip the Podio filter call.
+
+Entry Lifecycle:
+    fresh  (age < ttl):                  served directly
+    stale  (ttl <= age < ttl + stale):   served immediately, refreshed in the background
+    expired (age >= ttl + stale):        treated as a miss and refetched
+
+The stale window (PODIO_ITEM_CACHE_STALE_SECONDS) is 0 by default, so no
+entry older than the TTL is served unless it is configured.
+
+This is a plain TTL cache: a hit is served without asking Podio whether
+the item changed. Edits made in Podio reach /workspace when /podio_hook
+evicts the item (register the hook on the Master Lead app) or, without the
+hook, once the entry is older than PODIO_ITEM_CACHE_TTL_SECONDS. Callers
+that must see the current item (the /dial phone lookup) bypass the cache.
+
+Entries carry the item's current_revision only to order writes: put()
+ignores a copy older than the cached one, so an out-of-order refresh can
+never roll an item back.
+
+Business Justification:
+    Pillar 5 (Scalability): Instant /workspace renders for recently opened leads
+                            and fewer Podio calls against the rate limit
+
+Used By:
+    - services.podio.item_service (get_podio_item)
+    - app.py (/podio_hook invalidation, /api/metrics)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    PODIO_ITEM_CACHE_MAX_ENTRIES,
+    PODIO_ITEM_CACHE_TTL_SECONDS,
+    PODIO_ITEM_CACHE_STALE_SECONDS,
+)
+
+# get() states
+CACHE_FRESH = 'fresh'
+CACHE_STALE = 'stale'
+
+
+def get_item_revision(item):
+    """
+    Get the revision number of a Podio item.
+
+    Args:
+        item: Podio item dict
+
+    Returns:
+        int: current_revision.revision, or None if the payload has no revision
+    """
+    if not item:
+        return None
+    current_revision = item.get('current_revision')
+    if isinstance(current_revision, dict) and current_revision.get('revision') is not None:
+        return current_revision.get('revision')
+    return item.get('revision')
+
+
+class ItemCache:
+    """
+    Thread-safe LRU cache with TTL and a stale-while-revalidate window.
+
+    Keys are integer item IDs. Values are (item, revision, stored_at).
+    """
+
+    def __init__(self, max_entries, ttl_seconds, stale_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'stale_writes_rejected': 0,
+            'revalidations': 0,
+            'revalidations_changed': 0,
+            'revalidation_failures': 0,
+        }
+
+    @staticmethod
+    def _key(item_id):
+        try:
+            return int(item_id)
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, item_id):
+        """
+        Look up an item.
+
+        Returns:
+            tuple: (item, state) with state CACHE_FRESH or CACHE_STALE,
+                   or (None, None) on a miss
+        """
+        key = self._key(item_id)
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None, None
+
+            item, _revision, stored_at = entry
+            age = time.time() - stored_at
+
+            if age >= self.ttl_seconds + self.stale_seconds:
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None, None
+
+            self._entries.move_to_end(key)
+            if age < self.ttl_seconds:
+                self._stats['hits'] += 1
+                return item, CACHE_FRESH
+
+            self._stats['stale_hits'] += 1
+            return item, CACHE_STALE
+
+    def put(self, item_id, item):
+        """
+        Store an item unless the cache already holds a newer revision.
+
+        Returns:
+            bool: True if the item was stored (or refreshed)
+        """
+        key = self._key(item_id)
+        if item is None or key is None:
+            return False
+
+        revision = get_item_revision(item)
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None and revision is not None and existing[1] is not None \
+                    and revision < existing[1]:
+                self._stats['stale_writes_rejected'] += 1
+                return False
+
+            self._entries[key] = (item, revision, time.time())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+            return True
+
+    def record_revalidation(self, previous_revision, item):
+        """Count a background refresh and whether it found a new revision."""
+        with self._lock:
+            if item is None:
+                self._stats['revalidation_failures'] += 1
+                return
+            self._stats['revalidations'] += 1
+            if get_item_revision(item) != previous_revision:
+                self._stats['revalidations_changed'] += 1
+
+    def invalidate(self, item_id):
+        """
+        Drop a single item (e.g. after a Podio item.update hook).
+
+        Returns:
+            bool: True if an entry was removed
+        """
+        key = self._key(item_id)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats['invalidations'] += 1
+                return True
+            return False
+
+    def clear(self):
+        """Drop every cached item."""
+        with self._lock:
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Snapshot of cache metrics.
+
+        Returns:
+            dict: Counters plus current size and configuration
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['stale_hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'stale_seconds': self.stale_seconds,
+                'hit_ratio': round((self._stats['hits'] + self._stats['stale_hits']) / lookups, 3) if lookups else None,
+            }
+
+
+# Module-level cache shared by all requests in this instance
+item_cache = ItemCache(
+    max_entries=PODIO_ITEM_CACHE_MAX_ENTRIES,
+    ttl_seconds=PODIO_ITEM_CACHE_TTL_SECONDS,
+    stale_seconds=PODIO_ITEM_CACHE_STALE_SECONDS,
+)
+
+
+def invalidate_cached_item(item_id):
+    """Invalidation hook: drop one Master Lead item from the cache."""
+    removed = item_cache.invalidate(item_id)
+    if removed:
+        print(f"V4.1: Invalidated cached Podio item {item_id}")
+    return removed
+
+
+def clear_item_cache():
+    """Invalidation hook: drop every cached Master Lead item."""
+    item_cache.clear()
+    print("V4.1: Cleared Podio item cache")
+
+
+def get_item_cache_stats():
+    """Hit/miss/eviction metrics for the Master Lead item cache."""
+    return item_cache.stats()
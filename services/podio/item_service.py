@@ -11,9 +11,8 @@ Business Justification:
     Pillar 5 (Scalability): Separates read/write concerns for clearer debugging
 
 Dependencies:
-    - services.podio.oauth: OAuth token management
+    - services.podio.client: Pooled, authenticated Podio API client
     - config: App IDs and field IDs for Podio schema
-    - requests: HTTP client for Podio API
 
 Used By:
     - podio_service.py (backward compatibility)
@@ -21,14 +20,19 @@ Used By:
 """
 
 import json
-import requests
+import threading
+from contextvars import ContextVar
 from datetime import datetime
 
-# Import OAuth token management from sibling module
-from services.podio.oauth import refresh_podio_token
+# Import pooled Podio API client from sibling module (V4.1)
+from services.podio.client import get_podio_client, PodioAuthError
+from services.podio.request_stats import increment_request_stat, PODIO_ITEM_FETCHES
+from services.podio.item_cache import item_cache, get_item_revision, CACHE_STALE
+from services.podio.rate_limit import podio_priority, PRIORITY_BACKGROUND
 
 # Import required configuration
 from config import (
+    PODIO_ITEM_CACHE_ENABLED,
     # App IDs
     MASTER_LEAD_APP_ID,
     CALL_ACTIVITY_APP_ID,
@@ -105,16 +109,38 @@ def generate_title(data, item_id):
     return f"Call - Lead #{item_id} - {timestamp}"
 
 
+# ============================================================================
+# REQUEST-SCOPED ITEM MEMO (V4.1)
+# ============================================================================
+
+# item_id -> item for the current Flask request. None outside a request
+# (scripts, background work) so nothing is memoized beyond request scope.
+_request_item_memo = ContextVar('podio_request_item_memo', default=None)
+
+
+def reset_request_item_memo():
+    """Start an empty item memo for the current request (called from app.before_request)."""
+    _request_item_memo.set({})
+
+
+def _memo_key(item_id):
+    try:
+        return int(item_id)
+    except (TypeError, ValueError):
+        return item_id
+
+
 # ============================================================================
 # ITEM RETRIEVAL
 # ============================================================================
 
-def get_podio_item(item_id):
+def get_podio_item(item_id, use_cache=True):
     """
     Fetch a specific Podio item using app filter (workaround for direct access 404s)
     
     Args:
         item_id: The Podio item ID to fetch
+        use_cache: Serve from the Master Lead item cache when possible (V4.1)
         
     Returns:
         dict: Item data if found, None otherwise
@@ -122,20 +148,79 @@ def get_podio_item(item_id):
     Note:
         Uses POST /item/app/{app_id}/filter instead of GET /item/{id}
         due to permission/access restrictions on direct item retrieval.
+        
+        V4.1: Within a Flask request the item is memoized, so routes that
+        need the same lead more than once only fetch it from Podio once.
+        Across requests, recently fetched items come from the TTL/LRU item
+        cache without a revision check (pass use_cache=False where the
+        current item is required); stale entries (PODIO_ITEM_CACHE_STALE_SECONDS, off by default)
+        are returned immediately and refreshed in the background. Returned
+        items are shared - callers must not mutate them.
     """
-    token = refresh_podio_token()
-    if not token:
-        print("ERROR: Could not obtain Podio OAuth token")
-        return None
+    memo = _request_item_memo.get()
+    if memo is not None and _memo_key(item_id) in memo:
+        print(f"V4.1: Reusing item {item_id} already fetched in this request")
+        return memo[_memo_key(item_id)]
+    
+    item = None
+    if use_cache and PODIO_ITEM_CACHE_ENABLED:
+        item, state = item_cache.get(item_id)
+        if item is not None:
+            print(f"V4.1: Item cache {state} hit for item {item_id}")
+            if state == CACHE_STALE:
+                _schedule_revalidation(item_id, get_item_revision(item))
     
+    if item is None:
+        item = _fetch_podio_item(item_id)
+        if item is not None and PODIO_ITEM_CACHE_ENABLED:
+            item_cache.put(item_id, item)
+    
+    if memo is not None and item is not None:
+        memo[_memo_key(item_id)] = item
+    return item
+
+
+# Item IDs with a background refresh in flight (one refresh per item at a time)
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+def _schedule_revalidation(item_id, cached_revision):
+    """
+    Refresh a stale cache entry in a background thread.
+    
+    Note:
+        On serverless the instance may be frozen after the response is sent;
+        an interrupted refresh simply leaves the stale entry for the next request.
+    """
+    key = _memo_key(item_id)
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+    
+    def _revalidate():
+        try:
+            # Cache refreshes must never compete with agent requests for quota
+            with podio_priority(PRIORITY_BACKGROUND):
+                fresh_item = _fetch_podio_item(item_id)
+            item_cache.record_revalidation(cached_revision, fresh_item)
+            if fresh_item is not None:
+                item_cache.put(item_id, fresh_item)
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+    
+    threading.Thread(target=_revalidate, name=f'podio-revalidate-{key}', daemon=True).start()
+
+
+def _fetch_podio_item(item_id):
+    """Fetch a single Master Lead item from Podio (no memo)."""
+    increment_request_stat(PODIO_ITEM_FETCHES)
     try:
         # Use app-based filtering instead of direct item access
-        response = requests.post(
-            f'https://api.podio.com/item/app/{MASTER_LEAD_APP_ID}/filter',
-            headers={
-                'Authorization': f'OAuth2 {token}',
-                'Content-Type': 'application/json'
-            },
+        response = get_podio_client().post(
+            f'/item/app/{MASTER_LEAD_APP_ID}/filter',
             json={
                 'filters': {
                     'item_id': int(item_id)  # Filter by specific item_id
@@ -158,11 +243,262 @@ def get_podio_item(item_id):
             print(f"Response: {response.text}")
             return None
             
+    except PodioAuthError:
+        print("ERROR: Could not obtain Podio OAuth token")
+        return None
     except Exception as e:
         print(f"EXCEPTION in get_podio_item(): {str(e)}")
         return None
 
 
+# ============================================================================
+# BATCH ITEM RETRIEVAL (V4.1)
+# ============================================================================
+
+# Podio's filter endpoint returns at most 500 items per call
+PODIO_FILTER_PAGE_LIMIT = 500
+
+
+def get_podio_items(item_ids, use_cache=True):
+    """
+    Fetch many Master Lead items with as few Podio filter calls as possible.
+    
+    Args:
+        item_ids: Iterable of Podio item IDs (duplicates and invalid IDs are ignored)
+        use_cache: Serve fresh entries from the Master Lead item cache (V4.1)
+        
+    Returns:
+        dict: item_id (int) -> item, in request order; IDs Podio did not
+              return are omitted (compare against the input to find missing leads)
+        
+    Note:
+        Uncached IDs are fetched in chunks of up to 500 with a single
+        POST /item/app/{app_id}/filter per chunk (filters.item_id = [ids]),
+        paging with offset if Podio returns fewer items than requested.
+        Stale cache entries are refetched as part of the batch and served
+        stale only if the batch call fails. Fetched items populate the item
+        cache and the request memo, like get_podio_item().
+    """
+    ids = []
+    seen = set()
+    for item_id in item_ids:
+        try:
+            key = int(item_id)
+        except (TypeError, ValueError):
+            print(f"WARNING: Skipping invalid item_id {item_id!r} in batch fetch")
+            continue
+        if key not in seen:
+            seen.add(key)
+            ids.append(key)
+    
+    memo = _request_item_memo.get()
+    found = {}
+    stale = {}
+    to_fetch = []
+    for key in ids:
+        if memo is not None and key in memo:
+            found[key] = memo[key]
+            continue
+        if use_cache and PODIO_ITEM_CACHE_ENABLED:
+            item, state = item_cache.get(key)
+            if item is not None and state != CACHE_STALE:
+                found[key] = item
+                continue
+            if item is not None:
+                stale[key] = item
+        to_fetch.append(key)
+    
+    if to_fetch:
+        print(f"V4.1: Batch fetching {len(to_fetch)} of {len(ids)} items ({len(ids) - len(to_fetch)} from memo/cache)")
+    
+    for start in range(0, len(to_fetch), PODIO_FILTER_PAGE_LIMIT):
+        chunk = to_fetch[start:start + PODIO_FILTER_PAGE_LIMIT]
+        for item in _fetch_podio_items_chunk(chunk):
+            key = item.get('item_id')
+            if key not in seen:
+                continue
+            found[key] = item
+            if PODIO_ITEM_CACHE_ENABLED:
+                item_cache.put(key, item)
+    
+    # Fall back to stale copies for anything the batch could not refresh
+    for key, item in stale.items():
+        found.setdefault(key, item)
+    
+    if memo is not None:
+        memo.update(found)
+    
+    return {key: found[key] for key in ids if key in found}
+
+
+def _fetch_podio_items_chunk(item_ids):
+    """
+    Fetch up to PODIO_FILTER_PAGE_LIMIT Master Lead items by ID (no memo/cache).
+    
+    Returns:
+        list: Items returned by Podio (possibly fewer than requested)
+    """
+    items = []
+    offset = 0
+    try:
+        while True:
+            increment_request_stat(PODIO_ITEM_FETCHES)
+            response = get_podio_client().post(
+                f'/item/app/{MASTER_LEAD_APP_ID}/filter',
+                json={
+                    'filters': {
+                        'item_id': list(item_ids)
+                    },
+                    'limit': PODIO_FILTER_PAGE_LIMIT,
+                    'offset': offset
+                }
+            )
+            
+            if response.status_code != 200:
+                print(f"ERROR: Podio API returned {response.status_code} for batch filter")
+                print(f"Response: {response.text}")
+                break
+            
+            page = response.json().get('items', [])
+            items.extend(page)
+            offset += len(page)
+            if not page or len(page) < PODIO_FILTER_PAGE_LIMIT or offset >= len(item_ids):
+                break
+        
+        print(f"SUCCESS: Retrieved {len(items)} of {len(item_ids)} items via batch app filter")
+    except PodioAuthError:
+        print("ERROR: Could not obtain Podio OAuth token")
+    except Exception as e:
+        print(f"EXCEPTION in get_podio_items(): {str(e)}")
+    return items
+
+
+# ============================================================================
+# COMPACT ITEM VIEWS (V4.1)
+# ============================================================================
+
+# Podio item views, smallest first. micro = item_id, app_item_id, title, link;
+# full = everything (fields with config, files, tags, revisions, ...)
+ITEM_VIEW_MICRO = 'micro'
+ITEM_VIEW_MINI = 'mini'
+ITEM_VIEW_FULL = 'full'
+ITEM_VIEWS = (ITEM_VIEW_MICRO, ITEM_VIEW_MINI, ITEM_VIEW_FULL)
+
+# Item keys kept by project_item() besides the selected fields
+PROJECTED_ITEM_KEYS = ('item_id', 'app_item_id', 'title', 'link', 'current_revision')
+
+# Field keys kept on each projected field (enough for field_extraction)
+PROJECTED_FIELD_KEYS = ('field_id', 'external_id', 'label', 'type', 'values')
+
+
+def build_item_fields_param(view=ITEM_VIEW_MICRO, field_ids=None):
+    """
+    Build Podio's `fields` query parameter for a compact item view.
+    
+    Args:
+        view: One of ITEM_VIEWS
+        field_ids: Field IDs the caller needs (adds field values to the view)
+        
+    Returns:
+        str: e.g. 'items.view(micro).fields(fields)', or None for the full view
+    """
+    if view not in ITEM_VIEWS:
+        raise ValueError(f"Unknown Podio item view: {view}")
+    if view == ITEM_VIEW_FULL:
+        return None
+    param = f'items.view({view})'
+    if field_ids:
+        param += '.fields(fields)'
+    return param
+
+
+def project_item(item, field_ids=None):
+    """
+    Reduce a Podio item to its identity keys and the selected fields.
+    
+    Podio can only include or exclude field values as a whole, so the
+    per-field selection happens here, right after decoding.
+    
+    Args:
+        item: Podio item dict
+        field_ids: Field IDs to keep (None = keep no field values)
+        
+    Returns:
+        dict: Projected item usable with extract_field_value_by_id()
+    """
+    wanted = {int(field_id) for field_id in field_ids or ()}
+    projected = {key: item[key] for key in PROJECTED_ITEM_KEYS if key in item}
+    projected['fields'] = [
+        {key: field[key] for key in PROJECTED_FIELD_KEYS if key in field}
+        for field in item.get('fields', [])
+        if field.get('field_id') in wanted
+    ]
+    return projected
+
+
+def list_podio_items(app_id=MASTER_LEAD_APP_ID, field_ids=None, view=ITEM_VIEW_MICRO,
+                     limit=PODIO_FILTER_PAGE_LIMIT, offset=0, filters=None, sort_by=None, sort_desc=True):
+    """
+    List one page of items with a compact view and only the declared fields.
+    
+    Args:
+        app_id: Podio app to list (default: Master Lead app)
+        field_ids: Field IDs the caller needs; other fields are dropped
+        view: Podio item view (default micro - no comments, files or field config)
+        limit: Page size (max 500)
+        offset: Page offset
+        filters: Optional Podio filter dict
+        sort_by: Optional Podio sort key (e.g. 'created_on')
+        sort_desc: Sort descending when sort_by is set
+        
+    Returns:
+        tuple: (items: list, total: int), or (None, 0) on error
+        
+    Note:
+        Projected items are NOT stored in the Master Lead item cache, which
+        only holds full items. Use get_podio_item(s) when all fields are needed.
+    """
+    body = {
+        'limit': min(int(limit), PODIO_FILTER_PAGE_LIMIT),
+        'offset': int(offset),
+    }
+    if filters:
+        body['filters'] = filters
+    if sort_by:
+        body['sort_by'] = sort_by
+        body['sort_desc'] = sort_desc
+    
+    fields_param = build_item_fields_param(view, field_ids)
+    params = {'fields': fields_param} if fields_param else None
+    
+    increment_request_stat(PODIO_ITEM_FETCHES)
+    try:
+        response = get_podio_client().post(f'/item/app/{app_id}/filter', params=params, json=body)
+        
+        if response.status_code == 400 and params:
+            # Compact view rejected - fall back to the full view and project locally
+            print(f"WARNING: Podio rejected fields={fields_param}, retrying with the full item view")
+            increment_request_stat(PODIO_ITEM_FETCHES)
+            response = get_podio_client().post(f'/item/app/{app_id}/filter', json=body)
+        
+        if response.status_code != 200:
+            print(f"ERROR: Podio API returned {response.status_code} for item list")
+            print(f"Response: {response.text}")
+            return None, 0
+        
+        data = response.json()
+        items = [project_item(item, field_ids) for item in data.get('items', [])]
+        print(f"SUCCESS: Listed {len(items)} items (view={view}, fields={len(field_ids or ())})")
+        return items, data.get('filtered', data.get('total', len(items)))
+        
+    except PodioAuthError:
+        print("ERROR: Could not obtain Podio OAuth token")
+        return None, 0
+    except Exception as e:
+        print(f"EXCEPTION in list_podio_items(): {str(e)}")
+        return None, 0
+
+
 # ============================================================================
 # CALL ACTIVITY ITEM CREATION
 # ============================================================================
@@ -181,14 +517,6 @@ def create_call_activity_item(data, item_id, call_sid, call_duration=None, recor
     Returns:
         tuple: (success: bool, result: dict or error message)
     """
-    token = refresh_podio_token()
-    if not token:
-        print("="*50)
-        print("CRITICAL: Podio token refresh failed")
-        print("See services/podio/oauth.py for credential diagnostics")
-        print("="*50)
-        return False, 'Podio authentication failed'
-    
     # DEBUG logging
     print(f"=== CREATE CALL ACTIVITY ===")
     print(f"Master Lead item_id: {item_id}")
@@ -258,12 +586,8 @@ def create_call_activity_item(data, item_id, call_sid, call_duration=None, recor
     
     # Create Call Activity Item in Podio
     try:
-        response = requests.post(
-            f'https://api.podio.com/item/app/{CALL_ACTIVITY_APP_ID}/',
-            headers={
-                'Authorization': f'OAuth2 {token}',
-                'Content-Type': 'application/json'
-            },
+        response = get_podio_client().post(
+            f'/item/app/{CALL_ACTIVITY_APP_ID}/',
             json={'fields': podio_fields}
         )
         
@@ -281,6 +605,12 @@ def create_call_activity_item(data, item_id, call_sid, call_duration=None, recor
             except:
                 return False, f'Podio write failed: {response.text}'
                 
+    except PodioAuthError:
+        print("="*50)
+        print("CRITICAL: Podio token refresh failed")
+        print("See services/podio/oauth.py for credential diagnostics")
+        print("="*50)
+        return False, 'Podio authentication failed'
     except Exception as e:
         print(f"Exception creating Podio item: {e}")
         import traceback
@@ -314,22 +644,14 @@ def update_call_activity_recording(call_activity_item_id, recording_url):
         - Update recording webhook to retrieve Call Activity Item ID from mapping
         - Enable automatic recording URL updates without manual ID tracking
     """
-    token = refresh_podio_token()
-    if not token:
-        return False, 'Podio authentication failed'
-    
     if not call_activity_item_id:
         print("WARNING: No Call Activity Item ID provided for recording URL update")
         return False, 'No Call Activity Item ID provided'
     
     try:
         # Update the Call Activity item with recording URL
-        response = requests.put(
-            f'https://api.podio.com/item/{call_activity_item_id}',
-            headers={
-                'Authorization': f'OAuth2 {token}',
-                'Content-Type': 'application/json'
-            },
+        response = get_podio_client().put(
+            f'/item/{call_activity_item_id}',
             json={
                 'fields': {
                     str(RECORDING_URL_FIELD_ID): recording_url
@@ -344,6 +666,45 @@ def update_call_activity_recording(call_activity_item_id, recording_url):
             print(f"Failed to update Call Activity {call_activity_item_id}: {response.text}")
             return False, f'Podio update failed: {response.text}'
             
+    except PodioAuthError:
+        return False, 'Podio authentication failed'
     except Exception as e:
         print(f"Error updating Call Activity with recording URL: {e}")
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
+
+# ============================================================================
+# PODIO WEBHOOK VERIFICATION (V4.1 item cache invalidation)
+# ============================================================================
+
+def verify_podio_hook(hook_id, code):
+    """
+    Complete Podio's hook.verify handshake for a newly registered webhook
+    
+    Args:
+        hook_id: Podio hook ID from the hook.verify request
+        code: Verification code from the hook.verify request
+        
+    Returns:
+        bool: True if Podio accepted the verification code, False otherwise
+              (including hook IDs that are not a number)
+    """
+    hook_id = str(hook_id or '')
+    if not hook_id.isdigit():
+        print(f"❌ V4.1: Rejected Podio hook verification for invalid hook_id {hook_id!r}")
+        return False
+    try:
+        response = get_podio_client().post(
+            f'/hook/{hook_id}/verify/validate',
+            json={'code': code}
+        )
+        if response.status_code in [200, 204]:
+            print(f"✅ V4.1: Podio hook {hook_id} verified")
+            return True
+        print(f"❌ V4.1: Podio hook {hook_id} verification failed: {response.status_code} {response.text}")
+        return False
+    except PodioAuthError:
+        print("ERROR: Could not obtain Podio OAuth token for hook verification")
+        return False
+    except Exception as e:
+        print(f"Error verifying Podio hook {hook_id}: {e}")
+        return False
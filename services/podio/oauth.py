@@ -4,21 +4,35 @@ Podio OAuth Service - Token Management
 Handles OAuth token refresh and credential validation for Podio API access.
 This module provides the foundation for all Podio API operations.
 
+Token Lifecycle (V4.1):
+    1. Cached access token is reused until shortly before its expires_in deadline
+    2. Otherwise a valid token published by another instance is adopted from the
+       shared token store (services.podio.token_store)
+    3. One instance takes the renewal lease and renews with the refresh_token grant;
+       the others wait for the renewed token to appear in the store
+    4. The password grant is only used when no refresh token exists or renewal fails
+
 Business Justification:
-    Pillar 1 (Compliance): OAuth logic isolation enables security audits 
+    Pillar 1 (Compliance): OAuth logic isolation enables security audits
                            without reviewing 800+ lines of service code
-    Pillar 5 (Scalability): Foundation module for subsequent Podio service extractions
+    Pillar 5 (Scalability): Foundation module for subsequent Podio service extractions;
+                            token caching removes an auth round trip from every Podio call
 
 Dependencies:
     - config: PODIO_CLIENT_ID, PODIO_CLIENT_SECRET, PODIO_USERNAME, PODIO_PASSWORD
-    - requests: HTTP client for OAuth token endpoint
+    - services.podio.session: Pooled keep-alive session for the token endpoint
+    - services.podio.token_store: Token sharing across serverless instances
 
 Used By:
     - All other Podio service modules (item_service, intelligence, task_service)
     - podio_service.py (backward compatibility)
 """
 
-import requests
+import os
+import threading
+import time
+import uuid
+
 from config import (
     PODIO_CLIENT_ID,
     PODIO_CLIENT_SECRET,
@@ -26,33 +40,42 @@ from config import (
     PODIO_PASSWORD,
     podio_access_token
 )
+from services.podio.request_stats import increment_request_stat, get_request_stat, PODIO_AUTH_CALLS
+from services.podio.session import get_session, DEFAULT_TIMEOUT
+from services.podio.token_store import get_token_store
+
+PODIO_TOKEN_URL = 'https://podio.com/oauth/token'
+
+# Renew this many seconds before Podio's expires_in deadline so an in-flight
+# request never carries a token that expires mid-call
+TOKEN_EXPIRY_MARGIN_SECONDS = 300
+
+# Renewal lease: how long one instance may hold it, and how long the other
+# instances wait for its result before authenticating on their own
+TOKEN_LEASE_SECONDS = 30
+TOKEN_LEASE_WAIT_SECONDS = 10
+TOKEN_LEASE_POLL_SECONDS = 0.25
+
+# Identifies this process as a lease owner in the shared token store
+_INSTANCE_ID = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
 
 # Module-level token cache
 # Initialized from config's podio_access_token (typically None at startup)
 _podio_token = podio_access_token
+_podio_refresh_token = None
+_podio_token_expires_at = 0.0  # time.time() deadline, 0 = unknown/expired
 
+# Serializes renewals so concurrent requests share a single auth round trip
+_token_lock = threading.Lock()
 
-def refresh_podio_token():
+
+def _credentials_configured():
     """
-    Get or refresh Podio OAuth access token.
-    
-    Uses the Password Grant flow with stored credentials to obtain
-    an access token from Podio's OAuth endpoint.
-    
+    Check that all Podio credentials are present, logging masked diagnostics.
+
     Returns:
-        str: Access token if authentication succeeds
-        None: If credentials are missing or authentication fails
-        
-    Side Effects:
-        Updates module-level _podio_token cache
-        
-    Security Notes:
-        - All credential values are masked in log output
-        - Failed authentication attempts are logged with error details
-        - Token is cached in memory (not persisted to disk)
+        bool: True if all four credentials are configured
     """
-    global _podio_token
-    
     # Enhanced credential diagnostics
     print("="*50)
     print("PODIO TOKEN REFRESH ATTEMPT")
@@ -61,7 +84,7 @@ def refresh_podio_token():
     print(f"USERNAME present: {bool(PODIO_USERNAME)} (value: {PODIO_USERNAME[:3] + '***' if PODIO_USERNAME and len(PODIO_USERNAME) > 3 else 'None'})")
     print(f"PASSWORD present: {bool(PODIO_PASSWORD)} (length: {len(PODIO_PASSWORD) if PODIO_PASSWORD else 0})")
     print("="*50)
-    
+
     if not all([PODIO_CLIENT_ID, PODIO_CLIENT_SECRET, PODIO_USERNAME, PODIO_PASSWORD]):
         print("❌ CRITICAL: Podio credentials not fully configured. Podio integration will be disabled.")
         print(f"Missing credentials:")
@@ -73,46 +96,299 @@ def refresh_podio_token():
             print("  - PODIO_USERNAME")
         if not PODIO_PASSWORD:
             print("  - PODIO_PASSWORD")
+        return False
+    return True
+
+
+def _token_is_valid():
+    """Return True if the cached access token is usable for at least the expiry margin."""
+    return bool(_podio_token) and time.time() < _podio_token_expires_at - TOKEN_EXPIRY_MARGIN_SECONDS
+
+
+def _store_token(token_data):
+    """
+    Update the module-level cache from a Podio token response.
+
+    Args:
+        token_data: JSON body from /oauth/token (access_token, refresh_token, expires_in)
+
+    Returns:
+        str: The new access token
+    """
+    global _podio_token, _podio_refresh_token, _podio_token_expires_at
+
+    _podio_token = token_data.get('access_token')
+    # Podio may omit refresh_token on refresh responses - keep the previous one
+    _podio_refresh_token = token_data.get('refresh_token') or _podio_refresh_token
+    expires_in = token_data.get('expires_in') or 0
+    _podio_token_expires_at = time.time() + int(expires_in)
+    return _podio_token
+
+
+def _request_token(grant_data):
+    """
+    POST a grant to Podio's OAuth endpoint.
+
+    Args:
+        grant_data: Form fields for the grant (grant_type plus grant-specific fields)
+
+    Returns:
+        dict: Token response JSON, or None if the request failed
+    """
+    increment_request_stat(PODIO_AUTH_CALLS)
+    response = get_session().post(
+        PODIO_TOKEN_URL,
+        data={
+            'client_id': PODIO_CLIENT_ID,
+            'client_secret': PODIO_CLIENT_SECRET,
+            **grant_data
+        },
+        timeout=DEFAULT_TIMEOUT
+    )
+
+    if response.status_code == 200:
+        return response.json()
+
+    print(f"="*50)
+    print(f"ERROR getting Podio token ({grant_data.get('grant_type')} grant): {response.status_code}")
+    print(f"Response headers: {dict(response.headers)}")
+    print(f"Response text: {response.text}")
+    print(f"="*50)
+    return None
+
+
+def _refresh_token_grant():
+    """Renew the access token using the cached refresh token."""
+    token_data = _request_token({
+        'grant_type': 'refresh_token',
+        'refresh_token': _podio_refresh_token
+    })
+    if token_data:
+        print("Podio token renewed via refresh_token grant.")
+    return token_data
+
+
+def _password_grant():
+    """Obtain a fresh access token using the stored username/password."""
+    if not _credentials_configured():
         return None
-    
-    try:
-        # Get OAuth token from Podio
-        response = requests.post(
-            'https://podio.com/oauth/token',
-            data={
-                'grant_type': 'password',
-                'client_id': PODIO_CLIENT_ID,
-                'client_secret': PODIO_CLIENT_SECRET,
-                'username': PODIO_USERNAME,
-                'password': PODIO_PASSWORD
-            }
-        )
-        
-        if response.status_code == 200:
-            token_data = response.json()
-            _podio_token = token_data.get('access_token')
-            print("Podio token obtained successfully.")
+
+    token_data = _request_token({
+        'grant_type': 'password',
+        'username': PODIO_USERNAME,
+        'password': PODIO_PASSWORD
+    })
+    if token_data:
+        print("Podio token obtained successfully.")
+    return token_data
+
+
+def refresh_podio_token(force=False):
+    """
+    Get or refresh Podio OAuth access token.
+
+    Returns the cached token while it is valid. Near expiry (or when forced)
+    the token is renewed with the refresh_token grant, falling back to the
+    Password Grant flow with stored credentials.
+
+    Args:
+        force: Skip the cache and renew immediately (e.g. after a 401)
+
+    Returns:
+        str: Access token if authentication succeeds
+        None: If credentials are missing or authentication fails
+
+    Side Effects:
+        Updates module-level _podio_token cache
+        Increments the per-request PODIO_AUTH_CALLS counter for each OAuth POST
+
+    Security Notes:
+        - All credential values are masked in log output
+        - Failed authentication attempts are logged with error details
+        - Token is cached in memory and in the configured shared token store
+    """
+    if not force and _token_is_valid():
+        return _podio_token
+
+    with _token_lock:
+        # Another thread may have renewed while we waited for the lock
+        if not force and _token_is_valid():
+            return _podio_token
+
+        # A forced renewal means the current token was rejected - never re-adopt it
+        rejected_token = _podio_token if force else None
+        if _adopt_shared_token(rejected_token):
             return _podio_token
-        else:
-            print(f"="*50)
-            print(f"ERROR getting Podio token: {response.status_code}")
-            print(f"Response headers: {dict(response.headers)}")
-            print(f"Response text: {response.text}")
-            print(f"="*50)
+
+        leased = _acquire_renewal_lease()
+        try:
+            if not leased:
+                # Another instance is renewing - wait for it to publish the result
+                if _wait_for_shared_token(rejected_token):
+                    return _podio_token
+                print("⚠️ Podio token renewal lease holder did not publish a token - renewing locally")
+
+            return _renew_token()
+        finally:
+            if leased:
+                _release_renewal_lease()
+
+
+def _renew_token():
+    """
+    Renew the token (refresh_token grant first, password grant as fallback)
+    and publish it to the shared store. Caller must hold _token_lock.
+
+    Returns:
+        str: New access token, or None if authentication fails
+    """
+    global _podio_refresh_token
+
+    try:
+        token_data = None
+        if _podio_refresh_token:
+            token_data = _refresh_token_grant()
+            if not token_data:
+                # Refresh token revoked or expired - start over with credentials
+                _podio_refresh_token = None
+
+        if not token_data:
+            token_data = _password_grant()
+
+        if not token_data:
             return None
+
+        token = _store_token(token_data)
+        _publish_shared_token()
+        return token
     except Exception as e:
         print(f"Error initializing Podio authentication: {e}")
         return None
 
 
+# ============================================================================
+# SHARED TOKEN STORE COORDINATION (V4.1)
+# ============================================================================
+# Store failures never block authentication - they only cost the sharing.
+
+def _adopt_shared_token(rejected_token=None):
+    """
+    Load the shared token record into the local cache.
+
+    The refresh token is always adopted (Podio rotates it, so the shared copy
+    is the newest); the access token only if it is still valid and is not the
+    token the caller just saw rejected.
+
+    Returns:
+        bool: True if a usable access token was adopted
+    """
+    global _podio_token, _podio_refresh_token, _podio_token_expires_at
+
+    try:
+        record = get_token_store().load()
+    except Exception as e:
+        print(f"WARNING: Could not read shared Podio token: {e}")
+        return False
+
+    if not record:
+        return False
+
+    if record.get('refresh_token'):
+        _podio_refresh_token = record['refresh_token']
+
+    access_token = record.get('access_token')
+    expires_at = record.get('expires_at') or 0.0
+    if not access_token or access_token == rejected_token:
+        return False
+    if time.time() >= expires_at - TOKEN_EXPIRY_MARGIN_SECONDS:
+        return False
+
+    _podio_token = access_token
+    _podio_token_expires_at = expires_at
+    return True
+
+
+def _publish_shared_token():
+    """Write the locally cached token to the shared store."""
+    try:
+        get_token_store().save({
+            'access_token': _podio_token,
+            'refresh_token': _podio_refresh_token,
+            'expires_at': _podio_token_expires_at,
+        })
+    except Exception as e:
+        print(f"WARNING: Could not publish Podio token to shared store: {e}")
+
+
+def _acquire_renewal_lease():
+    """
+    Try to become the instance that renews the shared token.
+
+    Returns:
+        bool: True if the lease was acquired or the store is unavailable
+    """
+    try:
+        return get_token_store().acquire_lease(_INSTANCE_ID, TOKEN_LEASE_SECONDS)
+    except Exception as e:
+        print(f"WARNING: Podio token lease unavailable, renewing without coordination: {e}")
+        return True
+
+
+def _release_renewal_lease():
+    """Release the renewal lease held by this instance."""
+    try:
+        get_token_store().release_lease(_INSTANCE_ID)
+    except Exception as e:
+        print(f"WARNING: Could not release Podio token lease (expires in {TOKEN_LEASE_SECONDS}s): {e}")
+
+
+def _wait_for_shared_token(rejected_token=None):
+    """
+    Poll the shared store while another instance holds the renewal lease.
+
+    Returns:
+        bool: True if a renewed token appeared within TOKEN_LEASE_WAIT_SECONDS
+    """
+    deadline = time.time() + TOKEN_LEASE_WAIT_SECONDS
+    while time.time() < deadline:
+        time.sleep(TOKEN_LEASE_POLL_SECONDS)
+        if _adopt_shared_token(rejected_token):
+            return True
+    return False
+
+
 def get_token():
     """
     Get current token, refreshing if needed.
-    
+
     Convenience wrapper around refresh_podio_token() for cleaner API.
-    Always attempts to refresh to ensure token validity.
-    
+    Only contacts Podio when the cached token is missing or near expiry.
+
     Returns:
         str: Valid access token, or None if authentication fails
     """
-    return refresh_podio_token()
\ No newline at end of file
+    return refresh_podio_token()
+
+
+def invalidate_podio_token():
+    """
+    Drop the cached access token so the next call renews it.
+
+    Call this when Podio rejects a token (HTTP 401). The refresh token is
+    kept so renewal can still avoid the password grant.
+    """
+    global _podio_token, _podio_token_expires_at
+
+    with _token_lock:
+        _podio_token = None
+        _podio_token_expires_at = 0.0
+
+
+def get_auth_call_count():
+    """
+    Number of OAuth token requests made during the current Flask request.
+
+    Returns:
+        int: Auth call count (0 when the cached token was reused)
+    """
+    return get_request_stat(PODIO_AUTH_CALLS)
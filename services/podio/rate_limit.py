@@ -0,0 +1,22 @@
+"""
+Podio Rate Governor - Re-export of the Top-Level podio_rate_limit Module
+
+The governor is implemented in podio_rate_limit.py (outside this package,
+so scripts/ can use it without importing config). This module keeps the
+services.podio.rate_limit import path for the app's Podio services.
+
+Used By:
+    - services.podio.client
+    - services.podio.item_service
+    - scripts/reconcile_recordings.py
+"""
+
+from podio_rate_limit import (
+    RateGovernor,
+    podio_priority,
+    get_request_priority,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+    RATE_LIMITED_STATUS_CODES,
+    DEFAULT_RATE_LIMIT_PER_HOUR,
+)
@@ -0,0 +1,65 @@
+"""
+Podio Request Stats - Per-Request Call Counters
+
+Tracks how many outbound Podio operations a single Flask request triggers
+(OAuth token calls, item fetches, ...). Counters live in a ContextVar so
+concurrent requests never see each other's numbers.
+
+Business Justification:
+    Pillar 5 (Scalability): Makes Podio round trips per route observable so
+                            regressions (e.g. duplicate fetches) show up in logs
+
+Used By:
+    - services.podio.oauth (auth call counter)
+    - services.podio.item_service (item fetch counter)
+    - app.py (reset at request start, reported at request end)
+"""
+
+from contextvars import ContextVar
+
+# Counter names (kept as constants so callers and log parsers agree)
+PODIO_AUTH_CALLS = 'podio_auth_calls'
+PODIO_ITEM_FETCHES = 'podio_item_fetches'
+
+_request_counters = ContextVar('podio_request_counters', default=None)
+
+
+def reset_request_stats():
+    """Start a fresh set of counters for the current request."""
+    _request_counters.set({})
+
+
+def increment_request_stat(name, amount=1):
+    """
+    Increment a per-request counter.
+
+    Args:
+        name: Counter name (see module constants)
+        amount: Increment value (default 1)
+    """
+    counters = _request_counters.get()
+    if counters is None:
+        counters = {}
+        _request_counters.set(counters)
+    counters[name] = counters.get(name, 0) + amount
+
+
+def get_request_stat(name):
+    """
+    Get a single counter value for the current request.
+
+    Returns:
+        int: Counter value, 0 if never incremented
+    """
+    counters = _request_counters.get()
+    return counters.get(name, 0) if counters else 0
+
+
+def get_request_stats():
+    """
+    Get a copy of all counters for the current request.
+
+    Returns:
+        dict: Counter name -> value
+    """
+    return dict(_request_counters.get() or {})
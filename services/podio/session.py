@@ -0,0 +1,68 @@
+"""
+Podio HTTP Session - Pooled Keep-Alive Transport
+
+Provides one process-wide requests.Session for all Podio traffic so warm
+serverless instances reuse TCP+TLS connections to api.podio.com and
+podio.com instead of paying a fresh handshake on every call.
+
+Business Justification:
+    Pillar 5 (Scalability): Removes 80-150 ms of handshake overhead per Podio call
+
+Used By:
+    - services.podio.client (API calls)
+    - services.podio.oauth (token endpoint)
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    PODIO_HTTP_POOL_CONNECTIONS,
+    PODIO_HTTP_POOL_MAXSIZE,
+    PODIO_HTTP_CONNECT_TIMEOUT,
+    PODIO_HTTP_READ_TIMEOUT,
+)
+
+PODIO_API_URL = 'https://api.podio.com'
+
+# (connect, read) timeout applied to every Podio request unless overridden
+DEFAULT_TIMEOUT = (PODIO_HTTP_CONNECT_TIMEOUT, PODIO_HTTP_READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    """
+    Create the pooled session.
+
+    Only connection failures are retried: the request never reached Podio,
+    so retrying is safe even for item creation POSTs.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=PODIO_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=PODIO_HTTP_POOL_MAXSIZE,
+        max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """
+    Get the shared Podio session (created on first use).
+
+    Returns:
+        requests.Session: Keep-alive session with tuned connection pools
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
@@ -11,9 +11,8 @@ Business Justification:
         original 832 lines → 5 focused domain services
 """
 from datetime import datetime, timedelta
-import requests
 
-from services.podio.oauth import refresh_podio_token
+from services.podio.client import get_podio_client, PodioAuthError
 from config import (
     TASK_APP_ID,
     TASK_TITLE_FIELD_ID,
@@ -38,11 +37,6 @@ def create_follow_up_task(master_lead_item_id, task_properties, agent_specified_
     Returns:
         tuple: (success: bool, result: dict or error message)
     """
-    token = refresh_podio_token()
-    if not token:
-        print("❌ V3.3: Podio token refresh failed for task creation")
-        return False, 'Podio authentication failed'
-    
     # V3.3 Enhancement: Prioritize agent-specified date over default offset
     if agent_specified_date:
         # Agent specified a date - use it (it's already in YYYY-MM-DD format from the HTML date input)
@@ -82,12 +76,8 @@ def create_follow_up_task(master_lead_item_id, task_properties, agent_specified_
     
     try:
         # Create Task item in Podio
-        response = requests.post(
-            f'https://api.podio.com/item/app/{TASK_APP_ID}/',
-            headers={
-                'Authorization': f'OAuth2 {token}',
-                'Content-Type': 'application/json'
-            },
+        response = get_podio_client().post(
+            f'/item/app/{TASK_APP_ID}/',
             json={'fields': task_fields}
         )
         
@@ -105,6 +95,9 @@ def create_follow_up_task(master_lead_item_id, task_properties, agent_specified_
             except:
                 return False, f'Task creation failed: {response.text}'
                 
+    except PodioAuthError:
+        print("❌ V3.3: Podio token refresh failed for task creation")
+        return False, 'Podio authentication failed'
     except Exception as e:
         print(f"❌ V3.3: Exception creating task: {e}")
         import traceback
@@ -0,0 +1,239 @@
+"""
+Podio Token Store - Shared OAuth Token Persistence
+
+Lets every serverless instance share one Podio access/refresh token instead of
+each cold start running its own password grant. A short lease makes sure only
+one instance renews the token at a time while the others wait for the result.
+
+Backends:
+    firestore: Shared across all Vercel instances (uses config.db)
+    sqlite: Local file stand-in for development and single-host deployments
+    memory: Per-process only (equivalent to the pre-V4.1 behaviour)
+
+Business Justification:
+    Pillar 1 (Compliance): Token persistence isolated in one auditable module
+    Pillar 5 (Scalability): Avoids Podio auth rate limits during morning ramp-up
+
+Used By:
+    - services.podio.oauth (token lifecycle)
+"""
+
+import threading
+import time
+
+from config import PODIO_TOKEN_STORE, PODIO_TOKEN_STORE_PATH
+from services.stores import SQLiteStore, StoreSelector
+
+# Firestore document holding the shared token and the renewal lease
+TOKEN_COLLECTION = 'podio_oauth'
+TOKEN_DOCUMENT = 'token'
+LEASE_DOCUMENT = 'renewal_lease'
+
+
+class TokenStore:
+    """
+    Interface for shared Podio token storage.
+
+    Token records are dicts with 'access_token', 'refresh_token' and
+    'expires_at' (epoch seconds). Implementations may raise on storage
+    errors; callers treat failures as "no shared token available".
+    """
+
+    name = 'base'
+
+    def load(self):
+        """Return the stored token record, or None if nothing is stored."""
+        raise NotImplementedError
+
+    def save(self, record):
+        """Persist a token record, replacing any previous one."""
+        raise NotImplementedError
+
+    def acquire_lease(self, owner, ttl_seconds):
+        """
+        Try to become the instance that renews the token.
+
+        Returns:
+            bool: True if `owner` now holds the lease
+        """
+        raise NotImplementedError
+
+    def release_lease(self, owner):
+        """Release the lease if `owner` still holds it."""
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """Process-local store (no sharing between instances)."""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._record = None
+        self._lease = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        return dict(self._record) if self._record else None
+
+    def save(self, record):
+        self._record = dict(record)
+
+    def acquire_lease(self, owner, ttl_seconds):
+        with self._lock:
+            now = time.time()
+            if self._lease and self._lease[0] != owner and self._lease[1] > now:
+                return False
+            self._lease = (owner, now + ttl_seconds)
+            return True
+
+    def release_lease(self, owner):
+        with self._lock:
+            if self._lease and self._lease[0] == owner:
+                self._lease = None
+
+
+class SQLiteTokenStore(SQLiteStore, TokenStore):
+    """
+    Local file store shared by all processes on one host.
+
+    Uses BEGIN IMMEDIATE so lease acquisition is atomic across processes.
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS podio_tokens ('
+        'name TEXT PRIMARY KEY, access_token TEXT, refresh_token TEXT, expires_at REAL)',
+        'CREATE TABLE IF NOT EXISTS podio_token_leases ('
+        'name TEXT PRIMARY KEY, owner TEXT, expires_at REAL)',
+    )
+
+    def load(self):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT access_token, refresh_token, expires_at FROM podio_tokens WHERE name = ?',
+                (TOKEN_DOCUMENT,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'access_token': row[0], 'refresh_token': row[1], 'expires_at': row[2] or 0.0}
+
+    def save(self, record):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO podio_tokens (name, access_token, refresh_token, expires_at) '
+                'VALUES (?, ?, ?, ?)',
+                (TOKEN_DOCUMENT, record.get('access_token'), record.get('refresh_token'),
+                 record.get('expires_at', 0.0))
+            )
+
+    def acquire_lease(self, owner, ttl_seconds):
+        def _acquire(conn):
+            now = time.time()
+            row = conn.execute(
+                'SELECT owner, expires_at FROM podio_token_leases WHERE name = ?',
+                (LEASE_DOCUMENT,)
+            ).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO podio_token_leases (name, owner, expires_at) VALUES (?, ?, ?)',
+                (LEASE_DOCUMENT, owner, now + ttl_seconds)
+            )
+            return True
+
+        return self._transaction(_acquire)
+
+    def release_lease(self, owner):
+        with self._connect() as conn:
+            conn.execute(
+                'DELETE FROM podio_token_leases WHERE name = ? AND owner = ?',
+                (LEASE_DOCUMENT, owner)
+            )
+
+
+class FirestoreTokenStore(TokenStore):
+    """
+    Firestore-backed store shared by every Vercel instance.
+
+    Lease acquisition runs in a Firestore transaction so two instances can
+    never both believe they own the renewal.
+    """
+
+    name = 'firestore'
+
+    def __init__(self, firestore_db):
+        self._db = firestore_db
+        self._token_ref = firestore_db.collection(TOKEN_COLLECTION).document(TOKEN_DOCUMENT)
+        self._lease_ref = firestore_db.collection(TOKEN_COLLECTION).document(LEASE_DOCUMENT)
+
+    def load(self):
+        snapshot = self._token_ref.get()
+        if not snapshot.exists:
+            return None
+        data = snapshot.to_dict()
+        return {
+            'access_token': data.get('access_token'),
+            'refresh_token': data.get('refresh_token'),
+            'expires_at': data.get('expires_at', 0.0),
+        }
+
+    def save(self, record):
+        from firebase_admin import firestore
+
+        self._token_ref.set({
+            'access_token': record.get('access_token'),
+            'refresh_token': record.get('refresh_token'),
+            'expires_at': record.get('expires_at', 0.0),
+            'updated_at': firestore.SERVER_TIMESTAMP,
+        })
+
+    def acquire_lease(self, owner, ttl_seconds):
+        from firebase_admin import firestore
+
+        lease_ref = self._lease_ref
+
+        @firestore.transactional
+        def _acquire(transaction):
+            snapshot = lease_ref.get(transaction=transaction)
+            now = time.time()
+            if snapshot.exists:
+                lease = snapshot.to_dict()
+                if lease.get('owner') != owner and lease.get('expires_at', 0) > now:
+                    return False
+            transaction.set(lease_ref, {'owner': owner, 'expires_at': now + ttl_seconds})
+            return True
+
+        return _acquire(self._db.transaction())
+
+    def release_lease(self, owner):
+        from firebase_admin import firestore
+
+        lease_ref = self._lease_ref
+
+        @firestore.transactional
+        def _release(transaction):
+            snapshot = lease_ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get('owner') == owner:
+                transaction.delete(lease_ref)
+
+        _release(self._db.transaction())
+
+
+_token_store = StoreSelector(
+    'PODIO_TOKEN_STORE', PODIO_TOKEN_STORE, 'Podio token store',
+    firestore=FirestoreTokenStore, sqlite=SQLiteTokenStore, memory=MemoryTokenStore,
+    sqlite_path=PODIO_TOKEN_STORE_PATH,
+)
+
+
+def get_token_store():
+    """
+    Get the configured token store (created on first use).
+
+    PODIO_TOKEN_STORE selects the backend: 'firestore', 'sqlite' or 'memory'.
+    Unset means Firestore when config.db is available, otherwise SQLite.
+
+    Returns:
+        TokenStore: Shared store instance
+    """
+    return _token_store.get()
@@ -0,0 +1,46 @@
+"""
+Recording Services Package - Playback Cache and Archive for Twilio Recordings (V4.1)
+
+Modules:
+    storage: Recording file storage backends (local disk)
+    cache: Byte-budget LRU cache with single-flight fills from Twilio
+    delivery: Proxy or redirect (pre-signed Twilio media URL) playback
+    archive: Long-term copies of recordings (reconciliation job)
+
+Business Justification:
+    Pillar 5 (Scalability): Replayed recordings are served locally instead
+                            of being downloaded from Twilio every time, or
+                            handed to the browser with a redirect
+
+Used By:
+    - app.py (/play_recording, /api/metrics)
+    - scripts/reconcile_recordings.py (archive)
+"""
+
+from services.recordings.storage import (
+    RecordingStorage,
+    DiskRecordingStorage,
+)
+
+from services.recordings.cache import (
+    RecordingCache,
+    get_recording_cache,
+    get_cached_recording,
+    get_recording_cache_stats,
+)
+
+from services.recordings.delivery import (
+    get_delivery_mode,
+    get_recording_redirect_url,
+    get_recording_delivery_stats,
+    DELIVERY_PROXY,
+    DELIVERY_REDIRECT,
+)
+
+from services.recordings.archive import (
+    get_archive_storage,
+    archive_recording,
+    RecordingArchiveError,
+    ARCHIVE_STORED,
+    ARCHIVE_EXISTS,
+)
@@ -0,0 +1,94 @@
+"""
+Recording Archive - Long-Term Copies of Twilio Recordings
+
+Twilio recordings can be deleted from the account (retention policies,
+storage cost), after which the Podio playback links stop working. The
+archive keeps one copy of every reconciled recording in a storage backend
+(the same RecordingStorage interface the playback cache uses), written
+atomically and never evicted.
+
+Backends (RECORDING_ARCHIVE_BACKEND):
+    disk: Files under RECORDING_ARCHIVE_DIR ('<RecordingSid>.mp3')
+
+Business Justification:
+    Pillar 1 (Compliance): Call recordings stay available for audits after
+                           they are removed from Twilio
+
+Used By:
+    - scripts/reconcile_recordings.py
+"""
+
+from config import RECORDING_ARCHIVE_BACKEND, RECORDING_ARCHIVE_DIR
+from twilio_service import fetch_recording_media
+from services.recordings.storage import DiskRecordingStorage
+
+ARCHIVE_CHUNK_BYTES = 256 * 1024
+
+# archive_recording() outcomes
+ARCHIVE_STORED = 'stored'
+ARCHIVE_EXISTS = 'exists'
+
+
+class RecordingArchiveError(Exception):
+    """Raised when a recording could not be downloaded into the archive."""
+
+
+def get_archive_storage(directory=None):
+    """
+    Create the configured archive storage.
+
+    Args:
+        directory: Override RECORDING_ARCHIVE_DIR (disk backend), optional
+
+    Returns:
+        RecordingStorage: Archive backend
+
+    Raises:
+        OSError: If the storage cannot be created
+    """
+    backend = RECORDING_ARCHIVE_BACKEND.lower()
+    if backend != 'disk':
+        print(f"⚠️ Unknown RECORDING_ARCHIVE_BACKEND '{RECORDING_ARCHIVE_BACKEND}' - using disk")
+    return DiskRecordingStorage(directory or RECORDING_ARCHIVE_DIR)
+
+
+def archive_recording(storage, recording_sid):
+    """
+    Copy a recording's MP3 from Twilio into the archive (once).
+
+    Args:
+        storage: RecordingStorage to archive into
+        recording_sid: Twilio Recording SID
+
+    Returns:
+        str: ARCHIVE_EXISTS if it was archived before, ARCHIVE_STORED otherwise
+
+    Raises:
+        RecordingArchiveError: Twilio error or incomplete download (nothing is stored)
+        OSError: Storage error
+    """
+    if storage.local_path(recording_sid):
+        return ARCHIVE_EXISTS
+
+    try:
+        upstream = fetch_recording_media(recording_sid)
+    except Exception as e:
+        raise RecordingArchiveError(f"Download of {recording_sid} failed: {e}") from e
+
+    try:
+        if upstream.status_code != 200:
+            raise RecordingArchiveError(f"Twilio returned {upstream.status_code} for {recording_sid}")
+        expected = upstream.headers.get('Content-Length')
+        try:
+            size = storage.write(recording_sid, upstream.iter_content(chunk_size=ARCHIVE_CHUNK_BYTES))
+        except OSError:
+            raise
+        except Exception as e:
+            raise RecordingArchiveError(f"Download of {recording_sid} failed: {e}") from e
+    finally:
+        upstream.close()
+
+    if expected and expected.isdigit() and size != int(expected):
+        storage.delete(recording_sid)
+        raise RecordingArchiveError(f"Download of {recording_sid} incomplete ({size}/{expected} bytes)")
+    return ARCHIVE_STORED
@@ -0,0 +1,285 @@
+"""
+Recording Cache - Byte-Budget LRU over a Recording Storage Backend
+
+QA and managers replay the same calls many times a day. The first playback
+of a recording downloads the whole MP3 from Twilio once into the storage
+backend; every later playback (including seeks) is served from the local
+file.
+
+Budget: The sum of stored file sizes is kept under RECORDING_CACHE_MAX_BYTES
+by evicting the least recently played recordings. A recording larger than
+the whole budget is never stored (it is proxied instead).
+
+Single-flight: Concurrent listeners of a recording that is not cached yet
+share one download - the first request fills the cache, the others wait
+for it (up to RECORDING_CACHE_FILL_TIMEOUT_SECONDS) and then read the file.
+
+Business Justification:
+    Pillar 5 (Scalability): Repeat playbacks cost no Twilio request and start
+                            instantly; seeking never re-downloads
+
+Used By:
+    - app.py (/play_recording, /api/metrics)
+"""
+
+import threading
+from collections import OrderedDict
+
+from config import (
+    RECORDING_CACHE_ENABLED,
+    RECORDING_CACHE_BACKEND,
+    RECORDING_CACHE_DIR,
+    RECORDING_CACHE_MAX_BYTES,
+    RECORDING_CACHE_FILL_TIMEOUT_SECONDS,
+)
+from twilio_service import fetch_recording_media
+from services.recordings.storage import DiskRecordingStorage, is_valid_recording_sid
+
+FILL_CHUNK_BYTES = 256 * 1024
+
+
+class RecordingCache:
+    """
+    Thread-safe byte-budget LRU index over a RecordingStorage.
+
+    The index (Recording SID -> size in bytes, least recently used first) is
+    rebuilt from the backend's files on start, ordered by last use.
+    """
+
+    def __init__(self, storage, max_bytes, fill_timeout_seconds):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.fill_timeout_seconds = fill_timeout_seconds
+        self._index = OrderedDict()
+        self._bytes = 0
+        self._fills = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'fills': 0,
+            'fill_waits': 0,
+            'fill_errors': 0,
+            'too_large': 0,
+            'evictions': 0,
+        }
+
+        for recording_sid, size, _last_used in sorted(storage.entries(), key=lambda entry: entry[2]):
+            self._index[recording_sid] = size
+            self._bytes += size
+        with self._lock:
+            self._evict_over_budget()
+
+    def _evict_over_budget(self, keep=None):
+        """Drop least recently used files until the budget holds (lock held)."""
+        for recording_sid in list(self._index):
+            if self._bytes <= self.max_bytes:
+                break
+            if recording_sid == keep:
+                continue
+            size = self._index.pop(recording_sid)
+            self._bytes -= size
+            self._stats['evictions'] += 1
+            try:
+                self.storage.delete(recording_sid)
+            except OSError as e:
+                print(f"⚠️ V4.1: Could not delete cached recording {recording_sid}: {e}")
+
+    def _lookup(self, recording_sid):
+        """Path of an indexed recording whose file still exists (lock held)."""
+        if recording_sid not in self._index:
+            return None
+        path = self.storage.local_path(recording_sid)
+        if path is None:
+            # Removed behind our back (e.g. /tmp cleanup)
+            self._bytes -= self._index.pop(recording_sid)
+            return None
+        self._index.move_to_end(recording_sid)
+        return path
+
+    def get(self, recording_sid):
+        """
+        Look up a cached recording.
+
+        Returns:
+            str or None: Local file path on a hit, None on a miss
+        """
+        with self._lock:
+            path = self._lookup(recording_sid)
+            self._stats['hits' if path else 'misses'] += 1
+        if path:
+            try:
+                self.storage.touch(recording_sid)
+            except OSError:
+                pass
+        return path
+
+    def fill(self, recording_sid, fetch):
+        """
+        Download a recording into the cache, once per recording at a time.
+
+        Args:
+            recording_sid: Twilio Recording SID
+            fetch: Callable(recording_sid) -> streamed requests.Response
+
+        Returns:
+            str or None: Local file path, or None if the recording could not
+                         be cached (upstream error, too large, timeout)
+        """
+        with self._lock:
+            path = self._lookup(recording_sid)
+            if path:
+                return path
+            done = self._fills.get(recording_sid)
+            leader = done is None
+            if leader:
+                done = self._fills[recording_sid] = threading.Event()
+            else:
+                self._stats['fill_waits'] += 1
+
+        if not leader:
+            done.wait(self.fill_timeout_seconds)
+            with self._lock:
+                return self._lookup(recording_sid)
+
+        try:
+            return self._download(recording_sid, fetch)
+        finally:
+            with self._lock:
+                self._fills.pop(recording_sid, None)
+            done.set()
+
+    def _download(self, recording_sid, fetch):
+        try:
+            upstream = fetch(recording_sid)
+        except Exception as e:
+            print(f"⚠️ V4.1: Recording cache fill for {recording_sid} failed: {e}")
+            self._count('fill_errors')
+            return None
+
+        try:
+            if upstream.status_code != 200:
+                print(f"⚠️ V4.1: Recording cache fill for {recording_sid}: Twilio returned {upstream.status_code}")
+                self._count('fill_errors')
+                return None
+
+            expected = upstream.headers.get('Content-Length')
+            expected = int(expected) if expected and expected.isdigit() else None
+            if expected is not None and expected > self.max_bytes:
+                self._count('too_large')
+                return None
+
+            size = self.storage.write(recording_sid, upstream.iter_content(chunk_size=FILL_CHUNK_BYTES))
+            if expected is not None and size != expected:
+                print(f"⚠️ V4.1: Recording {recording_sid} download incomplete ({size}/{expected} bytes)")
+                self.storage.delete(recording_sid)
+                self._count('fill_errors')
+                return None
+        except Exception as e:
+            print(f"⚠️ V4.1: Recording cache fill for {recording_sid} failed: {e}")
+            self._count('fill_errors')
+            return None
+        finally:
+            upstream.close()
+
+        if size > self.max_bytes:
+            # No Content-Length from upstream and bigger than the whole budget
+            self.storage.delete(recording_sid)
+            self._count('too_large')
+            return None
+
+        with self._lock:
+            self._stats['fills'] += 1
+            self._index[recording_sid] = size
+            self._bytes += size
+            self._evict_over_budget(keep=recording_sid)
+            return self.storage.local_path(recording_sid)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """
+        Snapshot of cache metrics.
+
+        Returns:
+            dict: Counters plus current size and configuration
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'backend': self.storage.name,
+                'recordings': len(self._index),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': round(self._stats['hits'] / lookups, 3) if lookups else None,
+            }
+
+
+_recording_cache = None
+_recording_cache_lock = threading.Lock()
+
+
+def get_recording_cache():
+    """
+    Get the configured recording cache (created on first use).
+
+    RECORDING_CACHE_BACKEND selects the storage ('disk').
+
+    Returns:
+        RecordingCache or None: None when RECORDING_CACHE_ENABLED is false
+                                or the storage cannot be created
+    """
+    global _recording_cache
+
+    if not RECORDING_CACHE_ENABLED:
+        return None
+    if _recording_cache is None:
+        with _recording_cache_lock:
+            if _recording_cache is None:
+                backend = RECORDING_CACHE_BACKEND.lower()
+                if backend != 'disk':
+                    print(f"⚠️ Unknown RECORDING_CACHE_BACKEND '{RECORDING_CACHE_BACKEND}' - using disk")
+                try:
+                    storage = DiskRecordingStorage(RECORDING_CACHE_DIR)
+                except OSError as e:
+                    print(f"⚠️ Recording cache disabled - cannot use {RECORDING_CACHE_DIR}: {e}")
+                    return None
+                _recording_cache = RecordingCache(
+                    storage,
+                    max_bytes=RECORDING_CACHE_MAX_BYTES,
+                    fill_timeout_seconds=RECORDING_CACHE_FILL_TIMEOUT_SECONDS,
+                )
+                print(f"Recording cache: {storage.name} ({RECORDING_CACHE_MAX_BYTES} bytes)")
+
+    return _recording_cache
+
+
+def get_cached_recording(recording_sid, fill=True):
+    """
+    Local file for a recording, downloading it from Twilio on a miss.
+
+    Args:
+        recording_sid: Twilio Recording SID
+        fill: Download on a miss (False: only report hits, e.g. for HEAD)
+
+    Returns:
+        str or None: Local file path, or None if the recording is not
+                     cached and could not (or should not) be cached -
+                     the caller then proxies the request to Twilio
+    """
+    cache = get_recording_cache()
+    if cache is None or not is_valid_recording_sid(recording_sid):
+        return None
+    path = cache.get(recording_sid)
+    if path or not fill:
+        return path
+    return cache.fill(recording_sid, fetch_recording_media)
+
+
+def get_recording_cache_stats():
+    """Hit/fill/eviction metrics for /api/metrics (None when the cache is disabled)."""
+    cache = get_recording_cache()
+    return cache.stats() if cache else None
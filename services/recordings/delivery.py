@@ -0,0 +1,103 @@
+"""
+Recording Delivery - Proxy or Redirect Playback
+
+RECORDING_DELIVERY_MODE selects how /play_recording delivers audio:
+
+    proxy:    The function streams the bytes (from the local recording cache
+              or from Twilio) - the function stays alive for the whole
+              download and the audio is paid for as egress twice
+    redirect: The function asks Twilio (with the account credentials) for
+              the recording's short-lived pre-signed media URL and answers
+              with a 302; the browser downloads and seeks directly against
+              Twilio's storage
+
+Signed URLs are remembered per recording for RECORDING_REDIRECT_TTL_SECONDS
+(well inside their validity), so seeks and replays within that window cost
+no Twilio request. When no signed URL can be obtained, playback falls back
+to proxy delivery.
+
+Business Justification:
+    Pillar 5 (Scalability): Function wall time per playback drops from the
+                            length of the download to one Twilio round trip
+
+Used By:
+    - app.py (/play_recording, /api/metrics)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from config import RECORDING_DELIVERY_MODE, RECORDING_REDIRECT_TTL_SECONDS
+from twilio_service import get_recording_media_location
+
+DELIVERY_PROXY = 'proxy'
+DELIVERY_REDIRECT = 'redirect'
+
+# Signed URLs remembered at most
+MAX_REMEMBERED_LOCATIONS = 1000
+
+_locations = OrderedDict()
+_locations_lock = threading.Lock()
+_stats = {
+    'redirects': 0,
+    'signed_url_reuses': 0,
+    'signed_url_requests': 0,
+    'fallbacks': 0,
+}
+
+
+def get_delivery_mode():
+    """
+    Resolve the recording delivery mode.
+
+    Returns:
+        str: DELIVERY_REDIRECT or DELIVERY_PROXY (the default)
+    """
+    mode = (RECORDING_DELIVERY_MODE or DELIVERY_PROXY).lower()
+    return DELIVERY_REDIRECT if mode == DELIVERY_REDIRECT else DELIVERY_PROXY
+
+
+def get_recording_redirect_url(recording_sid):
+    """
+    Signed media URL to redirect a playback to.
+
+    Args:
+        recording_sid: Twilio Recording SID
+
+    Returns:
+        str or None: Pre-signed Twilio media URL, or None if the caller
+                     should fall back to proxy delivery
+    """
+    now = time.time()
+    with _locations_lock:
+        remembered = _locations.get(recording_sid)
+        if remembered and remembered[1] > now:
+            _locations.move_to_end(recording_sid)
+            _stats['redirects'] += 1
+            _stats['signed_url_reuses'] += 1
+            return remembered[0]
+        _stats['signed_url_requests'] += 1
+
+    location = get_recording_media_location(recording_sid)
+
+    with _locations_lock:
+        if not location:
+            _stats['fallbacks'] += 1
+            return None
+        _locations[recording_sid] = (location, now + RECORDING_REDIRECT_TTL_SECONDS)
+        _locations.move_to_end(recording_sid)
+        while len(_locations) > MAX_REMEMBERED_LOCATIONS:
+            _locations.popitem(last=False)
+        _stats['redirects'] += 1
+    return location
+
+
+def get_recording_delivery_stats():
+    """Delivery mode and redirect counters for /api/metrics (this instance only)."""
+    with _locations_lock:
+        return {
+            'mode': get_delivery_mode(),
+            **_stats,
+            'remembered_urls': len(_locations),
+        }
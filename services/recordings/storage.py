@@ -0,0 +1,141 @@
+"""
+Recording Storage - Backends for the Recording Cache
+
+A storage backend holds whole recording files and hands out a local path
+for each, so Flask can serve it with send_file (Range, conditional requests
+and wsgi.file_wrapper / sendfile zero-copy come for free). Eviction policy
+and byte accounting live in services.recordings.cache; a backend only
+stores, lists and deletes.
+
+Backends:
+    disk: Files under RECORDING_CACHE_DIR ('/tmp' on Vercel, per instance)
+
+Business Justification:
+    Pillar 5 (Scalability): Repeat playbacks are served from local storage
+                            instead of a fresh authenticated Twilio download
+
+Used By:
+    - services.recordings.cache (RecordingCache)
+"""
+
+import os
+import re
+import uuid
+
+# Recording SIDs are alphanumeric ('RE' + 32 hex); anything else never becomes a path
+_RECORDING_SID_PATTERN = re.compile(r'^[A-Za-z0-9]+$')
+
+
+def is_valid_recording_sid(recording_sid):
+    """True if the SID is safe to use as a file name."""
+    return bool(recording_sid and _RECORDING_SID_PATTERN.match(recording_sid))
+
+
+class RecordingStorage:
+    """
+    Interface for recording file storage.
+
+    Implementations may raise OSError on storage errors.
+    """
+
+    name = 'base'
+
+    def local_path(self, recording_sid):
+        """Path of the stored recording, or None if it is not stored."""
+        raise NotImplementedError
+
+    def write(self, recording_sid, chunks):
+        """
+        Store a recording atomically (readers never see a partial file).
+
+        Args:
+            recording_sid: Twilio Recording SID
+            chunks: Iterable of bytes
+
+        Returns:
+            int: Stored size in bytes
+        """
+        raise NotImplementedError
+
+    def delete(self, recording_sid):
+        """Remove a stored recording (no error if it is missing)."""
+        raise NotImplementedError
+
+    def touch(self, recording_sid):
+        """Record a use, so the LRU order survives a restart."""
+        raise NotImplementedError
+
+    def entries(self):
+        """
+        List stored recordings.
+
+        Returns:
+            list: (recording_sid, size_bytes, last_used_epoch) tuples
+        """
+        raise NotImplementedError
+
+
+class DiskRecordingStorage(RecordingStorage):
+    """Recording files in a local directory ('<RecordingSid>.mp3')."""
+
+    name = 'disk'
+
+    _SUFFIX = '.mp3'
+    _PARTIAL_SUFFIX = '.part'
+
+    def __init__(self, directory):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # Downloads interrupted by a crash or a frozen instance
+        for name in os.listdir(directory):
+            if name.endswith(self._PARTIAL_SUFFIX):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def _path(self, recording_sid):
+        if not is_valid_recording_sid(recording_sid):
+            raise ValueError(f"Invalid Recording SID: {recording_sid!r}")
+        return os.path.join(self._directory, recording_sid + self._SUFFIX)
+
+    def local_path(self, recording_sid):
+        path = self._path(recording_sid)
+        return path if os.path.isfile(path) else None
+
+    def write(self, recording_sid, chunks):
+        path = self._path(recording_sid)
+        partial = f"{path}.{uuid.uuid4().hex}{self._PARTIAL_SUFFIX}"
+        size = 0
+        try:
+            with open(partial, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        size += len(chunk)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return size
+
+    def delete(self, recording_sid):
+        try:
+            os.remove(self._path(recording_sid))
+        except FileNotFoundError:
+            pass
+
+    def touch(self, recording_sid):
+        try:
+            os.utime(self._path(recording_sid))
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        result = []
+        for entry in os.scandir(self._directory):
+            if entry.is_file() and entry.name.endswith(self._SUFFIX):
+                stat = entry.stat()
+                result.append((entry.name[:-len(self._SUFFIX)], stat.st_size, stat.st_mtime))
+        return result
@@ -0,0 +1,139 @@
+"""
+Store Backends - Shared Plumbing for the V4.1 Persistence Stores
+
+The Podio token store, idempotency keys, disposition outbox and webhook queue
+each come in firestore/sqlite/memory flavours. Their schemas and logic stay
+in their own modules; this module holds the parts they have in common.
+
+Components:
+    SQLiteStore: Base class for the local file backends (creates the database
+                 directory and schema, runs BEGIN IMMEDIATE transactions)
+    StoreSelector: Creates the backend named by a *_STORE setting on first use
+
+Backend selection:
+    firestore: Shared across all Vercel instances (uses config.db)
+    sqlite: Local file stand-in for development and single-host deployments
+    memory: Per-process only
+    Unset means Firestore when config.db is available, otherwise SQLite.
+
+Business Justification:
+    Pillar 1 (Compliance): One place to audit how shared state is persisted
+    Pillar 5 (Scalability): New stores reuse the same tested transaction path
+
+Used By:
+    - services.podio.token_store
+    - services.idempotency
+    - services.outbox
+    - services.webhook_queue
+"""
+
+import os
+import sqlite3
+import threading
+
+from config import db
+
+BACKEND_FIRESTORE = 'firestore'
+BACKEND_SQLITE = 'sqlite'
+BACKEND_MEMORY = 'memory'
+
+
+class SQLiteStore:
+    """
+    Base class for stores kept in a local SQLite file.
+
+    Subclasses list their CREATE TABLE / CREATE INDEX statements in SCHEMA;
+    they run (idempotently) when the store is opened. Connections use
+    autocommit mode, so single statements need no transaction and
+    multi-statement updates go through _transaction().
+    """
+
+    name = BACKEND_SQLITE
+
+    SCHEMA = ()
+
+    def __init__(self, path):
+        self._path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=5, isolation_level=None)
+
+    def _transaction(self, fn):
+        """
+        Run fn(conn) inside BEGIN IMMEDIATE and commit.
+
+        BEGIN IMMEDIATE takes the write lock up front, so a read-then-write
+        in fn is atomic across processes. The transaction is rolled back if
+        fn raises.
+
+        Args:
+            fn: Callable taking the open connection
+
+        Returns:
+            Whatever fn returns
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            result = fn(conn)
+            conn.execute('COMMIT')
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+
+class StoreSelector:
+    """
+    Lazily creates the store backend named by a *_STORE setting.
+
+    Args:
+        setting_name: Environment variable name (used in the fallback warning)
+        setting: Its value ('firestore', 'sqlite', 'memory' or empty)
+        label: Name printed with the chosen backend (e.g. 'Webhook queue store')
+        firestore: Firestore store class, called with config.db
+        sqlite: SQLite store class, called with sqlite_path
+        memory: Memory store class, called without arguments
+        sqlite_path: Database file for the SQLite backend
+    """
+
+    def __init__(self, setting_name, setting, label, firestore, sqlite, memory, sqlite_path):
+        self._setting_name = setting_name
+        self._setting = setting
+        self._label = label
+        self._firestore = firestore
+        self._sqlite = sqlite
+        self._memory = memory
+        self._sqlite_path = sqlite_path
+        self._store = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the shared store, creating it on the first call."""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = self._create()
+        return self._store
+
+    def _create(self):
+        backend = (self._setting or (BACKEND_FIRESTORE if db else BACKEND_SQLITE)).lower()
+        if backend == BACKEND_FIRESTORE and db:
+            store = self._firestore(db)
+        elif backend == BACKEND_MEMORY:
+            store = self._memory()
+        else:
+            if backend == BACKEND_FIRESTORE:
+                print(f"⚠️ {self._setting_name}=firestore but Firestore is unavailable - using SQLite")
+            store = self._sqlite(self._sqlite_path)
+        print(f"{self._label}: {store.name}")
+        return store
@@ -0,0 +1,586 @@
+"""
+Webhook Queue Store - Durable, Per-Call Ordered Queue for Twilio Callbacks
+
+/call_status and /recording_status append each validated callback here and
+answer Twilio immediately; processors (services.webhooks) do the Firestore,
+Twilio and Podio work afterwards with retries.
+
+Ordering: every entry has an ordering key (the CallSid). Only the oldest
+queued entry of a key can be claimed, so the callbacks of one call are
+processed one at a time in arrival order, while different calls proceed in
+parallel. Finished entries are deleted; entries that run out of attempts
+move to the dead-letter store and stop blocking their key.
+
+Entry records (dicts):
+    id: Queue entry ID (hex)
+    kind: Processor name ('call_status' or 'recording_status')
+    ordering_key: Entries with the same key are processed in 'seq' order
+    seq: Arrival order (epoch nanoseconds)
+    payload: JSON-serializable callback parameters
+    status: 'pending' or 'processing'
+    attempts: Number of times the entry has been claimed
+    due_at: Epoch seconds when the entry may next be claimed
+            (next retry while pending, lease expiry while processing)
+    lease_owner: Worker holding the current lease
+    last_error: Error from the most recent failed attempt
+    created_at / updated_at: Epoch seconds
+
+Dead letters keep the entry fields plus 'dead_at' and can be re-queued
+with redrive_dead_letter() once the cause has been fixed (behind any
+callbacks of the same call that are still queued).
+
+Delivery keys (record_delivery) remember which callbacks were already
+accepted, so a delivery Twilio retries after a timeout is dropped instead of
+being processed twice. A key is removed again (forget_delivery) when its
+callback could be neither queued nor processed, so a redelivery is accepted.
+
+Backends:
+    firestore: Shared across all Vercel instances (uses config.db)
+    sqlite: Local file stand-in for development and single-host deployments
+    memory: Per-process only (local runs and tests)
+
+Business Justification:
+    Pillar 5 (Scalability): Callback bursts are acknowledged in milliseconds,
+                            so Twilio no longer times out and retries them;
+                            retried deliveries are recognized and dropped
+
+Used By:
+    - services.webhooks (queue ingest mode for /call_status, /recording_status)
+"""
+
+import datetime
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import WEBHOOK_QUEUE_STORE, WEBHOOK_QUEUE_STORE_PATH
+from services.stores import SQLiteStore, StoreSelector
+
+WEBHOOK_QUEUE_COLLECTION = 'webhook_queue'
+WEBHOOK_DEAD_LETTER_COLLECTION = 'webhook_dead_letters'
+WEBHOOK_DELIVERY_COLLECTION = 'webhook_deliveries'
+
+# Memory backend: delivery keys kept before the oldest are dropped
+MEMORY_MAX_DELIVERY_KEYS = 50000
+
+ENTRY_PENDING = 'pending'
+ENTRY_PROCESSING = 'processing'
+
+
+def _new_entry(kind, ordering_key, payload):
+    now = time.time()
+    return {
+        'id': uuid.uuid4().hex,
+        'kind': kind,
+        'ordering_key': ordering_key,
+        'seq': time.time_ns(),
+        'payload': payload,
+        'status': ENTRY_PENDING,
+        'attempts': 0,
+        'due_at': now,
+        'lease_owner': None,
+        'last_error': None,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def _claim_fields(entry, owner, lease_seconds, now):
+    return {
+        'status': ENTRY_PROCESSING,
+        'attempts': entry.get('attempts', 0) + 1,
+        'due_at': now + lease_seconds,
+        'lease_owner': owner,
+        'updated_at': now,
+    }
+
+
+def _retry_fields(error, due_at):
+    return {
+        'status': ENTRY_PENDING,
+        'due_at': due_at,
+        'lease_owner': None,
+        'last_error': error,
+        'updated_at': time.time(),
+    }
+
+
+def _dead_letter(entry, error):
+    dead = dict(entry)
+    dead.update({'status': 'dead', 'due_at': None, 'lease_owner': None, 'last_error': error,
+                 'dead_at': time.time(), 'updated_at': time.time()})
+    return dead
+
+
+def _is_head(entry, entries_for_key):
+    """True if no queued entry of the same key arrived earlier."""
+    return all((other['seq'], other['id']) >= (entry['seq'], entry['id']) for other in entries_for_key)
+
+
+class WebhookQueueStore:
+    """
+    Interface for webhook queue persistence.
+
+    Implementations may raise on storage errors. Only the worker holding an
+    entry's lease may complete, retry or dead-letter it.
+    """
+
+    name = 'base'
+
+    def enqueue(self, kind, ordering_key, payload):
+        """
+        Append a callback (due immediately).
+
+        Returns:
+            dict: The stored entry record
+        """
+        raise NotImplementedError
+
+    def claim(self, owner, lease_seconds, limit=10):
+        """
+        Lease due entries that are at the head of their ordering key.
+
+        Returns:
+            list: Claimed entry records (at most one per ordering key)
+        """
+        raise NotImplementedError
+
+    def complete(self, entry_id, owner):
+        """Remove a processed entry. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def retry(self, entry_id, owner, error, due_at):
+        """Release an entry for another attempt at `due_at`. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def dead_letter(self, entry_id, owner, error):
+        """Move an entry to the dead-letter store. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def list_dead_letters(self, limit=50):
+        """Most recent dead letters first."""
+        raise NotImplementedError
+
+    def redrive_dead_letter(self, entry_id):
+        """
+        Re-queue a dead letter (attempts reset, behind the call's queued entries).
+
+        Returns:
+            dict or None: The queued entry, or None if the ID is unknown
+        """
+        raise NotImplementedError
+
+    def record_delivery(self, key, ttl_seconds):
+        """
+        Remember a callback delivery for `ttl_seconds`.
+
+        Returns:
+            bool: True for the first delivery of `key`, False for a repeat
+        """
+        raise NotImplementedError
+
+    def forget_delivery(self, key):
+        """Remove a delivery key (its callback was not accepted after all)."""
+        raise NotImplementedError
+
+
+class MemoryWebhookQueueStore(WebhookQueueStore):
+    """Process-local store (no durability, no sharing between instances)."""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._entries = {}
+        self._dead = {}
+        self._deliveries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _copy(self, entry):
+        return json.loads(json.dumps(entry))
+
+    def enqueue(self, kind, ordering_key, payload):
+        entry = _new_entry(kind, ordering_key, payload)
+        with self._lock:
+            self._entries[entry['id']] = entry
+            return self._copy(entry)
+
+    def claim(self, owner, lease_seconds, limit=10):
+        with self._lock:
+            now = time.time()
+            by_key = {}
+            for entry in self._entries.values():
+                by_key.setdefault(entry['ordering_key'], []).append(entry)
+            heads = [min(entries, key=lambda e: (e['seq'], e['id'])) for entries in by_key.values()]
+            claimed = []
+            for entry in sorted(heads, key=lambda e: e['due_at']):
+                if len(claimed) >= limit:
+                    break
+                if entry['due_at'] <= now:
+                    entry.update(_claim_fields(entry, owner, lease_seconds, now))
+                    claimed.append(self._copy(entry))
+            return claimed
+
+    def _owned(self, entry_id, owner):
+        entry = self._entries.get(entry_id)
+        return entry if entry and entry['lease_owner'] == owner else None
+
+    def complete(self, entry_id, owner):
+        with self._lock:
+            if not self._owned(entry_id, owner):
+                return False
+            del self._entries[entry_id]
+            return True
+
+    def retry(self, entry_id, owner, error, due_at):
+        with self._lock:
+            entry = self._owned(entry_id, owner)
+            if not entry:
+                return False
+            entry.update(_retry_fields(error, due_at))
+            return True
+
+    def dead_letter(self, entry_id, owner, error):
+        with self._lock:
+            entry = self._owned(entry_id, owner)
+            if not entry:
+                return False
+            self._dead[entry_id] = _dead_letter(self._entries.pop(entry_id), error)
+            return True
+
+    def list_dead_letters(self, limit=50):
+        with self._lock:
+            dead = sorted(self._dead.values(), key=lambda e: e['dead_at'], reverse=True)
+            return [self._copy(entry) for entry in dead[:limit]]
+
+    def redrive_dead_letter(self, entry_id):
+        with self._lock:
+            dead = self._dead.pop(entry_id, None)
+            if not dead:
+                return None
+            entry = _new_entry(dead['kind'], dead['ordering_key'], dead['payload'])
+            entry.update({'id': dead['id'], 'created_at': dead['created_at']})
+            self._entries[entry['id']] = entry
+            return self._copy(entry)
+
+    def record_delivery(self, key, ttl_seconds):
+        with self._lock:
+            now = time.time()
+            expires_at = self._deliveries.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._deliveries[key] = now + ttl_seconds
+            self._deliveries.move_to_end(key)
+            while len(self._deliveries) > MEMORY_MAX_DELIVERY_KEYS:
+                self._deliveries.popitem(last=False)
+            return True
+
+    def forget_delivery(self, key):
+        with self._lock:
+            self._deliveries.pop(key, None)
+
+
+class SQLiteWebhookQueueStore(SQLiteStore, WebhookQueueStore):
+    """
+    Local file store shared by all processes on one host.
+
+    Uses BEGIN IMMEDIATE so claims are atomic across processes. Expired
+    delivery keys are deleted on every record_delivery().
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS webhook_queue ('
+        'id TEXT PRIMARY KEY, kind TEXT, ordering_key TEXT, seq INTEGER, payload TEXT, '
+        'status TEXT, attempts INTEGER, due_at REAL, lease_owner TEXT, last_error TEXT, '
+        'created_at REAL, updated_at REAL)',
+        'CREATE INDEX IF NOT EXISTS webhook_queue_due_at ON webhook_queue (due_at)',
+        'CREATE INDEX IF NOT EXISTS webhook_queue_key_seq ON webhook_queue (ordering_key, seq)',
+        'CREATE TABLE IF NOT EXISTS webhook_dead_letters ('
+        'id TEXT PRIMARY KEY, kind TEXT, ordering_key TEXT, seq INTEGER, payload TEXT, '
+        'status TEXT, attempts INTEGER, due_at REAL, lease_owner TEXT, last_error TEXT, '
+        'created_at REAL, updated_at REAL, dead_at REAL)',
+        'CREATE TABLE IF NOT EXISTS webhook_deliveries (key TEXT PRIMARY KEY, expires_at REAL)',
+        'CREATE INDEX IF NOT EXISTS webhook_deliveries_expires_at ON webhook_deliveries (expires_at)',
+    )
+
+    _COLUMNS = ('id', 'kind', 'ordering_key', 'seq', 'payload', 'status', 'attempts', 'due_at',
+                'lease_owner', 'last_error', 'created_at', 'updated_at')
+    _DEAD_COLUMNS = _COLUMNS + ('dead_at',)
+
+    def _row_to_entry(self, row, columns):
+        entry = dict(zip(columns, row))
+        entry['payload'] = json.loads(entry['payload'])
+        return entry
+
+    def _row(self, entry, columns):
+        return [json.dumps(entry[c]) if c == 'payload' else entry[c] for c in columns]
+
+    def _insert(self, conn, table, entry, columns):
+        conn.execute(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            self._row(entry, columns)
+        )
+
+    def enqueue(self, kind, ordering_key, payload):
+        entry = _new_entry(kind, ordering_key, payload)
+        with self._connect() as conn:
+            self._insert(conn, 'webhook_queue', entry, self._COLUMNS)
+        return entry
+
+    def claim(self, owner, lease_seconds, limit=10):
+        def _claim(conn):
+            now = time.time()
+            # Due entries with no earlier queued entry for the same key
+            rows = conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM webhook_queue AS w WHERE due_at <= ? "
+                'AND NOT EXISTS (SELECT 1 FROM webhook_queue AS e WHERE e.ordering_key = w.ordering_key '
+                'AND (e.seq < w.seq OR (e.seq = w.seq AND e.id < w.id))) '
+                'ORDER BY due_at LIMIT ?',
+                (now, limit)
+            ).fetchall()
+            claimed = []
+            for row in rows:
+                entry = self._row_to_entry(row, self._COLUMNS)
+                fields = _claim_fields(entry, owner, lease_seconds, now)
+                conn.execute(
+                    'UPDATE webhook_queue SET status = ?, attempts = ?, due_at = ?, lease_owner = ?, '
+                    'updated_at = ? WHERE id = ?',
+                    (fields['status'], fields['attempts'], fields['due_at'], fields['lease_owner'],
+                     fields['updated_at'], entry['id'])
+                )
+                entry.update(fields)
+                claimed.append(entry)
+            return claimed
+
+        return self._transaction(_claim)
+
+    def complete(self, entry_id, owner):
+        with self._connect() as conn:
+            cursor = conn.execute('DELETE FROM webhook_queue WHERE id = ? AND lease_owner = ?', (entry_id, owner))
+            return cursor.rowcount == 1
+
+    def retry(self, entry_id, owner, error, due_at):
+        fields = _retry_fields(error, due_at)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE webhook_queue SET status = ?, due_at = ?, lease_owner = NULL, last_error = ?, '
+                'updated_at = ? WHERE id = ? AND lease_owner = ?',
+                (fields['status'], fields['due_at'], error, fields['updated_at'], entry_id, owner)
+            )
+            return cursor.rowcount == 1
+
+    def dead_letter(self, entry_id, owner, error):
+        def _move(conn):
+            row = conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM webhook_queue WHERE id = ? AND lease_owner = ?",
+                (entry_id, owner)
+            ).fetchone()
+            if not row:
+                return False
+            self._insert(conn, 'webhook_dead_letters',
+                         _dead_letter(self._row_to_entry(row, self._COLUMNS), error), self._DEAD_COLUMNS)
+            conn.execute('DELETE FROM webhook_queue WHERE id = ?', (entry_id,))
+            return True
+
+        return self._transaction(_move)
+
+    def list_dead_letters(self, limit=50):
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(self._DEAD_COLUMNS)} FROM webhook_dead_letters ORDER BY dead_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [self._row_to_entry(row, self._DEAD_COLUMNS) for row in rows]
+
+    def redrive_dead_letter(self, entry_id):
+        def _redrive(conn):
+            row = conn.execute(
+                f"SELECT {', '.join(self._DEAD_COLUMNS)} FROM webhook_dead_letters WHERE id = ?", (entry_id,)
+            ).fetchone()
+            if not row:
+                return None
+            dead = self._row_to_entry(row, self._DEAD_COLUMNS)
+            entry = _new_entry(dead['kind'], dead['ordering_key'], dead['payload'])
+            entry.update({'id': dead['id'], 'created_at': dead['created_at']})
+            self._insert(conn, 'webhook_queue', entry, self._COLUMNS)
+            conn.execute('DELETE FROM webhook_dead_letters WHERE id = ?', (entry_id,))
+            return entry
+
+        return self._transaction(_redrive)
+
+    def record_delivery(self, key, ttl_seconds):
+        def _record(conn):
+            now = time.time()
+            conn.execute('DELETE FROM webhook_deliveries WHERE expires_at <= ?', (now,))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO webhook_deliveries (key, expires_at) VALUES (?, ?)', (key, now + ttl_seconds)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(_record)
+
+    def forget_delivery(self, key):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM webhook_deliveries WHERE key = ?', (key,))
+
+
+class FirestoreWebhookQueueStore(WebhookQueueStore):
+    """
+    Firestore-backed store shared by every Vercel instance.
+
+    Claims run in Firestore transactions that also read the other queued
+    entries of the ordering key, so two instances can never work the same
+    entry or the same call at once. Only single-field queries are used
+    ('due_at', 'ordering_key'), so no composite index is needed. Delivery
+    keys carry 'expire_at' for a Firestore TTL policy.
+    """
+
+    name = 'firestore'
+
+    def __init__(self, firestore_db):
+        self._db = firestore_db
+        self._collection = firestore_db.collection(WEBHOOK_QUEUE_COLLECTION)
+        self._dead = firestore_db.collection(WEBHOOK_DEAD_LETTER_COLLECTION)
+        self._deliveries = firestore_db.collection(WEBHOOK_DELIVERY_COLLECTION)
+
+    def enqueue(self, kind, ordering_key, payload):
+        entry = _new_entry(kind, ordering_key, payload)
+        self._collection.document(entry['id']).create(entry)
+        return entry
+
+    def _claim_one(self, doc_ref, owner, lease_seconds):
+        from firebase_admin import firestore
+
+        @firestore.transactional
+        def _claim(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            entry = snapshot.to_dict()
+            now = time.time()
+            if entry.get('due_at') is None or entry['due_at'] > now:
+                return None
+            same_key = self._collection.where('ordering_key', '==', entry['ordering_key'])
+            if not _is_head(entry, [doc.to_dict() for doc in transaction.get(same_key)]):
+                return None
+            fields = _claim_fields(entry, owner, lease_seconds, now)
+            transaction.update(doc_ref, fields)
+            entry.update(fields)
+            return entry
+
+        return _claim(self._db.transaction())
+
+    def claim(self, owner, lease_seconds, limit=10):
+        # Read extra candidates: entries behind another entry of their call are skipped
+        query = self._collection.where('due_at', '<=', time.time()).order_by('due_at').limit(limit * 4)
+        claimed = []
+        claimed_keys = set()
+        for snapshot in query.stream():
+            if len(claimed) >= limit:
+                break
+            if snapshot.get('ordering_key') in claimed_keys:
+                continue
+            entry = self._claim_one(snapshot.reference, owner, lease_seconds)
+            if entry:
+                claimed.append(entry)
+                claimed_keys.add(entry['ordering_key'])
+        return claimed
+
+    def _if_owner(self, entry_id, owner, apply):
+        from firebase_admin import firestore
+
+        doc_ref = self._collection.document(entry_id)
+
+        @firestore.transactional
+        def _update(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists or snapshot.to_dict().get('lease_owner') != owner:
+                return False
+            apply(transaction, doc_ref, snapshot.to_dict())
+            return True
+
+        return _update(self._db.transaction())
+
+    def complete(self, entry_id, owner):
+        return self._if_owner(entry_id, owner, lambda transaction, doc_ref, entry: transaction.delete(doc_ref))
+
+    def retry(self, entry_id, owner, error, due_at):
+        return self._if_owner(entry_id, owner, lambda transaction, doc_ref, entry:
+                              transaction.update(doc_ref, _retry_fields(error, due_at)))
+
+    def dead_letter(self, entry_id, owner, error):
+        def _move(transaction, doc_ref, entry):
+            transaction.set(self._dead.document(entry_id), _dead_letter(entry, error))
+            transaction.delete(doc_ref)
+
+        return self._if_owner(entry_id, owner, _move)
+
+    def list_dead_letters(self, limit=50):
+        from firebase_admin import firestore
+
+        query = self._dead.order_by('dead_at', direction=firestore.Query.DESCENDING).limit(limit)
+        return [snapshot.to_dict() for snapshot in query.stream()]
+
+    def redrive_dead_letter(self, entry_id):
+        from firebase_admin import firestore
+
+        dead_ref = self._dead.document(entry_id)
+
+        @firestore.transactional
+        def _redrive(transaction):
+            snapshot = dead_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            dead = snapshot.to_dict()
+            entry = _new_entry(dead['kind'], dead['ordering_key'], dead['payload'])
+            entry.update({'id': dead['id'], 'created_at': dead['created_at']})
+            transaction.set(self._collection.document(entry_id), entry)
+            transaction.delete(dead_ref)
+            return entry
+
+        return _redrive(self._db.transaction())
+
+    def record_delivery(self, key, ttl_seconds):
+        from firebase_admin import firestore
+
+        doc_ref = self._deliveries.document(key)
+
+        @firestore.transactional
+        def _record(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            now = time.time()
+            if snapshot.exists and (snapshot.to_dict().get('expires_at') or 0) > now:
+                return False
+            expires_at = now + ttl_seconds
+            transaction.set(doc_ref, {
+                'expires_at': expires_at,
+                # For a Firestore TTL policy on webhook_deliveries.expire_at
+                'expire_at': datetime.datetime.fromtimestamp(expires_at, tz=datetime.timezone.utc),
+            })
+            return True
+
+        return _record(self._db.transaction())
+
+    def forget_delivery(self, key):
+        self._deliveries.document(key).delete()
+
+
+_webhook_queue_store = StoreSelector(
+    'WEBHOOK_QUEUE_STORE', WEBHOOK_QUEUE_STORE, 'Webhook queue store',
+    firestore=FirestoreWebhookQueueStore, sqlite=SQLiteWebhookQueueStore, memory=MemoryWebhookQueueStore,
+    sqlite_path=WEBHOOK_QUEUE_STORE_PATH,
+)
+
+
+def get_webhook_queue_store():
+    """
+    Get the configured webhook queue store (created on first use).
+
+    WEBHOOK_QUEUE_STORE selects the backend: 'firestore', 'sqlite' or 'memory'.
+    Unset means Firestore when config.db is available, otherwise SQLite.
+
+    Returns:
+        WebhookQueueStore: Shared store instance
+    """
+    return _webhook_queue_store.get()
@@ -0,0 +1,617 @@
+"""
+Twilio Webhook Processing - Fast-Ack Ingestion for Call and Recording Callbacks
+
+In queue mode (WEBHOOK_INGEST_MODE=queue), /call_status and /recording_status
+only validate the callback and append it to the webhook queue
+(services.webhook_queue), then answer Twilio. The work
+that used to happen inside the request - the call session write, the parent
+CallSid lookup, the recording metadata write and the Podio Call Activity
+update - runs in processors drained in the background:
+
+    Twilio ─> /call_status ─────┐                    ┌─> process_call_status
+                                ├─> webhook_queue ───┤      (call session status)
+    Twilio ─> /recording_status ┘   (per CallSid)    └─> process_recording_status
+                                                            (session link, recording, Podio)
+
+Callbacks of one CallSid are processed in arrival order; a failing callback
+is retried with backoff and, after WEBHOOK_MAX_ATTEMPTS, moved to the
+dead-letter store (listed and re-driven via /api/webhooks/dead_letters).
+
+Twilio redelivers a callback when the first delivery times out. Each
+delivery is keyed on (kind, CallSid, CallStatus or RecordingSid, sequence
+number); a key seen before - in the per-instance LRU, or in the store for
+deliveries accepted by another instance - is dropped before it is queued,
+so the session write and the Podio PUT happen once. The key is released
+again if the callback could be neither queued nor processed, so Twilio's
+redelivery of it is not dropped.
+
+In inline mode (the default) the processors run inside the request as
+before. Queue mode needs a scheduler calling /api/webhooks/drain: a
+serverless instance can be frozen before its background drain finishes.
+
+Business Justification:
+    Pillar 5 (Scalability): Twilio gets its 200 in milliseconds under call
+                            bursts instead of timing out and retrying
+    Pillar 4 (Disposition Funnel): Recording links reach Podio even when
+                                   Podio or Twilio fail transiently
+
+Used By:
+    - app.py (/call_status, /recording_status, /api/webhooks/*)
+"""
+
+import hashlib
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import (
+    db,
+    client,
+    FANOUT_MAX_WORKERS,
+    WEBHOOK_INGEST_MODE,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_RETRY_BASE_SECONDS,
+    WEBHOOK_RETRY_MAX_SECONDS,
+    WEBHOOK_LEASE_SECONDS,
+    WEBHOOK_DEDUP_ENABLED,
+    WEBHOOK_DEDUP_CACHE_SIZE,
+    WEBHOOK_DEDUP_TTL_SECONDS,
+)
+from podio_service import update_call_activity_recording
+from db_service import (
+    log_call_status_to_firestore,
+    update_call_recording_metadata,
+    get_podio_item_id_from_call_sid,
+    get_call_session,
+    resolve_session_call_sid,
+    link_child_call,
+    mark_recording_podio_synced,
+    flush_write_buffer,
+    DURABILITY_SYNC,
+    DURABILITY_BUFFERED,
+)
+from services.fanout import Step, run_steps
+from services.webhook_queue import get_webhook_queue_store
+
+WEBHOOK_CALL_STATUS = 'call_status'
+WEBHOOK_RECORDING_STATUS = 'recording_status'
+
+INGEST_MODE_QUEUE = 'queue'
+INGEST_MODE_INLINE = 'inline'
+INGEST_DUPLICATE = 'duplicate'
+INGEST_FAILED = 'failed'
+
+# Drain outcomes
+WEBHOOK_DONE = 'done'
+WEBHOOK_RETRIED = 'retried'
+WEBHOOK_DEAD_LETTERED = 'dead_lettered'
+
+
+class WebhookProcessingError(Exception):
+    """Raised by a processor (strict mode) when a callback should be retried."""
+
+
+# ============================================================================
+# PROCESSORS
+# ============================================================================
+
+def process_call_status(payload, strict=False):
+    """
+    Record a call status callback on the call session.
+
+    Args:
+        payload: Callback parameters (CallSid, CallStatus, Direction, From, To, CallDuration)
+        strict: Raise WebhookProcessingError if the write fails (queue mode)
+
+    Note:
+        In strict mode the status is written synchronously: the queue entry is
+        deleted right after this returns, so a buffered write that fails
+        later would lose the status (and CallDuration) for good.
+    """
+    call_sid = payload.get('CallSid')
+    call_status_value = payload.get('CallStatus')
+    direction = payload.get('Direction')
+    from_number = payload.get('From')
+    to_number = payload.get('To')
+    call_duration = payload.get('CallDuration')  # Sent with 'completed'
+
+    print(f"Call SID: {call_sid}, Status: {call_status_value}, Duration: {call_duration}")
+
+    # 🚨 ALERT: Check for "busy" status which indicates potential issues
+    if call_status_value == 'busy':
+        print(f"\n{'='*50}")
+        print(f"🚨 ALERT: BUSY STATUS DETECTED")
+        print(f"Call SID: {call_sid}")
+        print(f"From: {from_number}")
+        print(f"To: {to_number}")
+        print(f"Direction: {direction}")
+        print(f"This may indicate:")
+        print(f"  - VOIP connection issue")
+        print(f"  - Prospect phone returned busy signal")
+        print(f"ACTION REQUIRED: Verify agent VOIP connection is active")
+        print(f"{'='*50}\n")
+
+    # Log to Firestore (V4.1: call session record, including the duration so
+    # /submit_call_data does not have to fetch the call from Twilio)
+    logged = log_call_status_to_firestore(
+        call_sid,
+        call_status_value,
+        direction,
+        from_number,
+        to_number,
+        call_duration,
+        durability=DURABILITY_SYNC if strict else None
+    )
+    if strict and db and not logged:
+        raise WebhookProcessingError(f"Call status for {call_sid} was not stored")
+
+
+def process_recording_status(payload, strict=False):
+    """
+    Attach a finished recording to its call session and Podio Call Activity.
+
+    Args:
+        payload: Callback parameters (RecordingSid, RecordingUrl, CallSid,
+                 RecordingDuration), the callback URL's parent_call_sid and
+                 item_id, and base_url for the playback proxy URL
+        strict: Raise WebhookProcessingError on Twilio/Firestore/Podio
+                failures instead of logging them (queue mode); session
+                writes are then synchronous, since the queue entry is
+                deleted as soon as this returns
+    """
+    recording_sid = payload.get('RecordingSid')
+    recording_url = payload.get('RecordingUrl')
+    call_sid = payload.get('CallSid')
+    recording_duration = payload.get('RecordingDuration')
+    base_url = payload.get('base_url')
+    durability = DURABILITY_SYNC if strict else DURABILITY_BUFFERED
+
+    print(f"=== RECORDING STATUS CALLBACK (V3.2.4) ===")
+    print(f"Recording SID: {recording_sid}")
+    print(f"Recording URL: {recording_url}")
+    print(f"Call SID (from webhook): {call_sid}")
+    print(f"Duration: {recording_duration} seconds")
+    print(f"==========================================")
+
+    if not (call_sid and recording_sid and recording_url):
+        print("WARNING: Missing required recording parameters")
+        return
+
+    # Build proxy URL for authentication-free playback
+    proxy_url = f"{base_url}/play_recording/{recording_sid}"
+
+    # V4.1: Correlation IDs carried in the callback URL (see build_recording_status_callback)
+    parent_call_sid = payload.get('parent_call_sid')
+    master_lead_item_id = payload.get('item_id')
+    if master_lead_item_id and str(master_lead_item_id).isdigit():
+        master_lead_item_id = int(master_lead_item_id)
+
+    if parent_call_sid:
+        # Single lookup: the parent session holds the Podio Call Activity ID
+        print(f"🔗 V4.1: Parent CallSid from callback URL: {parent_call_sid}")
+        linked = link_child_call(parent_call_sid, call_sid, master_lead_item_id, durability=durability)
+        if strict and db and not linked and parent_call_sid != call_sid:
+            raise WebhookProcessingError(f"Link {call_sid} -> {parent_call_sid} was not stored")
+        session_call_sid = parent_call_sid
+        podio_item_id = (get_call_session(parent_call_sid) or {}).get('podio_item_id')
+    else:
+        # Callback URL without correlation IDs (call started before V4.1)
+        session_call_sid, session = resolve_session_call_sid(call_sid)
+        if session is None:
+            # No session: call logged before V4.1 (legacy call_sid_mappings)
+            podio_item_id = get_podio_item_id_from_call_sid(call_sid)
+        else:
+            podio_item_id = session.get('podio_item_id')
+
+    # V3.2.4 FIX: Try direct lookup first, then resolve parent CallSid if needed
+    # The recording webhook receives the CHILD CallSid (prospect leg created by <Dial>)
+    # But the mapping stores the PARENT CallSid (agent leg from /dial endpoint)
+    # V4.1: Only reached for callbacks without a parent_call_sid parameter
+    if not podio_item_id and session_call_sid == call_sid:
+        # No direct mapping found - this is likely a child call from <Dial> TwiML
+        # Query Twilio API to find the parent CallSid
+        print(f"🔍 V3.2.4: No direct mapping for {call_sid}, checking for parent CallSid...")
+        try:
+            child_call = client.calls(call_sid).fetch()
+            parent_call_sid = child_call.parent_call_sid
+
+            if parent_call_sid:
+                print(f"🔗 V3.2.4: Found parent CallSid: {parent_call_sid}")
+                # V4.1: Remember the link so later callbacks skip the Twilio fetch
+                linked = link_child_call(parent_call_sid, call_sid, durability=durability)
+                if strict and db and not linked:
+                    raise WebhookProcessingError(f"Link {call_sid} -> {parent_call_sid} was not stored")
+                session_call_sid = parent_call_sid
+                # Now lookup using parent CallSid
+                podio_item_id = get_podio_item_id_from_call_sid(parent_call_sid)
+                if podio_item_id:
+                    print(f"✅ V3.2.4: Resolved via parent - Podio Item: {podio_item_id}")
+                else:
+                    print(f"⚠️ V3.2.4: Parent CallSid {parent_call_sid} also has no mapping")
+            else:
+                print(f"⚠️ V3.2.4: Call {call_sid} has no parent (is itself a parent call)")
+        except WebhookProcessingError:
+            raise
+        except Exception as e:
+            print(f"❌ V3.2.4 ERROR: Failed to query Twilio for parent CallSid: {e}")
+            if strict:
+                raise WebhookProcessingError(f"Parent CallSid lookup failed: {e}") from e
+
+    # Store recording metadata in Firestore (one write on the owning session)
+    stored = update_call_recording_metadata(
+        call_sid=session_call_sid,
+        recording_sid=recording_sid,
+        recording_url=recording_url,
+        recording_duration=int(recording_duration) if recording_duration else 0,
+        base_url=base_url
+    )
+    if strict and db and not stored:
+        raise WebhookProcessingError(f"Recording metadata for {session_call_sid} was not stored")
+
+    if podio_item_id:
+        print(f"V3.2.4: Found Podio mapping - Updating item {podio_item_id}")
+
+        # Update Podio Call Activity with recording URL
+        success, result = update_call_activity_recording(
+            call_activity_item_id=podio_item_id,
+            recording_url=proxy_url
+        )
+
+        if success:
+            print(f"✅ V3.2.4 SUCCESS: Updated Podio Call Activity {podio_item_id} with recording URL")
+            synced = mark_recording_podio_synced(session_call_sid, podio_item_id, durability=durability)
+            if strict and db and not synced:
+                # Retried: the Podio update is idempotent (same recording URL)
+                raise WebhookProcessingError(f"Podio sync marker for {session_call_sid} was not stored")
+        else:
+            print(f"❌ V3.2.4 ERROR: Failed to update Podio: {result}")
+            if strict:
+                raise WebhookProcessingError(f"Podio update of {podio_item_id} failed: {result}")
+    else:
+        print("⚠️ V3.2.4 WARNING: No Podio mapping found for this CallSid (even after parent resolution) - skipping Podio update")
+
+
+WEBHOOK_PROCESSORS = {
+    WEBHOOK_CALL_STATUS: process_call_status,
+    WEBHOOK_RECORDING_STATUS: process_recording_status,
+}
+
+
+# ============================================================================
+# INSTANCE COUNTERS
+# ============================================================================
+
+_stats = {
+    'queued': 0,
+    'processed_inline': 0,
+    'enqueue_errors': 0,
+    'dedup_checks': 0,
+    'dedup_cache_hits': 0,
+    'dedup_store_hits': 0,
+    'dedup_store_errors': 0,
+    'dedup_releases': 0,
+    'ingest_failures': 0,
+    WEBHOOK_DONE: 0,
+    WEBHOOK_RETRIED: 0,
+    WEBHOOK_DEAD_LETTERED: 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_webhook_stats():
+    """Webhook ingestion counters for /api/metrics (this instance only)."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['mode'] = get_ingest_mode()
+    with _recent_deliveries_lock:
+        stats['dedup_cache_size'] = len(_recent_deliveries)
+    return stats
+
+
+# ============================================================================
+# REDELIVERY DEDUPLICATION
+# ============================================================================
+
+# Delivery key -> expiry (epoch seconds), least recently seen first
+_recent_deliveries = OrderedDict()
+_recent_deliveries_lock = threading.Lock()
+
+
+def delivery_key(kind, payload):
+    """
+    Identity of one callback delivery (the same for Twilio's redeliveries).
+
+    Args:
+        kind: WEBHOOK_CALL_STATUS or WEBHOOK_RECORDING_STATUS
+        payload: Callback parameters
+
+    Returns:
+        str: SHA-256 hex of (kind, CallSid, CallStatus/RecordingSid, SequenceNumber/RecordingStatus)
+    """
+    if kind == WEBHOOK_RECORDING_STATUS:
+        parts = (kind, payload.get('CallSid'), payload.get('RecordingSid'), payload.get('RecordingStatus'))
+    else:
+        parts = (kind, payload.get('CallSid'), payload.get('CallStatus'), payload.get('SequenceNumber'))
+    return hashlib.sha256('|'.join(str(part or '') for part in parts).encode('utf-8')).hexdigest()
+
+
+def _seen_recently(key, now):
+    """LRU check-and-record; True if the key is cached and not expired."""
+    with _recent_deliveries_lock:
+        expires_at = _recent_deliveries.get(key)
+        if expires_at is not None and expires_at > now:
+            _recent_deliveries.move_to_end(key)
+            return True
+        _recent_deliveries[key] = now + WEBHOOK_DEDUP_TTL_SECONDS
+        _recent_deliveries.move_to_end(key)
+        while len(_recent_deliveries) > WEBHOOK_DEDUP_CACHE_SIZE:
+            _recent_deliveries.popitem(last=False)
+        return False
+
+
+def is_duplicate_delivery(kind, payload):
+    """
+    Check a callback against earlier deliveries and remember it.
+
+    Args:
+        kind: WEBHOOK_CALL_STATUS or WEBHOOK_RECORDING_STATUS
+        payload: Callback parameters
+
+    Returns:
+        bool: True if this delivery was already accepted
+
+    Note:
+        The LRU answers repeats that reach the same instance without any I/O;
+        other deliveries cost one store write. If the store fails, the
+        delivery is treated as new (processing twice is safer than dropping).
+    """
+    key = delivery_key(kind, payload)
+    _count('dedup_checks')
+    if _seen_recently(key, time.time()):
+        _count('dedup_cache_hits')
+        return True
+    try:
+        first = get_webhook_queue_store().record_delivery(key, WEBHOOK_DEDUP_TTL_SECONDS)
+    except Exception as e:
+        _count('dedup_store_errors')
+        print(f"⚠️ V4.1: Webhook dedup store unavailable ({e}) - accepting delivery")
+        return False
+    if not first:
+        _count('dedup_store_hits')
+    return not first
+
+
+def release_delivery(kind, payload):
+    """
+    Forget a delivery accepted by is_duplicate_delivery().
+
+    Called when the callback could be neither queued nor processed, so the
+    redelivery Twilio sends after the error response is not dropped.
+
+    Args:
+        kind: WEBHOOK_CALL_STATUS or WEBHOOK_RECORDING_STATUS
+        payload: Callback parameters
+    """
+    key = delivery_key(kind, payload)
+    _count('dedup_releases')
+    with _recent_deliveries_lock:
+        _recent_deliveries.pop(key, None)
+    try:
+        get_webhook_queue_store().forget_delivery(key)
+    except Exception as e:
+        _count('dedup_store_errors')
+        print(f"⚠️ V4.1: Could not release webhook delivery key ({e})")
+
+
+# ============================================================================
+# QUEUE DRAIN
+# ============================================================================
+
+def get_ingest_mode():
+    """
+    Resolve how Twilio callbacks are handled.
+
+    Returns:
+        str: INGEST_MODE_QUEUE if WEBHOOK_INGEST_MODE is 'queue',
+             INGEST_MODE_INLINE otherwise (the default)
+    """
+    mode = (WEBHOOK_INGEST_MODE or INGEST_MODE_INLINE).lower()
+    return INGEST_MODE_QUEUE if mode == INGEST_MODE_QUEUE else INGEST_MODE_INLINE
+
+
+def _retry_delay(attempts):
+    """Full-jitter exponential backoff before the next attempt."""
+    ceiling = min(WEBHOOK_RETRY_MAX_SECONDS, WEBHOOK_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return random.uniform(WEBHOOK_RETRY_BASE_SECONDS / 2, max(ceiling, WEBHOOK_RETRY_BASE_SECONDS / 2))
+
+
+def process_webhook_entry(entry, owner):
+    """
+    Run one claimed callback and complete, retry or dead-letter it.
+
+    Args:
+        entry: Entry record returned by WebhookQueueStore.claim
+        owner: Worker ID holding the lease
+
+    Returns:
+        str: WEBHOOK_DONE, WEBHOOK_RETRIED or WEBHOOK_DEAD_LETTERED
+    """
+    store = get_webhook_queue_store()
+    entry_id = entry['id']
+    processor = WEBHOOK_PROCESSORS.get(entry.get('kind'))
+
+    if processor is None:
+        error = f"Unknown webhook kind: {entry.get('kind')}"
+    else:
+        try:
+            processor(entry['payload'], strict=True)
+            store.complete(entry_id, owner)
+            _count(WEBHOOK_DONE)
+            return WEBHOOK_DONE
+        except Exception as e:
+            error = str(e)
+
+    if processor is None or entry['attempts'] >= WEBHOOK_MAX_ATTEMPTS:
+        store.dead_letter(entry_id, owner, error)
+        _count(WEBHOOK_DEAD_LETTERED)
+        print(f"❌ V4.1: Webhook {entry['kind']} {entry_id} ({entry['ordering_key']}) dead-lettered "
+              f"after {entry['attempts']} attempts: {error}")
+        return WEBHOOK_DEAD_LETTERED
+
+    delay = _retry_delay(entry['attempts'])
+    store.retry(entry_id, owner, error, time.time() + delay)
+    _count(WEBHOOK_RETRIED)
+    print(f"⚠️ V4.1: Webhook {entry['kind']} {entry_id} attempt {entry['attempts']} failed ({error}) "
+          f"- retrying in {delay:.0f}s")
+    return WEBHOOK_RETRIED
+
+
+def drain_webhook_queue(limit=50):
+    """
+    Claim and process due callbacks until the queue is empty or `limit` is reached.
+
+    Each round claims at most one callback per CallSid and processes the
+    round concurrently on the fan-out pool; the next callback of a call is
+    claimable once the previous one has finished.
+
+    Args:
+        limit: Maximum callbacks to process in this call
+
+    Returns:
+        dict: 'claimed' plus counts per outcome
+    """
+    owner = uuid.uuid4().hex
+    summary = {'claimed': 0, WEBHOOK_DONE: 0, WEBHOOK_RETRIED: 0, WEBHOOK_DEAD_LETTERED: 0}
+    store = get_webhook_queue_store()
+
+    while summary['claimed'] < limit:
+        entries = store.claim(owner, WEBHOOK_LEASE_SECONDS, limit=min(FANOUT_MAX_WORKERS, limit - summary['claimed']))
+        if not entries:
+            break
+        summary['claimed'] += len(entries)
+        results = run_steps([
+            Step(entry['id'], lambda values, entry=entry: process_webhook_entry(entry, owner))
+            for entry in entries
+        ])
+        for entry_id, result in results.items():
+            if result.ok:
+                summary[result.value] += 1
+            else:
+                # Storage error while settling: the lease expires and the entry is retried
+                print(f"Error processing webhook entry {entry_id}: {result.error}")
+
+    # Buffered status writes must not wait for a request that may never come
+    flush_write_buffer()
+    return summary
+
+
+_drain_lock = threading.Lock()
+_drain_running = False
+_drain_requested = False
+
+
+def _drain_in_background():
+    """Start one drain thread per instance; callbacks arriving meanwhile make it loop again."""
+    global _drain_running, _drain_requested
+
+    with _drain_lock:
+        _drain_requested = True
+        if _drain_running:
+            return
+        _drain_running = True
+
+    def run():
+        global _drain_running, _drain_requested
+        while True:
+            with _drain_lock:
+                if not _drain_requested:
+                    _drain_running = False
+                    return
+                _drain_requested = False
+            try:
+                drain_webhook_queue()
+            except Exception as e:
+                print(f"Error draining webhook queue: {e}")
+
+    threading.Thread(target=run, name='webhook-drain', daemon=True).start()
+
+
+# ============================================================================
+# INGESTION
+# ============================================================================
+
+def ingest_webhook(kind, payload):
+    """
+    Accept a validated Twilio callback.
+
+    Args:
+        kind: WEBHOOK_CALL_STATUS or WEBHOOK_RECORDING_STATUS
+        payload: JSON-serializable callback parameters (must include CallSid)
+
+    Returns:
+        str: INGEST_MODE_QUEUE if the callback was queued, INGEST_MODE_INLINE
+             if it was processed before returning, INGEST_DUPLICATE if it
+             was a redelivery and was dropped, INGEST_FAILED if it could be
+             neither queued nor processed (answer with an error so Twilio
+             redelivers it)
+
+    Note:
+        The background drain is best effort (a serverless instance may be
+        frozen after responding). Callbacks it does not finish are picked
+        up by /api/webhooks/drain or the next callback's drain. If the queue
+        cannot be written, the callback is processed inline (strict, so a
+        failed write is reported) so it is not lost.
+    """
+    if WEBHOOK_DEDUP_ENABLED and is_duplicate_delivery(kind, payload):
+        print(f"V4.1: Duplicate {kind} delivery for {payload.get('CallSid')} dropped")
+        return INGEST_DUPLICATE
+
+    strict = False
+    if get_ingest_mode() == INGEST_MODE_QUEUE:
+        try:
+            entry = get_webhook_queue_store().enqueue(kind, payload['CallSid'], payload)
+            _count('queued')
+            print(f"V4.1: {kind} callback for {payload['CallSid']} queued as {entry['id']}")
+            _drain_in_background()
+            return INGEST_MODE_QUEUE
+        except Exception as e:
+            _count('enqueue_errors')
+            print(f"⚠️ V4.1: Could not queue {kind} callback ({e}) - processing inline")
+            strict = True
+
+    try:
+        WEBHOOK_PROCESSORS[kind](payload, strict=strict)
+    except Exception as e:
+        print(f"Error processing {kind} callback: {e}")
+        _count('ingest_failures')
+        if WEBHOOK_DEDUP_ENABLED:
+            release_delivery(kind, payload)
+        return INGEST_FAILED
+    _count('processed_inline')
+    return INGEST_MODE_INLINE
+
+
+def list_dead_letters(limit=50):
+    """Dead-lettered callbacks, most recent first."""
+    return get_webhook_queue_store().list_dead_letters(limit=limit)
+
+
+def redrive_dead_letter(entry_id):
+    """
+    Re-queue a dead-lettered callback and start a drain.
+
+    Returns:
+        dict or None: The queued entry, or None if the ID is unknown
+    """
+    entry = get_webhook_queue_store().redrive_dead_letter(entry_id)
+    if entry:
+        print(f"V4.1: Dead letter {entry_id} re-queued")
+        _drain_in_background()
+    return entry
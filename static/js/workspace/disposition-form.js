@@ -37,6 +37,9 @@ var DispositionForm = (function() {
     /** @type {Object} Template data for contact info (owner phone, name, addresses) */
     let _templateData = {};
 
+    /** @type {string|null} Idempotency key for the current disposition (V4.1) */
+    let _submissionKey = null;
+
     // ==========================================
     // DISPOSITIONS THAT REQUIRE NEXT ACTION DATE
     // ==========================================
@@ -44,6 +47,19 @@ var DispositionForm = (function() {
     /** @type {Array<string>} Dispositions requiring a next action date */
     const DISPOSITIONS_REQUIRING_DATE = ['Appointment Set', 'Callback Scheduled'];
 
+    // ==========================================
+    // OUTBOX STATUS POLLING (V4.1)
+    // ==========================================
+
+    /** @type {number} Milliseconds between outbox status polls */
+    const OUTBOX_POLL_INTERVAL_MS = 2000;
+
+    /** @type {number} Stop polling after this long (the server keeps retrying) */
+    const OUTBOX_POLL_TIMEOUT_MS = 60000;
+
+    /** @type {number} Resends while the server reports the same submission in progress (409) */
+    const IN_PROGRESS_MAX_RETRIES = 5;
+
     // ==========================================
     // PRIVATE FUNCTIONS
     // ==========================================
@@ -141,6 +157,58 @@ var DispositionForm = (function() {
         }
     }
 
+    /**
+     * Creates a new idempotency key (V4.1)
+     * 
+     * One key per disposition: retries and double-clicks reuse it, so the
+     * server replays the first response instead of writing to Podio again.
+     * 
+     * @private
+     * @returns {string} Random key
+     */
+    function newSubmissionKey() {
+        if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+            return window.crypto.randomUUID();
+        }
+        return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 12);
+    }
+
+    /**
+     * Polls a queued disposition until Podio has it (V4.1 outbox mode)
+     * 
+     * The server answers /submit_call_data with 202 + status_url once the
+     * disposition is stored; the Podio writes happen in the background.
+     * Only a permanent failure is surfaced to the agent - retries are silent.
+     * 
+     * @private
+     * @param {string} statusUrl - Status endpoint returned by /submit_call_data
+     */
+    async function pollOutboxStatus(statusUrl) {
+        const deadline = Date.now() + OUTBOX_POLL_TIMEOUT_MS;
+
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, OUTBOX_POLL_INTERVAL_MS));
+            try {
+                const response = await fetch(statusUrl);
+                if (!response.ok) {
+                    continue;
+                }
+                const status = await response.json();
+                if (status.status === 'done') {
+                    console.log('Disposition written to Podio:', status.podio_item_id);
+                    return;
+                }
+                if (status.status === 'failed') {
+                    showError('Disposition was saved but could not be written to Podio: ' + (status.last_error || 'unknown error'));
+                    return;
+                }
+            } catch (error) {
+                console.warn('Outbox status poll failed:', error);
+            }
+        }
+        console.warn('Disposition still syncing to Podio after polling window; server will keep retrying:', statusUrl);
+    }
+
     /**
      * Handles form submission
      * Validates form, prepares data, and submits via AJAX
@@ -184,20 +252,45 @@ var DispositionForm = (function() {
 
             console.log('Submitting form data with CallSid:', callSid);
 
-            // Submit to backend
-            const response = await fetch('/submit_call_data', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(formData)
-            });
+            if (!_submissionKey) {
+                _submissionKey = newSubmissionKey();
+            }
+
+            // Submit to backend (V4.1: 409 = an earlier send of this key is still running)
+            let response;
+            for (let attempt = 0; attempt <= IN_PROGRESS_MAX_RETRIES; attempt++) {
+                response = await fetch('/submit_call_data', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'Idempotency-Key': _submissionKey
+                    },
+                    body: JSON.stringify(formData)
+                });
+                if (response.status !== 409) {
+                    break;
+                }
+                const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 2;
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+            }
 
             if (!response.ok) {
                 const errorData = await response.json();
                 throw new Error(errorData.error || 'Failed to submit call data');
             }
 
+            // V4.1: 202 = saved to the outbox, Podio writes continue in the background
+            if (response.status === 202) {
+                const queued = await response.json();
+                console.log('Disposition queued:', queued.outbox_id);
+                if (queued.status_url) {
+                    pollOutboxStatus(queued.status_url);
+                }
+            }
+
+            // The next disposition on this page is a new submission, not a retry
+            _submissionKey = null;
+
             // Show success message
             if (_elements.dispositionForm) {
                 _elements.dispositionForm.classList.add('hidden');
@@ -459,12 +552,14 @@ var DispositionForm = (function() {
         /**
          * Reset the form to its initial state
          * 
-         * @description Clears form fields and resets validation state
+         * @description Clears form fields, resets validation state and
+         *              starts a new idempotency key for the next submission
          */
         reset: function() {
             if (_elements.dispositionForm) {
                 _elements.dispositionForm.reset();
             }
+            _submissionKey = null;
             validateForm();
             
             // Reset conditional field visibility
@@ -495,6 +590,7 @@ var DispositionForm = (function() {
          */
         setItemId: function(itemId) {
             _itemId = itemId;
+            _submissionKey = null;
         }
     };
 })();
@@ -29,8 +29,26 @@ var TwilioVOIP = (function() {
     /** @type {string|null} CallSid for the current/last call (used for Podio mapping) */
     let currentCallSid = null;
     
-    /** @type {string} Unique agent identity for VOIP registration */
-    let agentIdentity = 'agent_' + Math.random().toString(36).substr(2, 9);
+    /** @type {string} sessionStorage key for the agent identity (V4.1) */
+    const IDENTITY_STORAGE_KEY = 'twilioVoip.identity';
+
+    /** @type {string} sessionStorage key for the last access token (V4.1) */
+    const TOKEN_STORAGE_KEY = 'twilioVoip.token';
+
+    /** @type {number} Reuse a stored token on reload only if it has this many seconds left */
+    const TOKEN_REUSE_MIN_SECONDS = 300;
+
+    /** @type {number} Device fires 'tokenWillExpire' this long before the token expires */
+    const TOKEN_REFRESH_LEAD_MS = 60000;
+
+    /** @type {number} Refreshes are spread over this window so agents do not refresh at once */
+    const TOKEN_REFRESH_JITTER_MS = 20000;
+
+    /** @type {string} Unique agent identity for VOIP registration (V4.1: kept across reloads of the tab) */
+    let agentIdentity = loadAgentIdentity();
+
+    /** @type {number|null} Expiry (epoch seconds) of the token the Device is using */
+    let tokenExpiresAt = null;
     
     /** @type {Object} DOM element references (set during init) */
     let elements = {};
@@ -66,6 +84,133 @@ var TwilioVOIP = (function() {
         });
     }
 
+    /**
+     * Read a sessionStorage value (null if storage is unavailable)
+     * @private
+     * @param {string} key - Storage key
+     * @returns {string|null}
+     */
+    function readSession(key) {
+        try {
+            return window.sessionStorage.getItem(key);
+        } catch (e) {
+            return null;
+        }
+    }
+
+    /**
+     * Write a sessionStorage value (ignored if storage is unavailable)
+     * @private
+     * @param {string} key - Storage key
+     * @param {string} value - Value to store
+     */
+    function writeSession(key, value) {
+        try {
+            window.sessionStorage.setItem(key, value);
+        } catch (e) {
+            // Private mode / storage disabled: identity and token are per page load
+        }
+    }
+
+    /**
+     * Agent identity for this tab, kept across reloads (V4.1)
+     *
+     * A stable identity lets a reload reuse the stored token (and the
+     * server's per-identity token cache) instead of signing a new one.
+     * @private
+     * @returns {string} Agent identity
+     */
+    function loadAgentIdentity() {
+        let identity = readSession(IDENTITY_STORAGE_KEY);
+        if (!identity) {
+            identity = 'agent_' + Math.random().toString(36).substr(2, 9);
+            writeSession(IDENTITY_STORAGE_KEY, identity);
+        }
+        return identity;
+    }
+
+    /**
+     * Remember the access token so a reload can reuse it (V4.1)
+     * @private
+     * @param {Object} data - Token response ({token, identity, expires_at})
+     */
+    function storeToken(data) {
+        tokenExpiresAt = data.expires_at || null;
+        writeSession(TOKEN_STORAGE_KEY, JSON.stringify({
+            token: data.token,
+            identity: data.identity,
+            expires_at: data.expires_at
+        }));
+    }
+
+    /**
+     * Access token for the Device: the stored one if it is still valid
+     * for long enough, otherwise a new one from /token (V4.1)
+     * @private
+     * @returns {Promise<Object>} Token data ({token, identity, expires_at, ttl})
+     */
+    async function getAccessToken() {
+        try {
+            const stored = JSON.parse(readSession(TOKEN_STORAGE_KEY) || 'null');
+            if (stored && stored.identity === agentIdentity && stored.expires_at &&
+                    stored.expires_at - Date.now() / 1000 > TOKEN_REUSE_MIN_SECONDS) {
+                console.log('Reusing stored Twilio token (expires in',
+                    Math.round(stored.expires_at - Date.now() / 1000), 's)');
+                return stored;
+            }
+        } catch (e) {
+            // Corrupt entry: fetch a new token
+        }
+
+        // Fetch access token from backend using the stored identity
+        const response = await fetch('/token?identity=' + encodeURIComponent(agentIdentity));
+        if (!response.ok) {
+            throw new Error('Failed to fetch Twilio token');
+        }
+        return response.json();
+    }
+
+    /**
+     * Replace the Device's token before it expires (V4.1)
+     *
+     * Runs on 'tokenWillExpire' after a random delay, retrying with
+     * backoff while the current token is still valid.
+     * @private
+     * @param {number} [attempt=0] - Retry attempt
+     */
+    async function refreshAccessToken(attempt) {
+        attempt = attempt || 0;
+        try {
+            const response = await fetch('/token/refresh', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    identity: agentIdentity,
+                    expires_at: tokenExpiresAt
+                }),
+            });
+            if (!response.ok) {
+                throw new Error('Token refresh failed: ' + response.status);
+            }
+
+            const data = await response.json();
+            twilioDevice.updateToken(data.token);
+            storeToken(data);
+            console.log('🔑 Twilio token refreshed (expires in', data.ttl, 's)');
+        } catch (error) {
+            const secondsLeft = tokenExpiresAt ? tokenExpiresAt - Date.now() / 1000 : 0;
+            const retryMs = Math.min(1000 * Math.pow(2, attempt), 15000);
+            console.error('❌ Twilio token refresh failed:', error);
+            if (secondsLeft * 1000 > retryMs) {
+                setTimeout(function() { refreshAccessToken(attempt + 1); }, retryMs);
+            } else {
+                updateDeviceStatus('Token expired - reload', 'error');
+            }
+        }
+    }
+
     /**
      * Update device status display
      * @private
@@ -107,13 +252,9 @@ var TwilioVOIP = (function() {
 
             console.log('✅ Twilio SDK loaded successfully');
 
-            // Fetch access token from backend using the stored identity
-            const response = await fetch('/token?identity=' + agentIdentity);
-            if (!response.ok) {
-                throw new Error('Failed to fetch Twilio token');
-            }
-
-            const data = await response.json();
+            // V4.1: Stored token from an earlier load of this tab, or a new one from /token
+            const data = await getAccessToken();
+            storeToken(data);
             console.log('Twilio token obtained for identity:', data.identity);
 
             // Pre-fill the Agent Connection field with the identity used for registration
@@ -128,7 +269,16 @@ var TwilioVOIP = (function() {
             // Initialize Twilio Device (v2 API)
             twilioDevice = new Device(data.token, {
                 logLevel: 1, // 1 = debug, 0 = trace
-                codecPreferences: [Twilio.Call.Codec.Opus, Twilio.Call.Codec.PCMU]
+                codecPreferences: [Twilio.Call.Codec.Opus, Twilio.Call.Codec.PCMU],
+                tokenRefreshMs: TOKEN_REFRESH_LEAD_MS
+            });
+
+            // V4.1: Swap in a new token before this one expires (spread over a
+            // jitter window so all agents do not hit /token/refresh at once)
+            twilioDevice.on('tokenWillExpire', function() {
+                const delayMs = Math.floor(Math.random() * TOKEN_REFRESH_JITTER_MS);
+                console.log('⏳ Twilio token expires soon - refreshing in', delayMs, 'ms');
+                setTimeout(refreshAccessToken, delayMs);
             });
 
             // Device registered event (v2: 'ready' → 'registered')
@@ -0,0 +1,21 @@
+"""
+Pytest setup: dummy credentials so config.py and app.py import without a
+real Twilio/Podio/Firestore environment, and the repository root on sys.path.
+"""
+
+import os
+import sys
+
+os.environ.setdefault('TWILIO_ACCOUNT_SID', 'AC' + '0' * 32)
+os.environ.setdefault('TWILIO_AUTH_TOKEN', 'test-auth-token')
+os.environ.setdefault('TWILIO_API_KEY', 'SK' + '0' * 32)
+os.environ.setdefault('TWILIO_API_SECRET', 'test-api-secret')
+os.environ.setdefault('TWILIO_TWIML_APP_SID', 'AP' + '0' * 32)
+os.environ.setdefault('TWILIO_PHONE_NUMBER', '+15555550100')
+os.environ.setdefault('PODIO_CLIENT_ID', 'test-client')
+os.environ.setdefault('PODIO_CLIENT_SECRET', 'test-secret')
+os.environ.setdefault('PODIO_USERNAME', 'agent@example.com')
+os.environ.setdefault('PODIO_PASSWORD', 'test-password')
+os.environ.setdefault('PODIO_TOKEN_STORE', 'memory')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,131 @@
+"""
+Podio item fetches per request (X-Podio-Item-Fetches).
+
+The Podio client is replaced by a stub that answers the Master Lead filter
+calls, so every fetch the routes make is counted without network access.
+"""
+
+import pytest
+
+import app as app_module
+from services.podio import item_service
+from services.podio.item_cache import clear_item_cache
+
+
+def _lead(item_id):
+    return {
+        'item_id': item_id,
+        'current_revision': 1,
+        'fields': [
+            {'field_id': 1, 'type': 'text', 'label': 'Owner Name', 'values': [{'value': f'Owner {item_id}'}]},
+            {'field_id': 2, 'type': 'phone', 'label': 'Best Contact Number',
+             'values': [{'type': 'mobile', 'value': '+15555550123'}]},
+        ],
+    }
+
+
+class StubResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self._data = data
+        self.text = str(data)
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+
+class StubPodioClient:
+    """Answers POST /item/app/{app_id}/filter for Master Lead IDs 1-99."""
+
+    def __init__(self):
+        self.filter_calls = 0
+
+    def post(self, path, json=None, params=None):
+        assert path.endswith('/filter'), path
+        self.filter_calls += 1
+        requested = json['filters']['item_id']
+        ids = requested if isinstance(requested, list) else [requested]
+        items = [_lead(int(item_id)) for item_id in ids if 0 < int(item_id) < 100]
+        return StubResponse({'items': items, 'total': len(items), 'filtered': len(items)})
+
+
+class StubCall:
+    sid = 'CA' + '1' * 32
+
+
+class StubTwilioCalls:
+    def create(self, **kwargs):
+        return StubCall()
+
+
+class StubTwilioClient:
+    calls = StubTwilioCalls()
+
+
+@pytest.fixture
+def podio(monkeypatch):
+    stub = StubPodioClient()
+    monkeypatch.setattr(item_service, 'get_podio_client', lambda: stub)
+    monkeypatch.setattr(app_module, 'client', StubTwilioClient())
+    clear_item_cache()
+    yield stub
+    clear_item_cache()
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_workspace_fetches_master_lead_once(podio, client):
+    response = client.get('/workspace?item_id=5')
+
+    assert response.status_code == 200
+    assert response.headers['X-Podio-Item-Fetches'] == '1'
+    assert podio.filter_calls == 1
+
+
+def test_workspace_reload_is_served_from_item_cache(podio, client):
+    client.get('/workspace?item_id=5')
+    response = client.get('/workspace?item_id=5')
+
+    assert response.status_code == 200
+    assert response.headers['X-Podio-Item-Fetches'] == '0'
+    assert podio.filter_calls == 1
+
+
+def test_dial_reads_lead_from_podio_even_when_cached(podio, client):
+    client.get('/workspace?item_id=5')
+    response = client.get('/dial?item_id=5&agent_id=client:agent_test')
+
+    assert response.status_code == 200
+    assert response.headers['X-Podio-Item-Fetches'] == '1'
+    assert podio.filter_calls == 2
+
+
+def test_leads_batch_fetches_all_leads_in_one_call(podio, client):
+    response = client.post('/api/leads/batch', json={'item_ids': [5, 6, 5, 7, 500]})
+
+    assert response.status_code == 200
+    assert response.headers['X-Podio-Item-Fetches'] == '1'
+    body = response.get_json()
+    assert [lead['item_id'] for lead in body['leads']] == [5, 6, 7]
+    assert body['missing'] == [500]
+
+
+def test_leads_batch_reuses_cached_leads(podio, client):
+    client.get('/workspace?item_id=5')
+    response = client.post('/api/leads/batch', json={'item_ids': [5]})
+
+    assert response.status_code == 200
+    assert response.headers['X-Podio-Item-Fetches'] == '0'
+    assert podio.filter_calls == 1
+
+
+def test_routes_without_leads_make_no_fetches(podio, client):
+    response = client.get('/api/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['X-Podio-Item-Fetches'] == '0'
+    assert podio.filter_calls == 0
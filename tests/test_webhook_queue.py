@@ -0,0 +1,235 @@
+"""
+Twilio webhook queue: ordering, retries, dead letters, redelivery dedup and
+ingest outcomes.
+
+Store tests run against the memory and SQLite backends; ingestion tests use
+the memory backend with stub processors (no Firestore or Podio access).
+"""
+
+import pytest
+
+from services import webhooks
+from services.webhook_queue import MemoryWebhookQueueStore, SQLiteWebhookQueueStore
+
+OWNER = 'worker-1'
+LEASE_SECONDS = 60
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryWebhookQueueStore()
+    return SQLiteWebhookQueueStore(str(tmp_path / 'webhook_queue.sqlite3'))
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+def test_claim_returns_only_the_head_of_each_call(store):
+    first = store.enqueue('call_status', 'CA1', {'CallStatus': 'ringing'})
+    second = store.enqueue('call_status', 'CA1', {'CallStatus': 'completed'})
+    other = store.enqueue('call_status', 'CA2', {'CallStatus': 'ringing'})
+
+    claimed = store.claim(OWNER, LEASE_SECONDS, limit=10)
+
+    assert sorted(entry['id'] for entry in claimed) == sorted([first['id'], other['id']])
+    assert store.claim(OWNER, LEASE_SECONDS, limit=10) == []
+
+    assert store.complete(first['id'], OWNER)
+    claimed = store.claim(OWNER, LEASE_SECONDS, limit=10)
+    assert [entry['id'] for entry in claimed] == [second['id']]
+    assert claimed[0]['attempts'] == 1
+
+
+def test_retried_head_still_blocks_later_callbacks(store):
+    first = store.enqueue('call_status', 'CA1', {'CallStatus': 'ringing'})
+    store.enqueue('call_status', 'CA1', {'CallStatus': 'completed'})
+    store.claim(OWNER, LEASE_SECONDS)
+
+    assert store.retry(first['id'], OWNER, 'boom', due_at=0)
+    claimed = store.claim(OWNER, LEASE_SECONDS)
+
+    assert [entry['id'] for entry in claimed] == [first['id']]
+    assert claimed[0]['attempts'] == 2
+    assert claimed[0]['last_error'] == 'boom'
+
+
+def test_only_the_lease_owner_can_settle_an_entry(store):
+    entry = store.enqueue('call_status', 'CA1', {})
+    store.claim(OWNER, LEASE_SECONDS)
+
+    assert not store.complete(entry['id'], 'worker-2')
+    assert not store.dead_letter(entry['id'], 'worker-2', 'boom')
+    assert store.complete(entry['id'], OWNER)
+
+
+def test_dead_letter_and_redrive(store):
+    entry = store.enqueue('recording_status', 'CA1', {'RecordingSid': 'RE1'})
+    store.claim(OWNER, LEASE_SECONDS)
+
+    assert store.dead_letter(entry['id'], OWNER, 'podio down')
+    assert store.claim(OWNER, LEASE_SECONDS) == []
+    dead = store.list_dead_letters()
+    assert [(d['id'], d['last_error'], d['payload']) for d in dead] == [(entry['id'], 'podio down', {'RecordingSid': 'RE1'})]
+
+    redriven = store.redrive_dead_letter(entry['id'])
+    assert redriven['attempts'] == 0
+    assert store.list_dead_letters() == []
+    assert [e['id'] for e in store.claim(OWNER, LEASE_SECONDS)] == [entry['id']]
+    assert store.redrive_dead_letter('unknown') is None
+
+
+def test_redriven_entry_queues_behind_the_calls_pending_callbacks(store):
+    dead = store.enqueue('call_status', 'CA1', {'CallStatus': 'ringing'})
+    store.claim(OWNER, LEASE_SECONDS)
+    store.dead_letter(dead['id'], OWNER, 'boom')
+    later = store.enqueue('call_status', 'CA1', {'CallStatus': 'completed'})
+
+    store.redrive_dead_letter(dead['id'])
+
+    assert [e['id'] for e in store.claim(OWNER, LEASE_SECONDS)] == [later['id']]
+
+
+def test_record_and_forget_delivery(store):
+    assert store.record_delivery('key-1', 60)
+    assert not store.record_delivery('key-1', 60)
+    assert store.record_delivery('key-2', 60)
+
+    store.forget_delivery('key-1')
+    assert store.record_delivery('key-1', 60)
+
+
+def test_expired_delivery_keys_are_accepted_again(store):
+    assert store.record_delivery('key-1', -1)
+    assert store.record_delivery('key-1', 60)
+
+
+# ============================================================================
+# PROCESSING
+# ============================================================================
+
+@pytest.fixture
+def queue(monkeypatch):
+    memory = MemoryWebhookQueueStore()
+    monkeypatch.setattr(webhooks, 'get_webhook_queue_store', lambda: memory)
+    monkeypatch.setattr(webhooks, 'get_ingest_mode', lambda: webhooks.INGEST_MODE_QUEUE)
+    monkeypatch.setattr(webhooks, '_drain_in_background', lambda: None)
+    monkeypatch.setattr(webhooks, 'flush_write_buffer', lambda: True)
+    monkeypatch.setattr(webhooks, '_retry_delay', lambda attempts: 0)
+    monkeypatch.setattr(webhooks, 'WEBHOOK_DEDUP_ENABLED', True)
+    webhooks._recent_deliveries.clear()
+    yield memory
+    webhooks._recent_deliveries.clear()
+
+
+# CallSids whose callbacks the stub processor fails
+failing_calls = set()
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    calls = []
+
+    def processor(payload, strict=False):
+        calls.append((payload['CallSid'], payload['CallStatus'], strict))
+        if payload['CallSid'] in failing_calls:
+            raise webhooks.WebhookProcessingError('write failed')
+
+    monkeypatch.setitem(webhooks.WEBHOOK_PROCESSORS, webhooks.WEBHOOK_CALL_STATUS, processor)
+    failing_calls.clear()
+    yield calls
+    failing_calls.clear()
+
+
+def _status(call_sid, status, sequence):
+    return {'CallSid': call_sid, 'CallStatus': status, 'SequenceNumber': sequence}
+
+
+def test_drain_processes_each_call_in_arrival_order(queue, processed):
+    for payload in (_status('CA1', 'ringing', '0'), _status('CA2', 'ringing', '0'),
+                    _status('CA1', 'in-progress', '1'), _status('CA1', 'completed', '2')):
+        queue.enqueue(webhooks.WEBHOOK_CALL_STATUS, payload['CallSid'], payload)
+
+    summary = webhooks.drain_webhook_queue()
+
+    assert summary['claimed'] == 4 and summary[webhooks.WEBHOOK_DONE] == 4
+    assert [status for call_sid, status, _ in processed if call_sid == 'CA1'] == ['ringing', 'in-progress', 'completed']
+    assert all(strict for _, _, strict in processed)
+
+
+def test_failing_callback_is_retried_then_dead_lettered(queue, processed, monkeypatch):
+    monkeypatch.setattr(webhooks, 'WEBHOOK_MAX_ATTEMPTS', 3)
+    failing_calls.add('CA1')
+    queue.enqueue(webhooks.WEBHOOK_CALL_STATUS, 'CA1', _status('CA1', 'completed', '2'))
+
+    summary = webhooks.drain_webhook_queue()
+
+    assert summary[webhooks.WEBHOOK_RETRIED] == 2
+    assert summary[webhooks.WEBHOOK_DEAD_LETTERED] == 1
+    assert len(processed) == 3
+    [dead] = webhooks.list_dead_letters()
+    assert dead['attempts'] == 3 and dead['last_error'] == 'write failed'
+
+    failing_calls.clear()
+    assert webhooks.redrive_dead_letter(dead['id'])['id'] == dead['id']
+    assert webhooks.drain_webhook_queue()[webhooks.WEBHOOK_DONE] == 1
+    assert webhooks.list_dead_letters() == []
+
+
+# ============================================================================
+# INGESTION
+# ============================================================================
+
+def test_ingest_queues_callback(queue, processed):
+    result = webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, _status('CA1', 'ringing', '0'))
+
+    assert result == webhooks.INGEST_MODE_QUEUE
+    assert processed == []
+    assert [entry['ordering_key'] for entry in queue.claim(OWNER, LEASE_SECONDS)] == ['CA1']
+
+
+def test_ingest_drops_redelivery(queue, processed):
+    payload = _status('CA1', 'ringing', '0')
+
+    assert webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, payload) == webhooks.INGEST_MODE_QUEUE
+    assert webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, dict(payload)) == webhooks.INGEST_DUPLICATE
+    # Another instance (empty LRU) still sees the key in the store
+    webhooks._recent_deliveries.clear()
+    assert webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, dict(payload)) == webhooks.INGEST_DUPLICATE
+    assert len(queue.claim(OWNER, LEASE_SECONDS)) == 1
+
+
+def test_ingest_processes_inline(queue, processed, monkeypatch):
+    monkeypatch.setattr(webhooks, 'get_ingest_mode', lambda: webhooks.INGEST_MODE_INLINE)
+
+    result = webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, _status('CA1', 'ringing', '0'))
+
+    assert result == webhooks.INGEST_MODE_INLINE
+    assert processed == [('CA1', 'ringing', False)]
+
+
+def test_ingest_falls_back_to_strict_inline_processing(queue, processed, monkeypatch):
+    def enqueue_fails(*args):
+        raise RuntimeError('queue unavailable')
+
+    monkeypatch.setattr(queue, 'enqueue', enqueue_fails)
+
+    result = webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, _status('CA1', 'ringing', '0'))
+
+    assert result == webhooks.INGEST_MODE_INLINE
+    assert processed == [('CA1', 'ringing', True)]
+
+
+def test_failed_ingest_releases_the_delivery_key(queue, processed, monkeypatch):
+    monkeypatch.setattr(webhooks, 'get_ingest_mode', lambda: webhooks.INGEST_MODE_INLINE)
+    payload = _status('CA1', 'completed', '2')
+    failing_calls.add('CA1')
+
+    assert webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, payload) == webhooks.INGEST_FAILED
+
+    # Twilio's redelivery is processed, not dropped as a duplicate
+    failing_calls.clear()
+    assert webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, payload) == webhooks.INGEST_MODE_INLINE
+    assert webhooks.ingest_webhook(webhooks.WEBHOOK_CALL_STATUS, payload) == webhooks.INGEST_DUPLICATE
+    assert len(processed) == 2
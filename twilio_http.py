@@ -0,0 +1,280 @@
+"""
+Twilio HTTP Client - Pooled, Timeout-Bounded Transport for the REST API
+
+config.client (twilio.rest.Client) sends every REST call - calls.create in
+/dial, calls(sid).fetch() in get_call_duration and the recording processor,
+the recordings list in the reconciliation job - through this client instead
+of the library default, which has no timeout and can hang a worker forever.
+
+- One keep-alive requests.Session with tuned connection pools, so warm
+  instances reuse TCP+TLS connections to api.twilio.com
+- (connect, read) timeouts on every request: reads and writes have their
+  own read timeout, single operations (e.g. 'calls.create') can override it
+- Idempotent reads (GET/HEAD) are retried on timeouts, connection errors,
+  429 and 5xx with jittered backoff; writes are only retried when the
+  connection could not be opened (the request never reached Twilio)
+- Latency, error, timeout and retry counters per operation
+
+This module only depends on requests and the Twilio library, so config.py
+can build the client at import time.
+
+Business Justification:
+    Pillar 5 (Scalability): A slow Twilio API costs a bounded number of
+                            seconds per call instead of a worker
+
+Used By:
+    - config.py (client)
+    - twilio_service.py (recording media downloads, /api/metrics)
+"""
+
+import random
+import re
+import threading
+import time
+import urllib.parse
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.response import Response as TwilioResponse
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Longest Retry-After (seconds) honored between read retries
+MAX_RETRY_AFTER_SECONDS = 2.0
+
+# Latency samples kept per operation for the percentiles in snapshot()
+LATENCY_SAMPLES = 200
+
+# Path segments that identify a resource instance or an API version
+_SID_SEGMENT = re.compile(r'^[A-Z]{2}[0-9a-zA-Z]{32}(\.\w+)?$')
+_VERSION_SEGMENT = re.compile(r'^(v\d+|\d{4}-\d{2}-\d{2})$')
+
+
+def operation_name(method, url):
+    """
+    Stable operation name for a Twilio REST request.
+
+    Example:
+        >>> operation_name('POST', 'https://api.twilio.com/2010-04-01/Accounts/AC.../Calls.json')
+        'calls.create'
+        >>> operation_name('GET', 'https://api.twilio.com/2010-04-01/Accounts/AC.../Calls/CA....json')
+        'calls.fetch'
+    """
+    names = []
+    instance = False
+    for segment in urllib.parse.urlsplit(url).path.split('/'):
+        if not segment or _VERSION_SEGMENT.match(segment):
+            continue
+        if _SID_SEGMENT.match(segment):
+            instance = True
+            continue
+        name = segment.rsplit('.', 1)[0] if segment.endswith('.json') else segment
+        instance = False
+        if name != 'Accounts':
+            names.append(name.lower())
+
+    method = method.upper()
+    if method in IDEMPOTENT_METHODS:
+        verb = 'fetch' if instance else 'list'
+    elif method == 'POST':
+        verb = 'update' if instance else 'create'
+    else:
+        verb = method.lower()
+    return f"{'.'.join(names) or 'account'}.{verb}"
+
+
+class OperationStats:
+    """Thread-safe per-operation counters and recent latencies."""
+
+    def __init__(self):
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, operation):
+        entry = self._operations.get(operation)
+        if entry is None:
+            entry = self._operations[operation] = {
+                'requests': 0,
+                'errors': 0,
+                'timeouts': 0,
+                'retries': 0,
+                'status_4xx': 0,
+                'status_5xx': 0,
+                'latencies': deque(maxlen=LATENCY_SAMPLES),
+            }
+        return entry
+
+    def record(self, operation, elapsed_ms, status_code=None, error=None):
+        """Count one attempt (status_code for responses, error for exceptions)."""
+        with self._lock:
+            entry = self._entry(operation)
+            entry['requests'] += 1
+            entry['latencies'].append(elapsed_ms)
+            if error is not None:
+                entry['errors'] += 1
+                if isinstance(error, requests.Timeout):
+                    entry['timeouts'] += 1
+            elif status_code >= 500:
+                entry['status_5xx'] += 1
+            elif status_code >= 400:
+                entry['status_4xx'] += 1
+
+    def count_retry(self, operation):
+        with self._lock:
+            self._entry(operation)['retries'] += 1
+
+    def snapshot(self):
+        """
+        Per-operation metrics.
+
+        Returns:
+            dict: operation -> counters plus p50/p95/max latency (ms) of
+                  the most recent attempts
+        """
+        with self._lock:
+            result = {}
+            for operation, entry in sorted(self._operations.items()):
+                latencies = sorted(entry['latencies'])
+                counters = {key: value for key, value in entry.items() if key != 'latencies'}
+                if latencies:
+                    counters['p50_ms'] = round(latencies[len(latencies) // 2], 1)
+                    counters['p95_ms'] = round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 1)
+                    counters['max_ms'] = round(latencies[-1], 1)
+                result[operation] = counters
+            return result
+
+
+class PooledTwilioHttpClient(TwilioHttpClient):
+    """
+    TwilioHttpClient with a tuned keep-alive pool, per-operation timeouts,
+    bounded read retries and latency metrics.
+
+    Args:
+        pool_connections: Connection pools (hosts) kept alive
+        pool_maxsize: Connections per host (at least the worker thread count)
+        connect_timeout: Seconds to open a connection
+        read_timeout: Seconds to wait for a GET/HEAD response
+        write_timeout: Seconds to wait for a POST/DELETE response
+        operation_timeouts: Read timeouts by operation name (see operation_name)
+        read_retries: Extra attempts for idempotent reads
+        retry_backoff_seconds: First retry delay (doubled per attempt, jittered)
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=16, connect_timeout=3.05, read_timeout=10.0,
+                 write_timeout=15.0, operation_timeouts=None, read_retries=2, retry_backoff_seconds=0.25):
+        super().__init__(pool_connections=True)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        self.operation_timeouts = dict(operation_timeouts or {})
+        self.read_retries = max(int(read_retries), 0)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.stats = OperationStats()
+
+        # Only connection failures are retried by the adapter: the request
+        # never reached Twilio, so this is safe for calls.create too. Read
+        # errors are raised as they are (requests.ReadTimeout) for request()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=1, connect=1, read=False, status=0, backoff_factor=0.2),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def timeout_for(self, operation, method):
+        """(connect, read) timeout for an operation."""
+        read = self.operation_timeouts.get(operation)
+        if read is None:
+            read = self.read_timeout if method in IDEMPOTENT_METHODS else self.write_timeout
+        return (self.connect_timeout, read)
+
+    def _retry_delay(self, attempt, response=None):
+        delay = self.retry_backoff_seconds * (2 ** attempt)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER_SECONDS))
+        return delay * random.uniform(0.5, 1.0)
+
+    def request(self, method, url, params=None, data=None, headers=None, auth=None, timeout=None,
+                allow_redirects=False):
+        """
+        Make an HTTP request for the Twilio library.
+
+        Returns:
+            twilio.http.response.Response: Status code and body text
+
+        Raises:
+            requests.RequestException: Timeout or connection error after the
+                                       allowed attempts (callers already handle
+                                       exceptions from the Twilio client)
+        """
+        method = method.upper()
+        operation = operation_name(method, url)
+        if timeout is None:
+            timeout = self.timeout_for(operation, method)
+        attempts = 1 + (self.read_retries if method in IDEMPOTENT_METHODS else 0)
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    auth=auth,
+                    timeout=timeout,
+                    allow_redirects=allow_redirects,
+                    hooks=self.request_hooks,
+                )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self.stats.record(operation, (time.perf_counter() - start) * 1000, error=e)
+                if last_attempt:
+                    print(f"❌ V4.1: Twilio {operation} failed after {attempts} attempt(s): {e}")
+                    raise
+                self.stats.count_retry(operation)
+                time.sleep(self._retry_delay(attempt))
+                continue
+
+            self.stats.record(operation, (time.perf_counter() - start) * 1000, status_code=response.status_code)
+            if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+                self.stats.count_retry(operation)
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+
+            self.last_response = TwilioResponse(int(response.status_code), response.text)
+            return self.last_response
+
+    def media_request(self, method, url, auth=None, headers=None, timeout=None, allow_redirects=True):
+        """
+        Streamed request for recording media on the pooled session.
+
+        Counted as 'recordings.media' (latency until the response headers);
+        the caller must close the response.
+
+        Returns:
+            requests.Response: Unread streamed response
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                auth=auth,
+                headers=headers,
+                stream=True,
+                allow_redirects=allow_redirects,
+                timeout=timeout or (self.connect_timeout, self.read_timeout),
+            )
+        except (requests.Timeout, requests.ConnectionError) as e:
+            self.stats.record('recordings.media', (time.perf_counter() - start) * 1000, error=e)
+            raise
+        self.stats.record('recordings.media', (time.perf_counter() - start) * 1000, status_code=response.status_code)
+        return response
@@ -3,44 +3,94 @@ Twilio Service Module - TwiML Generation and Access Token Logic
 
 This module handles:
 - TwiML response generation for voice calls
-- Access Token generation for VOIP clients
+- Access Token generation for VOIP clients (cached per identity, V4.1)
 - Call duration and recording URL retrieval
+- Webhook signature validation (V4.1)
+- Recording media download with Range support (V4.1)
+- Twilio REST API latency metrics (V4.1, see twilio_http.py)
 """
 
+import threading
+import time
 import urllib.parse
+from collections import OrderedDict
 from flask import Response
 from twilio.twiml.voice_response import VoiceResponse, Dial
 from twilio.jwt.access_token import AccessToken
 from twilio.jwt.access_token.grants import VoiceGrant
+from twilio.request_validator import RequestValidator
 from config import (
     client,
     TWILIO_ACCOUNT_SID,
+    TWILIO_AUTH_TOKEN,
     TWILIO_API_KEY,
     TWILIO_API_SECRET,
     TWILIO_TWIML_APP_SID,
-    TWILIO_PHONE_NUMBER
+    TWILIO_PHONE_NUMBER,
+    TWILIO_TOKEN_TTL_SECONDS,
+    TWILIO_TOKEN_CACHE_ENABLED,
+    TWILIO_TOKEN_REFRESH_MARGIN_SECONDS,
+    TWILIO_TOKEN_CACHE_SIZE
 )
 
 # ============================================================================
 # ACCESS TOKEN GENERATION
 # ============================================================================
 
-def generate_twilio_token(identity='default_agent'):
+# V4.1: Signed tokens per identity, least recently requested first:
+# identity -> (jwt, expires_at epoch seconds)
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_stats = {'hits': 0, 'issued': 0, 'refreshes': 0}
+
+# A cached token is reused while it has more than this many seconds left
+# (never more than half the lifetime, so short TTLs still get reuse)
+_TOKEN_REUSE_MIN_SECONDS = min(TWILIO_TOKEN_REFRESH_MARGIN_SECONDS, TWILIO_TOKEN_TTL_SECONDS // 2)
+
+def _token_response(identity, jwt_token, expires_at, now):
+    return {
+        'token': jwt_token,
+        'identity': identity,
+        'expires_at': expires_at,
+        'ttl': max(int(expires_at - now), 0)
+    }
+
+def generate_twilio_token(identity='default_agent', min_expires_at=None):
     """
     Generate Twilio Access Token for Voice SDK v2.x
     
     Args:
         identity: Agent identifier (default: 'default_agent')
+        min_expires_at: Only return a token expiring after this epoch time
+                        (the token being replaced, for refreshes), optional
         
     Returns:
-        dict: Token data with 'token' and 'identity' keys
+        dict: Token data with 'token', 'identity', 'expires_at' (epoch
+              seconds) and 'ttl' (seconds left) keys
+        
+    Note:
+        V4.1: Signed tokens are cached per identity and handed out again
+        while they have more than TWILIO_TOKEN_REFRESH_MARGIN_SECONDS left,
+        so workspace reloads and reconnect storms after a deploy do not
+        sign a new JWT per request.
     """
+    now = time.time()
+    if TWILIO_TOKEN_CACHE_ENABLED:
+        with _token_cache_lock:
+            cached = _token_cache.get(identity)
+            if (cached and cached[1] - now > _TOKEN_REUSE_MIN_SECONDS
+                    and (min_expires_at is None or cached[1] > min_expires_at)):
+                _token_cache.move_to_end(identity)
+                _token_stats['hits'] += 1
+                return _token_response(identity, cached[0], cached[1], now)
+    
     # Create Access Token for v2.x SDK using API Key credentials
     access_token = AccessToken(
         TWILIO_ACCOUNT_SID,
         TWILIO_API_KEY,
         TWILIO_API_SECRET,
-        identity=identity
+        identity=identity,
+        ttl=TWILIO_TOKEN_TTL_SECONDS
     )
     
     # Create a Voice grant and add to token
@@ -52,22 +102,74 @@ def generate_twilio_token(identity='default_agent'):
     
     # Generate and return the token
     jwt_token = access_token.to_jwt()
+    if not isinstance(jwt_token, str):
+        jwt_token = jwt_token.decode('utf-8')
+    # Signed with exp = now + ttl (whole seconds); never report a later expiry
+    expires_at = int(now) + TWILIO_TOKEN_TTL_SECONDS
     
-    return {
-        'token': jwt_token if isinstance(jwt_token, str) else jwt_token.decode('utf-8'),
-        'identity': identity
-    }
+    with _token_cache_lock:
+        _token_stats['issued'] += 1
+        if min_expires_at is not None:
+            _token_stats['refreshes'] += 1
+        if TWILIO_TOKEN_CACHE_ENABLED:
+            _token_cache[identity] = (jwt_token, expires_at)
+            _token_cache.move_to_end(identity)
+            while len(_token_cache) > TWILIO_TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    
+    return _token_response(identity, jwt_token, expires_at, now)
+
+def get_token_cache_stats():
+    """
+    V4.1: Access token cache metrics for /api/metrics
+    
+    Returns:
+        dict: Cache hits, tokens signed, refresh requests that needed a new
+              token, cached identities and configuration
+    """
+    with _token_cache_lock:
+        requests_total = _token_stats['hits'] + _token_stats['issued']
+        return {
+            **_token_stats,
+            'enabled': TWILIO_TOKEN_CACHE_ENABLED,
+            'identities': len(_token_cache),
+            'ttl_seconds': TWILIO_TOKEN_TTL_SECONDS,
+            'hit_ratio': round(_token_stats['hits'] / requests_total, 3) if requests_total else None
+        }
 
 # ============================================================================
 # TWIML GENERATION
 # ============================================================================
 
-def generate_connect_prospect_twiml(prospect_number):
+def build_recording_status_callback(parent_call_sid=None, item_id=None):
+    """
+    V4.1: Recording callback URL carrying the call's correlation IDs
+    
+    The recording callback for a <Dial> recording arrives with the CHILD
+    CallSid (prospect leg). Passing the parent CallSid (agent leg from /dial)
+    and the Master Lead item ID in the URL lets /recording_status find the
+    call session without asking the Twilio API for the parent.
+    
+    Args:
+        parent_call_sid: CallSid of the agent leg executing the TwiML
+        item_id: Master Lead item ID
+        
+    Returns:
+        str: '/recording_status' with the IDs as query parameters
+    """
+    params = {key: value for key, value in (('parent_call_sid', parent_call_sid), ('item_id', item_id)) if value}
+    if not params:
+        return '/recording_status'
+    return f"/recording_status?{urllib.parse.urlencode(params)}"
+
+def generate_connect_prospect_twiml(prospect_number, parent_call_sid=None, item_id=None):
     """
     Generate TwiML to connect agent to prospect
     
     Args:
         prospect_number: Prospect's phone number
+        parent_call_sid: CallSid of the agent leg (V4.1, for the recording callback URL)
+        item_id: Master Lead item ID (V4.1, for the recording callback URL)
         
     Returns:
         Response: Flask Response object with TwiML XML
@@ -98,7 +200,7 @@ def generate_connect_prospect_twiml(prospect_number):
         dial = Dial(
             callerId=TWILIO_PHONE_NUMBER,
             record='record-from-answer',
-            recording_status_callback='/recording_status',
+            recording_status_callback=build_recording_status_callback(parent_call_sid, item_id),
             recording_status_callback_method='POST'
         )
         dial.number(prospect_number)
@@ -196,4 +298,112 @@ def get_recording_url(call_sid):
         3. /recording_status retrieves PodioItemId via mapping
         4. Webhook updates Podio with proxy URL automatically
     """
-    return None  # Let V3.2.3 webhook handle recording URL
\ No newline at end of file
+    return None  # Let V3.2.3 webhook handle recording URL
+
+# ============================================================================
+# WEBHOOK VALIDATION (V4.1)
+# ============================================================================
+
+def validate_twilio_signature(url, params, signature):
+    """
+    Check the X-Twilio-Signature header of a callback
+    
+    Args:
+        url: Full public URL Twilio requested (including the query string)
+        params: POST form parameters (dict)
+        signature: Value of the X-Twilio-Signature header
+        
+    Returns:
+        bool: True if the signature matches, False otherwise (also when
+              TWILIO_AUTH_TOKEN is not configured)
+    """
+    if not TWILIO_AUTH_TOKEN or not signature:
+        return False
+    return RequestValidator(TWILIO_AUTH_TOKEN).validate(url, params, signature)
+
+# ============================================================================
+# RECORDING MEDIA (V4.1)
+# ============================================================================
+
+RECORDING_MEDIA_URL = "https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Recordings/{recording_sid}.mp3"
+
+# Connect / read timeouts (seconds) for recording downloads
+RECORDING_MEDIA_TIMEOUT = (3.05, 30)
+
+def fetch_recording_media(recording_sid, range_header=None, method='GET'):
+    """
+    Request a recording's MP3 from Twilio with server-side authentication
+    
+    Args:
+        recording_sid: Twilio Recording SID
+        range_header: Client's Range header to forward (e.g. 'bytes=100000-'), optional
+        method: 'GET' (streamed body) or 'HEAD' (headers only)
+        
+    Returns:
+        requests.Response: Unread streamed response - 200, 206 (partial),
+                           416 (range not satisfiable) or an error status.
+                           The caller must close it.
+    """
+    url = RECORDING_MEDIA_URL.format(account_sid=TWILIO_ACCOUNT_SID, recording_sid=recording_sid)
+    headers = {'Range': range_header} if range_header else {}
+    # Pooled keep-alive session shared with the REST client (V4.1)
+    return client.http_client.media_request(
+        method,
+        url,
+        auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
+        headers=headers,
+        allow_redirects=True,
+        timeout=RECORDING_MEDIA_TIMEOUT
+    )
+
+def get_recording_media_location(recording_sid):
+    """
+    Short-lived pre-signed media URL for a recording (no credentials needed)
+    
+    An authenticated request for the recording's MP3 is answered by Twilio
+    with a redirect to the media file on Twilio's storage, signed for a
+    short time. The body is not downloaded.
+    
+    Args:
+        recording_sid: Twilio Recording SID
+        
+    Returns:
+        str: Absolute signed media URL, or None if Twilio serves the media
+             directly (no redirect) or the request fails
+    """
+    url = RECORDING_MEDIA_URL.format(account_sid=TWILIO_ACCOUNT_SID, recording_sid=recording_sid)
+    try:
+        response = client.http_client.media_request(
+            'GET',
+            url,
+            auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
+            allow_redirects=False,
+            timeout=RECORDING_MEDIA_TIMEOUT
+        )
+    except Exception as e:
+        print(f"Error resolving media URL for recording {recording_sid}: {e}")
+        return None
+    
+    try:
+        location = response.headers.get('Location')
+        if response.status_code in (301, 302, 303, 307, 308) and location:
+            return urllib.parse.urljoin(url, location)
+        return None
+    finally:
+        response.close()
+
+# ============================================================================
+# TWILIO API METRICS (V4.1)
+# ============================================================================
+
+def get_twilio_api_stats():
+    """
+    V4.1: Per-operation Twilio REST metrics for /api/metrics
+    
+    Returns:
+        dict: Operation name ('calls.create', 'calls.fetch', 'recordings.media', ...)
+              -> requests, errors, timeouts, retries, 4xx/5xx responses and
+              p50/p95/max latency in ms; empty if the client is not pooled
+    """
+    stats = getattr(client.http_client, 'stats', None)
+    return stats.snapshot() if stats else {}